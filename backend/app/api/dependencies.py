@@ -0,0 +1,107 @@
+import os
+from typing import AsyncIterator
+
+from fastapi import Request, WebSocket
+from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as redis
+
+from app.models.database import async_session_maker, engine
+from app.services.broadcast import SentimentBroadcaster
+from app.services.pool_metrics import db_pool_waits, redis_pool_waits
+from app.services.read_cache import ReadCache
+
+
+class TimedBlockingConnectionPool(redis.BlockingConnectionPool):
+    """
+    Blocking pool (waits up to REDIS_POOL_TIMEOUT for a free connection
+    instead of erroring) that records how long each checkout waited
+    """
+
+    async def get_connection(self, *args, **kwargs):
+        with redis_pool_waits.timer():
+            return await super().get_connection(*args, **kwargs)
+
+
+def create_redis_client() -> redis.Redis:
+    """
+    One client over a bounded connection pool, shared by every request
+    """
+    pool = TimedBlockingConnectionPool(
+        host=os.getenv("REDIS_HOST", "redis"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        decode_responses=True,
+        max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 50)),
+        timeout=float(os.getenv("REDIS_POOL_TIMEOUT", 5)),
+        socket_connect_timeout=float(os.getenv("REDIS_CONNECT_TIMEOUT", 2)),
+        health_check_interval=int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30)),
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+def _shared_redis(app) -> redis.Redis:
+    if getattr(app.state, "redis", None) is None:
+        app.state.redis = create_redis_client()
+    return app.state.redis
+
+
+def get_redis(request: Request) -> redis.Redis:
+    """
+    Shared Redis client created by the app lifespan
+
+    Created lazily when the lifespan hasn't run (e.g. a TestClient
+    used without a with block).
+    """
+    return _shared_redis(request.app)
+
+
+def get_read_cache(request: Request) -> ReadCache:
+    """
+    Process-wide read cache, so single-flight covers every request
+    """
+    state = request.app.state
+    if getattr(state, "read_cache", None) is None:
+        state.read_cache = ReadCache.from_env(_shared_redis(request.app))
+    return state.read_cache
+
+
+async def get_broadcaster(websocket: WebSocket) -> SentimentBroadcaster:
+    """
+    The process's broadcast hub, started by the lifespan (or here,
+    unseeded, when the lifespan hasn't run)
+    """
+    state = websocket.app.state
+    if getattr(state, "broadcaster", None) is None:
+        state.broadcaster = SentimentBroadcaster.from_env(_shared_redis(websocket.app))
+    if not state.broadcaster.running:
+        await state.broadcaster.start()
+    return state.broadcaster
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """
+    Session on the shared engine pool, closed after the request
+    """
+    async with async_session_maker() as session:
+        yield session
+
+
+def pool_status(redis_client: redis.Redis) -> dict:
+    """
+    Size and checkout wait times for the database and Redis pools
+    """
+    db_pool = engine.pool
+    redis_pool = redis_client.connection_pool
+
+    return {
+        "database": {
+            "size": db_pool.size(),
+            "checked_out": db_pool.checkedout(),
+            "overflow": db_pool.overflow(),
+            **db_pool_waits.snapshot(),
+        },
+        "redis": {
+            "max_connections": redis_pool.max_connections,
+            "in_use": len(getattr(redis_pool, "_in_use_connections", ())),
+            **redis_pool_waits.snapshot(),
+        },
+    }
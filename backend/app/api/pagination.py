@@ -0,0 +1,111 @@
+import json
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+def _encode(payload: dict) -> str:
+    data = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """
+    Opaque keyset cursor for the last row of a page
+    """
+    return _encode({
+        "c": created_at.isoformat() if created_at is not None else None,
+        "i": row_id,
+    })
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        payload = _decode(cursor)
+        created_at = payload["c"]
+        if created_at is not None:
+            created_at = datetime.fromisoformat(created_at)
+        return created_at, int(payload["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def created_at_order(created_at_column, id_column):
+    """
+    Newest first; rows without created_at come first, which is
+    PostgreSQL's default for DESC, so the (created_at, id) index still
+    serves it
+    """
+    return created_at_column.desc().nulls_first(), id_column.desc()
+
+
+def after_cursor(created_at_column, id_column, created_at: Optional[datetime], row_id: int):
+    """
+    Rows after (created_at, row_id) in created_at_order
+    """
+    if created_at is None:
+        return or_(
+            created_at_column.is_not(None),
+            and_(created_at_column.is_(None), id_column < row_id),
+        )
+    # Row comparison lets Postgres seek the (created_at, id) index;
+    # it is never true for NULL created_at, which sort earlier
+    return tuple_(created_at_column, id_column) < tuple_(created_at, row_id)
+
+
+def encode_rank_cursor(rank: float, row_id: int) -> str:
+    """
+    Keyset cursor for relevance-ordered search results
+    """
+    return _encode({"r": rank, "i": row_id})
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        payload = _decode(cursor)
+        return float(payload["r"]), int(payload["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) <statement>, so the planner's row estimate
+    can be read without executing the statement
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_count(session, stmt) -> Optional[int]:
+    """
+    Planner estimate of the rows stmt would return; cheap but approximate,
+    and only as fresh as the table's last ANALYZE
+    """
+    plan = await session.scalar(Explain(stmt))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (IndexError, KeyError, TypeError):
+        return None
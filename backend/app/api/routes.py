@@ -1,13 +1,42 @@
-from fastapi import APIRouter, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timedelta
 from typing import Optional
-import json
 import os
 
-from sqlalchemy import select, func, text
+from sqlalchemy import select, func, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.dependencies import get_db, get_read_cache, get_redis, pool_status
+from app.api.pagination import (
+    after_cursor,
+    created_at_order,
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+    estimate_count,
+)
+from app.api.responses import FastJSONResponse
 from app.models.database import async_session_maker
+from app.services.export import (
+    FORMATS as EXPORT_FORMATS,
+    content_disposition,
+    encoder_for,
+    export_columns,
+    stream_export,
+)
+from app.services.platform_stats import read_stats
+from app.services.read_cache import ReadCache
+from app.services.search import (
+    matches as search_matches,
+    search_column_ready,
+    search_rank,
+    substring_pattern,
+)
+from app.services.timeseries import INTERVALS, sentiment_timeseries
 from app.models.social_media_post import SocialMediaPost
 from app.models.sentiment_analysis import SentimentAnalysis
+from app.models.sentiment_rollup import SentimentMinuteRollup
 
 import redis.asyncio as redis
 
@@ -18,49 +47,36 @@ router = APIRouter(prefix="/api", tags=["api"])
 # 1. Health Check
 # =====================================================
 @router.get("/health", status_code=200)
-async def health_check():
+async def health_check(
+    response: Response,
+    session: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis),
+):
+    """
+    Liveness probe: one trivial query and one PING, nothing that
+    grows with table size. Platform counters live at /api/stats.
+    """
     timestamp = datetime.utcnow().isoformat() + "Z"
 
     db_status = "connected"
     redis_status = "connected"
 
-    total_posts = 0
-    total_analyses = 0
-    recent_posts_1h = 0
-
     try:
-        async with async_session_maker() as session:
-            total_posts = await session.scalar(
-                text("SELECT COUNT(*) FROM social_media_posts")
-            )
-            total_analyses = await session.scalar(
-                text("SELECT COUNT(*) FROM sentiment_analysis")
-            )
-            recent_posts_1h = await session.scalar(
-                text("""
-                    SELECT COUNT(*) FROM social_media_posts
-                    WHERE created_at >= NOW() - INTERVAL '1 hour'
-                """)
-            )
+        await session.execute(text("SELECT 1"))
     except Exception:
         db_status = "disconnected"
 
     try:
-        redis_client = redis.Redis(
-            host=os.getenv("REDIS_HOST", "redis"),
-            port=int(os.getenv("REDIS_PORT", 6379)),
-            decode_responses=True
-        )
         await redis_client.ping()
     except Exception:
         redis_status = "disconnected"
 
     status_value = "healthy"
-    http_status = status.HTTP_200_OK
 
     if db_status == "disconnected" or redis_status == "disconnected":
         status_value = "unhealthy"
-        http_status = status.HTTP_503_SERVICE_UNAVAILABLE
+        # Load balancers and orchestrators go by the status code
+        response.status_code = 503
 
     return {
         "status": status_value,
@@ -68,88 +84,286 @@ async def health_check():
         "services": {
             "database": db_status,
             "redis": redis_status
-        },
-        "stats": {
-            "total_posts": total_posts,
-            "total_analyses": total_analyses,
-            "recent_posts_1h": recent_posts_1h
         }
     }
 
+
+@router.get("/stats")
+async def get_platform_stats(redis_client: redis.Redis = Depends(get_redis)):
+    """
+    Post/analysis totals and last-hour volume from counters the
+    workers maintain in Redis
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "stats": await read_stats(redis_client),
+    }
+
+
+@router.get("/stats/pools")
+async def get_pool_stats(redis_client: redis.Redis = Depends(get_redis)):
+    """
+    Connection pool sizes and checkout wait times for this process
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "pools": pool_status(redis_client),
+    }
+
 # =====================================================
 # 2. Get Posts
 # =====================================================
-@router.get("/posts")
+@router.get("/posts", response_class=FastJSONResponse)
 async def get_posts(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    total_mode: str = Query("estimate", pattern="^(exact|estimate|cached|none)$"),
     source: Optional[str] = None,
     sentiment: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    q: Optional[str] = Query(None, min_length=1, max_length=256),
+    match: str = Query("words", pattern="^(words|substring)$"),
+    session: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis),
 ):
-    async with async_session_maker() as session:
-        stmt = (
-            select(SocialMediaPost, SentimentAnalysis)
-            .join(
-                SentimentAnalysis,
-                SocialMediaPost.post_id == SentimentAnalysis.post_id
+    """
+    Newest posts first, paged by keyset on (created_at, id)
+
+    Pass the previous page's next_cursor as cursor to get the next page;
+    offset is still honoured when no cursor is given. total_mode picks
+    how total is computed: a planner estimate (default), an exact count
+    cached briefly in Redis, an exact count, or none.
+
+    q searches post content. With match=words (default) it is a
+    web-style full-text query over the indexed search_vector, and
+    results come best match first, paged by keyset on (rank, id).
+    match=substring matches q literally anywhere in the text (fast only
+    with the optional trigram index) and keeps the newest-first order.
+    """
+    ranked = bool(q) and match == "words"
+    if ranked:
+        await _require_search(session)
+
+    # Plain column rows: no ORM entities or identity map for a read-only page
+    stmt = (
+        select(
+            SocialMediaPost.id,
+            SocialMediaPost.post_id,
+            SocialMediaPost.source,
+            SocialMediaPost.content,
+            SocialMediaPost.author,
+            SocialMediaPost.created_at,
+            SentimentAnalysis.sentiment_label,
+            SentimentAnalysis.confidence_score,
+            SentimentAnalysis.emotion,
+            SentimentAnalysis.model_name,
+        )
+        .join(
+            SentimentAnalysis,
+            SocialMediaPost.post_id == SentimentAnalysis.post_id
+        )
+    )
+
+    filters = {
+        "source": source,
+        "sentiment": sentiment,
+        "start_date": start_date,
+        "end_date": end_date,
+        "q": q,
+        "match": match if q else None,
+    }
+
+    stmt = _filter_posts(stmt, source, sentiment, start_date, end_date, q, match)
+
+    total = await _count_posts(session, redis_client, stmt, total_mode, filters)
+
+    if ranked:
+        rank = search_rank(q)
+        stmt = stmt.add_columns(rank.label("rank")).order_by(
+            rank.desc(),
+            SocialMediaPost.id.desc(),
+        )
+        if cursor:
+            stmt = stmt.where(
+                tuple_(rank, SocialMediaPost.id)
+                < tuple_(*decode_rank_cursor(cursor))
             )
+    else:
+        stmt = stmt.order_by(
+            *created_at_order(SocialMediaPost.created_at, SocialMediaPost.id)
+        )
+        if cursor:
+            stmt = stmt.where(after_cursor(
+                SocialMediaPost.created_at, SocialMediaPost.id, *decode_cursor(cursor)
+            ))
+
+    if offset and not cursor:
+        stmt = stmt.offset(offset)
+
+    # One extra row tells us whether there is a next page
+    result = await session.execute(stmt.limit(limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if ranked:
+            next_cursor = encode_rank_cursor(last.rank, last.id)
+        else:
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+    posts = []
+    for (
+        _, post_id, source_name, content, author, created_at,
+        label, confidence, emotion, model_name, *rank
+    ) in rows:
+        post = {
+            "post_id": post_id,
+            "source": source_name,
+            "content": content,
+            "author": author,
+            "created_at": created_at.isoformat() if created_at else None,
+            "sentiment": {
+                "label": label,
+                "confidence": confidence,
+                "emotion": emotion,
+                "model_name": model_name,
+            }
+        }
+        if rank:
+            post["rank"] = rank[0]
+        posts.append(post)
+
+    return FastJSONResponse({
+        "posts": posts,
+        "total": total,
+        "total_mode": total_mode,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": next_cursor,
+        "filters": filters,
+    })
+
+
+async def _require_search(session):
+    if not await search_column_ready(session):
+        raise HTTPException(
+            status_code=503,
+            detail="Full-text search is not set up yet; run `python worker.py migrate`",
         )
 
-        if source:
-            stmt = stmt.where(SocialMediaPost.source == source)
 
-        if sentiment:
-            stmt = stmt.where(SentimentAnalysis.sentiment_label == sentiment)
+def _filter_posts(stmt, source, sentiment, start_date, end_date,
+                  q=None, match="words"):
+    """
+    The /api/posts filters, shared with the export endpoint
+    """
+    if source:
+        stmt = stmt.where(SocialMediaPost.source == source)
 
-        if start_date:
-            stmt = stmt.where(SocialMediaPost.created_at >= start_date)
+    if sentiment:
+        stmt = stmt.where(SentimentAnalysis.sentiment_label == sentiment)
 
-        if end_date:
-            stmt = stmt.where(SocialMediaPost.created_at <= end_date)
+    if start_date:
+        stmt = stmt.where(SocialMediaPost.created_at >= start_date)
 
-        total = await session.scalar(
-            select(func.count()).select_from(stmt.subquery())
+    if end_date:
+        stmt = stmt.where(SocialMediaPost.created_at <= end_date)
+
+    if q and match == "substring":
+        stmt = stmt.where(
+            SocialMediaPost.content.ilike(substring_pattern(q), escape="\\")
         )
+    elif q:
+        stmt = stmt.where(search_matches(q))
+
+    return stmt
+
+
+@router.get("/posts/export")
+async def export_posts(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|arrow)$"),
+    source: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    q: Optional[str] = Query(None, min_length=1, max_length=256),
+    match: str = Query("words", pattern="^(words|substring)$"),
+):
+    """
+    Stream every matching post with its analysis as NDJSON, CSV or an
+    Arrow IPC stream, newest first, without a row limit
 
-        stmt = (
-            stmt
-            .order_by(SocialMediaPost.created_at.desc())
-            .limit(limit)
-            .offset(offset)
+    Rows are read through a server-side cursor and encoded in batches
+    of EXPORT_BATCH_SIZE, so memory use doesn't grow with the export.
+    """
+    try:
+        encoder = encoder_for(format)
+    except ImportError:
+        raise HTTPException(
+            status_code=400,
+            detail="format=arrow needs pyarrow installed on the API server",
         )
 
-        result = await session.execute(stmt)
-
-        posts = []
-        for post, analysis in result.all():
-            posts.append({
-                "post_id": post.post_id,
-                "source": post.source,
-                "content": post.content,
-                "author": post.author,
-                "created_at": post.created_at.isoformat(),
-                "sentiment": {
-                    "label": analysis.sentiment_label,
-                    "confidence": analysis.confidence_score,
-                    "emotion": analysis.emotion,
-                    "model_name": analysis.model_name,
-                }
-            })
-
-        return {
-            "posts": posts,
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "filters": {
-                "source": source,
-                "sentiment": sentiment,
-                "start_date": start_date,
-                "end_date": end_date,
-            }
-        }
+    if q and match == "words":
+        async with async_session_maker() as session:
+            await _require_search(session)
+
+    stmt = _filter_posts(
+        export_columns()
+        .select_from(SocialMediaPost)
+        .join(
+            SentimentAnalysis,
+            SocialMediaPost.post_id == SentimentAnalysis.post_id
+        ),
+        source, sentiment, start_date, end_date, q, match,
+    ).order_by(
+        SocialMediaPost.created_at.desc(),
+        SocialMediaPost.id.desc(),
+    )
+
+    return StreamingResponse(
+        stream_export(
+            async_session_maker,
+            stmt,
+            encoder,
+            batch_size=int(os.getenv("EXPORT_BATCH_SIZE", 5000)),
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers=content_disposition(format, datetime.utcnow()),
+    )
+
+
+async def _count_posts(session, redis_client, stmt, total_mode, filters):
+    if total_mode == "none":
+        return None
+
+    if total_mode == "estimate":
+        return await estimate_count(session, stmt)
+
+    count_stmt = select(func.count()).select_from(stmt.subquery())
+
+    if total_mode == "exact":
+        return await session.scalar(count_stmt)
+
+    # cached: exact count, reused for POSTS_TOTAL_CACHE_SECONDS
+    cache_key = "posts_total:" + ":".join(
+        value.isoformat() if isinstance(value, datetime) else (value or "")
+        for value in filters.values()
+    )
+
+    cached = await redis_client.get(cache_key)
+    if cached is not None:
+        return int(cached)
+
+    total = await session.scalar(count_stmt)
+    await redis_client.setex(
+        cache_key, int(os.getenv("POSTS_TOTAL_CACHE_SECONDS", 30)), total
+    )
+    return total
 
 # =====================================================
 # 3. Sentiment Distribution
@@ -158,56 +372,60 @@ async def get_posts(
 async def get_sentiment_distribution(
     hours: int = Query(24, ge=1, le=168),
     source: Optional[str] = None,
+    cache: ReadCache = Depends(get_read_cache),
 ):
-    now = datetime.utcnow()
-    start_time = now - timedelta(hours=hours)
+    async def compute():
+        # Own session: a background refresh outlives this request's
+        async with async_session_maker() as session:
+            return await _sentiment_distribution(session, hours, source)
+
+    response, state = await cache.get_or_compute(
+        f"sentiment_distribution:{hours}:{source or 'all'}",
+        compute,
+        ttl=int(os.getenv("DISTRIBUTION_CACHE_TTL_SECONDS", 60)),
+        stale_ttl=int(os.getenv("DISTRIBUTION_CACHE_STALE_SECONDS", 300)),
+        namespace="posts",
+    )
 
-    cache_key = f"sentiment_distribution:{hours}:{source or 'all'}"
+    response["cached"] = state != "miss"
+    return FastJSONResponse(response)
 
-    redis_client = redis.Redis(
-        host=os.getenv("REDIS_HOST", "redis"),
-        port=int(os.getenv("REDIS_PORT", 6379)),
-        decode_responses=True
-    )
 
-    cached = await redis_client.get(cache_key)
-    if cached:
-        data = json.loads(cached)
-        data["cached"] = True
-        return data
-
-    async with async_session_maker() as session:
-        stmt = (
-            select(
-                SentimentAnalysis.sentiment_label,
-                func.count()
-            )
-            .join(
-                SocialMediaPost,
-                SocialMediaPost.post_id == SentimentAnalysis.post_id
-            )
-            .where(SocialMediaPost.created_at >= start_time)
-            .group_by(SentimentAnalysis.sentiment_label)
+async def _sentiment_distribution(session, hours: int, source: Optional[str]):
+    now = datetime.utcnow()
+    start_time = now - timedelta(hours=hours)
+
+    # Minute rollups: cost grows with minutes in the window, not posts
+    stmt = (
+        select(
+            SentimentMinuteRollup.sentiment_label,
+            func.sum(SentimentMinuteRollup.count)
         )
+        .where(
+            SentimentMinuteRollup.bucket
+            >= start_time.replace(second=0, microsecond=0)
+        )
+        .group_by(SentimentMinuteRollup.sentiment_label)
+    )
 
-        if source:
-            stmt = stmt.where(SocialMediaPost.source == source)
+    if source:
+        stmt = stmt.where(SentimentMinuteRollup.source == source)
 
-        rows = (await session.execute(stmt)).all()
+    rows = (await session.execute(stmt)).all()
 
-        distribution = {"positive": 0, "negative": 0, "neutral": 0}
-        total = 0
+    distribution = {"positive": 0, "negative": 0, "neutral": 0}
+    total = 0
 
-        for label, count in rows:
-            distribution[label] = count
-            total += count
+    for label, count in rows:
+        distribution[label] = int(count)
+        total += int(count)
 
-        percentages = {
-            k: round((v / total) * 100, 2) if total else 0.0
-            for k, v in distribution.items()
-        }
+    percentages = {
+        k: round((v / total) * 100, 2) if total else 0.0
+        for k, v in distribution.items()
+    }
 
-    response = {
+    return {
         "timeframe_hours": hours,
         "source": source,
         "distribution": distribution,
@@ -217,5 +435,34 @@ async def get_sentiment_distribution(
         "cached_at": now.isoformat() + "Z"
     }
 
-    await redis_client.setex(cache_key, 60, json.dumps(response))
-    return response
+# =====================================================
+# 4. Sentiment Timeseries
+# =====================================================
+@router.get("/sentiment/timeseries")
+async def get_sentiment_timeseries(
+    hours: int = Query(24, ge=1, le=720),
+    interval: Optional[str] = Query(None, pattern=f"^({'|'.join(INTERVALS)})$"),
+    source: Optional[str] = None,
+    cache: ReadCache = Depends(get_read_cache),
+):
+    """
+    Per-bucket sentiment and emotion counts, binned in the database
+
+    interval is a hint: when omitted, or when it would give more than
+    TIMESERIES_MAX_POINTS buckets, the narrowest interval that fits is
+    used, so the response size is bounded for any window.
+    """
+    async def compute():
+        async with async_session_maker() as session:
+            return await sentiment_timeseries(session, hours, interval, source)
+
+    response, state = await cache.get_or_compute(
+        f"sentiment_timeseries:{hours}:{interval or 'auto'}:{source or 'all'}",
+        compute,
+        ttl=int(os.getenv("TIMESERIES_CACHE_TTL_SECONDS", 30)),
+        stale_ttl=int(os.getenv("TIMESERIES_CACHE_STALE_SECONDS", 120)),
+        namespace="posts",
+    )
+
+    response["cached"] = state != "miss"
+    return FastJSONResponse(response)
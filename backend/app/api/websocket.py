@@ -1,11 +1,16 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 from datetime import datetime
-import asyncio
+
+from app.api.dependencies import get_broadcaster
+from app.services.broadcast import SentimentBroadcaster
 
 router = APIRouter()
 
 @router.websocket("/ws/sentiment")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    broadcaster: SentimentBroadcaster = Depends(get_broadcaster),
+):
     await websocket.accept()
 
     #  Send connection confirmation
@@ -15,36 +20,17 @@ async def websocket_endpoint(websocket: WebSocket):
         "timestamp": datetime.utcnow().isoformat() + "Z"
     })
 
+    # metrics_update frames are built once per tick by the hub
+    # and sent from its per-client queue
+    await broadcaster.register(websocket)
+
     try:
-        # KEEP THE CONNECTION ALIVE
+        # KEEP THE CONNECTION ALIVE; this only notices the disconnect
         while True:
-            await asyncio.sleep(30)
-
-            # Example metrics update (temporary dummy)
-            await websocket.send_json({
-                "type": "metrics_update",
-                "data": {
-                    "last_minute": {
-                        "positive": 3,
-                        "negative": 1,
-                        "neutral": 2,
-                        "total": 6
-                    },
-                    "last_hour": {
-                        "positive": 30,
-                        "negative": 12,
-                        "neutral": 18,
-                        "total": 60
-                    },
-                    "last_24_hours": {
-                        "positive": 300,
-                        "negative": 120,
-                        "neutral": 180,
-                        "total": 600
-                    }
-                },
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            })
+            await websocket.receive_text()
 
     except WebSocketDisconnect:
         print("WebSocket client disconnected")
+
+    finally:
+        await broadcaster.unregister(websocket)
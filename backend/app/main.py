@@ -1,10 +1,74 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.dependencies import create_redis_client
+from app.api.responses import FastJSONResponse
 from app.api.routes import router as api_router
 from app.api.websocket import router as ws_router
+from app.models.database import async_session_maker, engine
+from app.services.alerting import StreamingAlertEvaluator
+from app.services.alert_rules import AlertRuleEngine, AlertRuleRegistry
+from app.services.broadcast import SentimentBroadcaster, load_rollup_seed
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the shared Redis pool and the WebSocket broadcast hub once per
+    process; release them, and the engine's database pool, on shutdown
+    """
+    app.state.redis = create_redis_client()
+    app.state.broadcaster = SentimentBroadcaster.from_env(app.state.redis)
+
+    try:
+        async with async_session_maker() as session:
+            seed_rows = await load_rollup_seed(session)
+    except Exception as e:
+        print(f"Starting broadcast hub without history: {e}")
+        seed_rows = []
+    await app.state.broadcaster.start(seed_rows)
 
-app = FastAPI(title="Sentiment Analysis Platform")
+    # Alerts from the same event feed; off unless enabled, since every
+    # API process that runs it saves its own copy of each alert
+    alert_task = None
+    if os.getenv("ALERT_ENGINE_ENABLED", "false").lower() == "true":
+        rules_file = os.getenv("ALERT_RULES_FILE")
+        if rules_file:
+            app.state.alert_evaluator = AlertRuleEngine(
+                AlertRuleRegistry.from_file(rules_file)
+            )
+            alert_task = asyncio.create_task(app.state.alert_evaluator.run(
+                float(os.getenv("ALERT_EVALUATE_INTERVAL_SECONDS", 1))
+            ))
+        else:
+            app.state.alert_evaluator = StreamingAlertEvaluator()
+        app.state.broadcaster.add_listener(app.state.alert_evaluator)
+
+    try:
+        yield
+    finally:
+        if alert_task is not None:
+            alert_task.cancel()
+            # Let it finish before the pools it uses are closed
+            await asyncio.gather(alert_task, return_exceptions=True)
+        await app.state.broadcaster.stop()
+        app.state.broadcaster = None
+        await app.state.redis.aclose()
+        await app.state.redis.connection_pool.disconnect()
+        app.state.redis = None
+        app.state.read_cache = None
+        await engine.dispose()
+
+
+app = FastAPI(
+    title="Sentiment Analysis Platform",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 # 🔥 ABSOLUTE CORS OVERRIDE (TEMPORARY, FOR DEBUGGING)
 app.add_middleware(
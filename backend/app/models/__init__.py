@@ -2,3 +2,4 @@ from app.models.database import Base
 from app.models.social_media_post import SocialMediaPost
 from app.models.sentiment_analysis import SentimentAnalysis
 from app.models.sentiment_alert import SentimentAlert
+from app.models.sentiment_rollup import SentimentMinuteRollup
@@ -0,0 +1,54 @@
+from typing import List
+
+from sqlalchemy import text
+
+from app.services.search import INDEX_EXISTS, ensure_search_schema
+
+# create_all only builds indexes together with a new table; these bring
+# existing PostgreSQL deployments up to date. CONCURRENTLY keeps the
+# table readable and writable while an index builds. If a build is
+# interrupted it leaves an INVALID index behind, which is then taken as
+# present: drop it and run the migration again.
+INDEX_STATEMENTS = {
+    "ix_social_media_posts_created_at_id": """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_social_media_posts_created_at_id
+    ON social_media_posts (created_at, id)
+    """,
+}
+
+
+def migration_statements(connection) -> List[str]:
+    """
+    The index statements this database still needs
+    """
+    return [
+        statement
+        for name, statement in INDEX_STATEMENTS.items()
+        if not connection.scalar(text(INDEX_EXISTS), {"name": name})
+    ]
+
+
+def run_migrations(engine, search: bool = False, trigram: bool = False) -> int:
+    """
+    Apply the one-off DDL (python worker.py migrate); safe to re-run
+
+    Args:
+        search: also add the post full-text search column and index
+        trigram: also add the pg_trgm index for substring search
+
+    Returns:
+        statements run; 0 on databases other than PostgreSQL
+    """
+    if engine.dialect.name != "postgresql":
+        return 0
+
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        statements = migration_statements(connection)
+        for statement in statements:
+            connection.execute(text(statement))
+
+        ran = len(statements)
+        if search:
+            ran += ensure_search_schema(connection, trigram=trigram)
+    return ran
@@ -2,6 +2,10 @@ from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
 from app.models.database import Base
 from datetime import datetime
 
+# The labels sentiment_label takes
+LABELS = ("positive", "negative", "neutral")
+
+
 class SentimentAnalysis(Base):
     __tablename__ = "sentiment_analysis"
 
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.models.database import Base
+
+# Post counts per minute of created_at, kept current by the worker
+# in the same transaction that inserts the analyses
+class SentimentMinuteRollup(Base):
+    __tablename__ = "sentiment_minute_rollup"
+
+    bucket = Column(DateTime, primary_key=True)
+    source = Column(String, primary_key=True)
+    sentiment_label = Column(String, primary_key=True)
+    emotion = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from app.models.database import Base
 from datetime import datetime
 
@@ -11,3 +11,9 @@ class SocialMediaPost(Base):
     content = Column(Text, nullable=False)
     author = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Serves newest-first keyset pagination on (created_at, id); existing
+    # tables get it from `python worker.py migrate` (app/models/migrations.py)
+    __table_args__ = (
+        Index("ix_social_media_posts_created_at_id", "created_at", "id"),
+    )
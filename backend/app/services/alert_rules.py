@@ -0,0 +1,306 @@
+import re
+import json
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.alerting import AlertService
+from app.services.broadcast import RingCounter
+
+METRICS = ("negative_ratio", "volume")
+
+# Slots per window; longer windows get coarser slots
+WINDOW_SLOTS = 60
+
+_WORD = re.compile(r"[\w'#@]+")
+
+
+def tokens(text: str) -> List[str]:
+    """
+    Lower-cased words of text; any other character (space, "-", ".",
+    ...) separates them. Keywords and post content go through this
+    same split, so they are compared token by token.
+    """
+    return _WORD.findall(text.lower())
+
+
+# (source, keyword, emotion); None matches anything
+Dimension = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+class AlertRule:
+    """
+    One alert condition over a filtered slice of the post stream
+
+    Args:
+        name: unique rule name, stored as the alert's type
+        metric: "negative_ratio" (negative / positive posts) or
+            "volume" (posts in the window)
+        threshold: alert when the metric is above this
+        window_minutes: length of the sliding window
+        min_posts: posts needed in the window before the rule can fire
+        cooldown_seconds: least time between two alerts from this rule,
+            so a sustained breach is reported once per cooldown
+        source, keyword, emotion: optional filters; keyword matches a
+            whole word or run of words in the post content,
+            case-insensitively ("amazon-prime" and "amazon prime" are
+            the same keyword)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        metric: str = "negative_ratio",
+        threshold: float = 2.0,
+        window_minutes: int = 5,
+        min_posts: int = 10,
+        cooldown_seconds: float = 900,
+        source: Optional[str] = None,
+        keyword: Optional[str] = None,
+        emotion: Optional[str] = None,
+    ):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown alert metric {metric!r}; expected one of {METRICS}")
+
+        self.name = name
+        self.metric = metric
+        self.threshold = float(threshold)
+        self.window_minutes = max(1, int(window_minutes))
+        self.min_posts = int(min_posts)
+        self.cooldown_seconds = float(cooldown_seconds)
+        self.source = source
+        self.keyword = " ".join(tokens(keyword)) if keyword else None
+        if keyword and not self.keyword:
+            raise ValueError(f"Alert keyword {keyword!r} has no words to match")
+        self.emotion = emotion
+
+        self.last_fired: Optional[float] = None
+
+    @property
+    def dimension(self) -> Dimension:
+        return (self.source, self.keyword, self.emotion)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AlertRule":
+        return cls(**data)
+
+    def value(self, counts: Dict[str, int]) -> Optional[float]:
+        """
+        The metric for window counts, or None when it isn't defined yet
+        """
+        if sum(counts.values()) < self.min_posts:
+            return None
+        if self.metric == "volume":
+            return float(sum(counts.values()))
+        if counts["positive"] == 0:
+            return None
+        return counts["negative"] / counts["positive"]
+
+
+class AlertRuleRegistry:
+    """
+    Rules indexed the way the evaluator needs them: by the dimension
+    they filter on, and by (dimension, window) group sharing one counter
+    """
+
+    def __init__(self, rules: Iterable[AlertRule] = ()):
+        self.rules: Dict[str, AlertRule] = {}
+        self.groups: Dict[Tuple[Dimension, int], List[AlertRule]] = defaultdict(list)
+        self.dimensions: Set[Dimension] = set()
+        self.windows: Dict[Dimension, List[int]] = {}
+        self.words: Set[str] = set()
+        # Multi-word keywords as token tuples, keyed by their first token
+        self.phrases: Dict[str, Set[Tuple[str, ...]]] = defaultdict(set)
+
+        for rule in rules:
+            self.add(rule)
+
+    @classmethod
+    def from_file(cls, path: str) -> "AlertRuleRegistry":
+        """
+        Load rules from a JSON list of AlertRule keyword arguments
+        """
+        with open(path) as f:
+            return cls(AlertRule.from_dict(item) for item in json.load(f))
+
+    def __len__(self):
+        return len(self.rules)
+
+    def add(self, rule: AlertRule):
+        if rule.name in self.rules:
+            self.remove(rule.name)
+
+        self.rules[rule.name] = rule
+        group = self.groups[(rule.dimension, rule.window_minutes)]
+        if not group:
+            self._index(rule.dimension, rule.window_minutes)
+        group.append(rule)
+
+    def remove(self, name: str):
+        rule = self.rules.pop(name)
+        group = self.groups[(rule.dimension, rule.window_minutes)]
+        group.remove(rule)
+        if not group:
+            del self.groups[(rule.dimension, rule.window_minutes)]
+        self._reindex()
+
+    def _index(self, dimension: Dimension, window: int):
+        self.windows.setdefault(dimension, []).append(window)
+        self.dimensions.add(dimension)
+
+        keyword = dimension[1]
+        if keyword:
+            words = tuple(keyword.split(" "))
+            if len(words) == 1:
+                self.words.add(keyword)
+            else:
+                self.phrases[words[0]].add(words)
+
+    def _reindex(self):
+        self.windows, self.dimensions = {}, set()
+        self.words, self.phrases = set(), defaultdict(set)
+        for dimension, window in self.groups:
+            self._index(dimension, window)
+
+    def keywords_in(self, content: str) -> Set[str]:
+        """
+        Registered keywords that occur in content
+        """
+        if not content or not (self.words or self.phrases):
+            return set()
+
+        words = tokens(content)
+        found = self.words.intersection(words)
+        if self.phrases:
+            for i, word in enumerate(words):
+                for phrase in self.phrases.get(word, ()):
+                    if tuple(words[i:i + len(phrase)]) == phrase:
+                        found.add(" ".join(phrase))
+        return found
+
+
+class AlertRuleEngine:
+    """
+    Evaluates every registered rule from shared sliding-window counts
+
+    Each event is counted once per (dimension, window) group it falls
+    in, not once per rule, so rules that share a filter and window share
+    the work. evaluate() then makes one grouped pass: each group's
+    counts are read once and checked against all of its rules.
+
+    A breaching rule alerts at most once per cooldown_seconds.
+    """
+
+    def __init__(self, registry: AlertRuleRegistry, service: Optional[AlertService] = None):
+        self.registry = registry
+        self.service = service or AlertService()
+        self.counters: Dict[Tuple[Dimension, int], RingCounter] = {}
+
+        self.events = 0
+        self.alerts = 0
+        self.suppressed = 0
+
+    def _counter(self, group) -> RingCounter:
+        counter = self.counters.get(group)
+        if counter is None:
+            window_seconds = group[1] * 60
+            slot_seconds = max(1, window_seconds // WINDOW_SLOTS)
+            counter = self.counters[group] = RingCounter(
+                window_seconds // slot_seconds, slot_seconds
+            )
+        return counter
+
+    def observe(self, event: Dict, now: Optional[float] = None):
+        """
+        Count one analyzed-post event in every group it matches
+        """
+        now = time.time() if now is None else now
+        label = event.get("sentiment_label")
+        registry = self.registry
+        self.events += 1
+
+        source, emotion = event.get("source"), event.get("emotion")
+        sources = (None, source) if source else (None,)
+        emotions = (None, emotion) if emotion else (None,)
+        keywords = (None, *registry.keywords_in(event.get("content") or ""))
+
+        for dimension in product(sources, keywords, emotions):
+            for window in registry.windows.get(dimension, ()):
+                self._counter((dimension, window)).add(label, now)
+
+    __call__ = observe
+
+    def evaluate(self, now: Optional[float] = None) -> List[Dict]:
+        """
+        One pass over all rule groups; returns the alerts to raise
+        """
+        now = time.time() if now is None else now
+        alerts = []
+
+        for group, rules in self.registry.groups.items():
+            counter = self.counters.get(group)
+            if counter is None:
+                continue
+            counter.advance(now)
+            counts = counter.counts
+
+            for rule in rules:
+                value = rule.value(counts)
+                if value is None or value <= rule.threshold:
+                    continue
+
+                if rule.last_fired is not None and now - rule.last_fired < rule.cooldown_seconds:
+                    self.suppressed += 1
+                    continue
+
+                rule.last_fired = now
+                alerts.append(self._alert(rule, value, counts))
+
+        self.alerts += len(alerts)
+        return alerts
+
+    @staticmethod
+    def _alert(rule: AlertRule, value: float, counts: Dict[str, int]) -> Dict:
+        return {
+            "alert_triggered": True,
+            "alert_type": rule.name,
+            "threshold": rule.threshold,
+            "actual_ratio": round(value, 2),
+            "window_minutes": rule.window_minutes,
+            "metrics": {
+                **counts,
+                "total_count": sum(counts.values()),
+                "metric": rule.metric,
+                "source": rule.source,
+                "keyword": rule.keyword,
+                "emotion": rule.emotion,
+            },
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+        }
+
+    async def run(self, interval: float = 1.0):
+        """
+        Evaluate every interval seconds and save the resulting alerts
+        """
+        while True:
+            await asyncio.sleep(interval)
+            for alert in self.evaluate():
+                logging.warning(f"ALERT: {alert}")
+                try:
+                    await self.service.save_alert(alert)
+                except Exception as e:
+                    logging.error(f"Could not save alert: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "rules": len(self.registry),
+            "groups": len(self.registry.groups),
+            "counters": len(self.counters),
+            "events": self.events,
+            "alerts": self.alerts,
+            "suppressed": self.suppressed,
+        }
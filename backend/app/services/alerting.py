@@ -1,15 +1,17 @@
 import logging
 logging.basicConfig(level=logging.INFO)
 import os
+import time
 import asyncio
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Set
 
-from sqlalchemy import select, func, text
+from sqlalchemy import select, func
 from app.models.database import async_session_maker
-from app.models.sentiment_analysis import SentimentAnalysis
-from app.models.social_media_post import SocialMediaPost
-
+from app.models.sentiment_alert import SentimentAlert
+from app.models.sentiment_analysis import LABELS
+from app.models.sentiment_rollup import SentimentMinuteRollup
+from app.services.broadcast import RingCounter
 
 class AlertService:
     def __init__(self):
@@ -24,29 +26,42 @@ class AlertService:
         )
 
     async def check_thresholds(self) -> Optional[dict]:
+        """
+        Evaluate the threshold over the last ``window_minutes`` of posts
+
+        Reads the minute rollup, which is bucketed by post created_at:
+        posts analyzed now but created before the window (a backlog, or
+        a replay with REPLAY_KEEP_TIMESTAMPS=true) are not counted. The
+        streaming evaluator counts events as they are analyzed instead.
+        """
         window_start = datetime.utcnow() - timedelta(minutes=self.window_minutes)
 
         async with async_session_maker() as session:
             stmt = (
                 select(
-                    SentimentAnalysis.sentiment_label,
-                    func.count().label("count")
+                    SentimentMinuteRollup.sentiment_label,
+                    func.sum(SentimentMinuteRollup.count).label("count")
                 )
-                .join(
-                    SocialMediaPost,
-                    SocialMediaPost.post_id == SentimentAnalysis.post_id
+                .where(
+                    SentimentMinuteRollup.bucket
+                    >= window_start.replace(second=0, microsecond=0)
                 )
-                .where(SentimentAnalysis.analyzed_at >= window_start)
-                .group_by(SentimentAnalysis.sentiment_label)
+                .group_by(SentimentMinuteRollup.sentiment_label)
             )
 
             result = await session.execute(stmt)
             rows = result.all()
 
-        counts = {"positive": 0, "negative": 0, "neutral": 0}
+        counts = dict.fromkeys(LABELS, 0)
         for label, count in rows:
-            counts[label] = count
+            counts[label] = int(count)
+
+        return self.evaluate(counts)
 
+    def evaluate(self, counts: Dict[str, int]) -> Optional[dict]:
+        """
+        Alert payload if counts breach the negative/positive threshold
+        """
         total = sum(counts.values())
 
         if total < self.min_posts or counts["positive"] == 0:
@@ -72,19 +87,83 @@ class AlertService:
 
     async def save_alert(self, alert_data: dict) -> int:
         async with async_session_maker() as session:
-            result = await session.execute(
-                text("""
-                    INSERT INTO sentiment_alerts (alert_type, payload, created_at)
-                    VALUES (:type, :payload, NOW())
-                    RETURNING id
-                """),
-                {
-                    "type": alert_data["alert_type"],
-                    "payload": alert_data,
-                }
+            alert = SentimentAlert(
+                alert_type=alert_data["alert_type"],
+                threshold=alert_data["threshold"],
+                actual_ratio=alert_data["actual_ratio"],
+                window_minutes=alert_data["window_minutes"],
+                metrics=alert_data["metrics"],
             )
+            session.add(alert)
             await session.commit()
-            return result.scalar()
+            return alert.id
+
+
+class StreamingAlertEvaluator:
+    """
+    Checks the AlertService threshold on every analyzed-post event
+    instead of polling the database
+
+    Counts live in a one-second RingCounter covering the service's window.
+    An alert is saved only on the transition into breach; it re-arms
+    once the ratio drops back under the threshold.
+    """
+
+    def __init__(self, service: Optional[AlertService] = None):
+        self.service = service or AlertService()
+        self.counter = RingCounter(self.service.window_minutes * 60, 1)
+        self.breached = False
+        self._saving: Set[asyncio.Task] = set()
+
+        self.events = 0
+        self.alerts = 0
+
+    def observe(self, event: Dict, now: Optional[float] = None) -> Optional[dict]:
+        """
+        Count one event; returns the alert if this event crossed the threshold
+        """
+        now = time.time() if now is None else now
+        self.counter.add(event.get("sentiment_label"), now)
+        self.events += 1
+
+        alert = self.service.evaluate(self.counter.counts)
+
+        if alert is None:
+            self.breached = False
+            return None
+        if self.breached:
+            return None
+
+        self.breached = True
+        self.alerts += 1
+        return alert
+
+    def __call__(self, event: Dict, now: Optional[float] = None):
+        """
+        Event listener: observe and persist crossings in the background
+        """
+        alert = self.observe(event, now)
+        if alert is None:
+            return
+
+        logging.warning(f"ALERT: {alert}")
+        task = asyncio.create_task(self._save(alert))
+        self._saving.add(task)
+        task.add_done_callback(self._saving.discard)
+
+    async def _save(self, alert: dict):
+        try:
+            await self.service.save_alert(alert)
+        except Exception as e:
+            logging.error(f"Could not save alert: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "events": self.events,
+            "alerts": self.alerts,
+            "breached": self.breached,
+            "window": dict(self.counter.counts),
+        }
 
 async def run_monitoring_loop(self, check_interval_seconds: int = 60):
     while True:
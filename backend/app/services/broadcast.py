@@ -0,0 +1,383 @@
+import os
+import json
+import time
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, select
+
+from app.models.sentiment_analysis import LABELS
+from app.models.sentiment_rollup import SentimentMinuteRollup
+
+EVENTS_CHANNEL = os.getenv("SENTIMENT_EVENTS_CHANNEL", "sentiment_events")
+
+
+def post_event(post_data: dict, sentiment_result: dict, emotion_result: dict) -> str:
+    """
+    Serialized event a worker publishes for each analyzed post
+    """
+    return json.dumps({
+        "post_id": post_data["post_id"],
+        "source": post_data.get("source"),
+        "created_at": post_data.get("created_at"),
+        "content": post_data.get("content"),
+        "sentiment_label": sentiment_result["sentiment_label"],
+        "confidence_score": sentiment_result["confidence_score"],
+        "emotion": emotion_result["emotion"],
+        "analyzed_at": time.time(),
+    })
+
+
+async def publish_post_events(redis_client, rows: Iterable, channel: str = EVENTS_CHANNEL):
+    """
+    Publish one event per (post_data, sentiment_result, emotion_result),
+    pipelined into a single round trip
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for post_data, sentiment_result, emotion_result in rows:
+            pipe.publish(channel, post_event(post_data, sentiment_result, emotion_result))
+        await pipe.execute()
+
+
+class RingCounter:
+    """
+    Per-label counts in a ring of fixed-width time slots, plus running
+    totals over the whole ring
+
+    Moving forward in time only clears the slots that time has moved
+    past, so the whole-ring totals are read in O(1). Events older than
+    the ring are dropped.
+    """
+
+    def __init__(self, slots: int, slot_seconds: int = 1, labels=LABELS):
+        self.slots = max(1, int(slots))
+        self.slot_seconds = max(1, int(slot_seconds))
+        self.labels = labels
+        self._periods = [-1] * self.slots
+        self._counts = {label: [0] * self.slots for label in labels}
+        self._newest = None
+        # Sum of every slot, labels only
+        self.counts = dict.fromkeys(labels, 0)
+
+    def _period(self, now: float) -> int:
+        return int(now) // self.slot_seconds
+
+    def advance(self, now: float):
+        self._advance(self._period(now))
+
+    def _advance(self, period: int):
+        if self._newest is None:
+            self._newest = period
+            return
+        if period <= self._newest:
+            return
+
+        # Slots for the periods that just entered the ring may hold
+        # counts from a previous lap; only slots written since they were
+        # last cleared have a period
+        if period - self._newest >= self.slots:
+            self._periods = [-1] * self.slots
+            self._counts = {label: [0] * self.slots for label in self.labels}
+            self.counts = dict.fromkeys(self.labels, 0)
+        else:
+            periods = self._periods
+            for stale in range(self._newest + 1, period + 1):
+                index = stale % self.slots
+                if periods[index] < 0:
+                    continue
+                periods[index] = -1
+                for label, counts in self._counts.items():
+                    if counts[index]:
+                        self.counts[label] -= counts[index]
+                        counts[index] = 0
+
+        self._newest = period
+
+    def add(self, label: str, now: float, count: int = 1):
+        if label not in self.counts:
+            return
+
+        period = int(now) // self.slot_seconds
+        newest = self._newest
+        if newest is None or period > newest:
+            self._advance(period)
+        elif period <= newest - self.slots:
+            return
+
+        index = period % self.slots
+        self._periods[index] = period
+        self._counts[label][index] += count
+        self.counts[label] += count
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def totals(self, now: float, span: Optional[int] = None) -> Dict[str, int]:
+        """
+        Sum of the last ``span`` slots (all of them by default),
+        including the current one
+        """
+        self.advance(now)
+        if span is None or span >= self.slots:
+            totals = dict(self.counts)
+        else:
+            newest = self._period(now)
+            oldest = newest - span + 1
+
+            recent = [
+                index for index, period in enumerate(self._periods)
+                if oldest <= period <= newest
+            ]
+            totals = {
+                label: sum(counts[index] for index in recent)
+                for label, counts in self._counts.items()
+            }
+
+        totals["total"] = sum(totals[label] for label in self.labels)
+        return totals
+
+
+class _Client:
+    def __init__(self, websocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.sender: Optional[asyncio.Task] = None
+
+
+class SentimentBroadcaster:
+    """
+    One aggregation per tick, fanned out to every dashboard socket
+
+    A single Redis pub/sub subscription feeds per-post events from the
+    workers into ring buffers. Each tick the last-minute, last-hour and
+    last-24h counts are computed and serialized once, and the same frame
+    is queued for every client. A client whose queue is full (it isn't
+    reading fast enough) is disconnected rather than buffered without
+    bound.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        channel: str = EVENTS_CHANNEL,
+        interval: float = 2.0,
+        queue_size: int = 16,
+    ):
+        """
+        Args:
+            redis_client: redis.asyncio client to subscribe with
+            channel: pub/sub channel the workers publish to
+            interval: seconds between frames
+            queue_size: frames buffered per client before it is dropped
+        """
+        self.redis = redis_client
+        self.channel = channel
+        self.interval = interval
+        self.queue_size = queue_size
+
+        self.seconds = RingCounter(60, 1)
+        self.minutes = RingCounter(24 * 60, 60)
+
+        self.clients: Dict[int, _Client] = {}
+        self.listeners: List[Callable[[Dict, float], None]] = []
+        self.last_frame: Optional[str] = None
+        self._tasks: List[asyncio.Task] = []
+        # The event loop only keeps weak references to tasks
+        self._drops: Set[asyncio.Task] = set()
+
+        self.events = 0
+        self.frames = 0
+        self.dropped_clients = 0
+
+    @classmethod
+    def from_env(cls, redis_client) -> "SentimentBroadcaster":
+        return cls(
+            redis_client,
+            interval=float(os.getenv("BROADCAST_INTERVAL_SECONDS", 2)),
+            queue_size=int(os.getenv("BROADCAST_CLIENT_QUEUE_SIZE", 16)),
+        )
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self, seed_rows: Iterable = ()):
+        """
+        Start consuming events and ticking
+
+        Args:
+            seed_rows: (minute bucket, sentiment label, count) rows, e.g.
+                from the rollup table, so the longer windows aren't empty
+                right after a restart
+        """
+        if self.running:
+            return
+
+        for bucket, label, count in seed_rows:
+            # Buckets are naive UTC
+            moment = bucket.replace(tzinfo=timezone.utc).timestamp()
+            self.minutes.add(label, moment, int(count))
+
+        self._tasks = [
+            asyncio.create_task(self._consume()),
+            asyncio.create_task(self._tick()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.gather(*self._drops, return_exceptions=True)
+
+        for client in list(self.clients.values()):
+            await self._drop(client, close=False)
+
+    def record(self, event: Dict, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        label = event.get("sentiment_label")
+
+        self.seconds.add(label, now)
+        self.minutes.add(label, now)
+        self.events += 1
+
+        for listener in self.listeners:
+            try:
+                listener(event, now)
+            except Exception as e:
+                print(f"Sentiment event listener failed: {e}")
+
+    def add_listener(self, listener: Callable[[Dict, float], None]):
+        """
+        Also hand every event to listener(event, received_at); it runs
+        on the subscription loop, so it must not block
+        """
+        self.listeners.append(listener)
+
+    async def _consume(self):
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self._handle(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Broadcast subscription error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def _handle(self, data):
+        try:
+            self.record(json.loads(data))
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"Skipping malformed sentiment event: {e}")
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        now = time.time() if now is None else now
+        return {
+            "last_minute": self.seconds.totals(now),
+            "last_hour": self.minutes.totals(now, 60),
+            "last_24_hours": self.minutes.totals(now),
+        }
+
+    def frame(self, now: Optional[float] = None) -> str:
+        return json.dumps({
+            "type": "metrics_update",
+            "data": self.snapshot(now),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+        })
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.clients:
+                self.broadcast(self.frame())
+            else:
+                self.last_frame = None
+
+    def broadcast(self, frame: str):
+        """
+        Queue one pre-serialized frame for every client
+        """
+        self.frames += 1
+        self.last_frame = frame
+        for client in list(self.clients.values()):
+            try:
+                client.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self.dropped_clients += 1
+                task = asyncio.create_task(self._drop(client))
+                self._drops.add(task)
+                task.add_done_callback(self._drops.discard)
+
+    async def register(self, websocket) -> _Client:
+        client = _Client(websocket, self.queue_size)
+        if self.last_frame is not None:
+            # New dashboards get the current numbers without waiting a tick
+            client.queue.put_nowait(self.last_frame)
+        client.sender = asyncio.create_task(self._send(client))
+        self.clients[id(websocket)] = client
+        return client
+
+    async def unregister(self, websocket):
+        client = self.clients.get(id(websocket))
+        if client is not None:
+            await self._drop(client, close=False)
+
+    async def _send(self, client: _Client):
+        try:
+            while True:
+                frame = await client.queue.get()
+                await client.websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Socket went away mid-send; the endpoint cleans up
+            self.clients.pop(id(client.websocket), None)
+
+    async def _drop(self, client: _Client, close: bool = True):
+        self.clients.pop(id(client.websocket), None)
+
+        if client.sender is not None and client.sender is not asyncio.current_task():
+            client.sender.cancel()
+
+        if close:
+            try:
+                # 1013: try again later
+                await client.websocket.close(code=1013)
+            except Exception:
+                pass
+
+    def stats(self) -> Dict:
+        return {
+            "clients": len(self.clients),
+            "events": self.events,
+            "frames": self.frames,
+            "dropped_clients": self.dropped_clients,
+        }
+
+
+async def load_rollup_seed(session, now: Optional[datetime] = None) -> List:
+    """
+    Last 24h of per-minute label counts from the rollup table
+    """
+    now = now or datetime.utcnow()
+    start = (now - timedelta(hours=24)).replace(second=0, microsecond=0)
+
+    stmt = (
+        select(
+            SentimentMinuteRollup.bucket,
+            SentimentMinuteRollup.sentiment_label,
+            func.sum(SentimentMinuteRollup.count),
+        )
+        .where(SentimentMinuteRollup.bucket >= start)
+        .group_by(SentimentMinuteRollup.bucket, SentimentMinuteRollup.sentiment_label)
+    )
+    return (await session.execute(stmt)).all()
@@ -0,0 +1,181 @@
+import io
+import csv
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List
+
+from sqlalchemy import select
+
+from app.models.social_media_post import SocialMediaPost
+from app.models.sentiment_analysis import SentimentAnalysis
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Flat columns only: no ORM objects are built while exporting
+COLUMNS = (
+    ("post_id", SocialMediaPost.post_id),
+    ("source", SocialMediaPost.source),
+    ("content", SocialMediaPost.content),
+    ("author", SocialMediaPost.author),
+    ("created_at", SocialMediaPost.created_at),
+    ("sentiment_label", SentimentAnalysis.sentiment_label),
+    ("confidence_score", SentimentAnalysis.confidence_score),
+    ("emotion", SentimentAnalysis.emotion),
+    ("model_name", SentimentAnalysis.model_name),
+    ("analyzed_at", SentimentAnalysis.analyzed_at),
+)
+
+FIELDS = [name for name, _ in COLUMNS]
+
+
+def export_columns():
+    return select(*[column.label(name) for name, column in COLUMNS])
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class NDJSONEncoder:
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(FIELDS, map(_isoformat, row)))) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class CSVEncoder:
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def header(self) -> bytes:
+        self._writer.writerow(FIELDS)
+        return self._drain()
+
+    def encode(self, rows: List) -> bytes:
+        self._writer.writerows([map(_isoformat, row) for row in rows])
+        return self._drain()
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class _ChunkSink:
+    """
+    Write-only file that hands back what was written since last drain
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+class ArrowEncoder:
+    """
+    Arrow IPC stream, one record batch per database partition
+
+    pyarrow is optional; constructing this without it raises ImportError.
+    """
+
+    def __init__(self):
+        import pyarrow as pa
+
+        self._pa = pa
+        self.schema = pa.schema([
+            ("post_id", pa.string()),
+            ("source", pa.string()),
+            ("content", pa.string()),
+            ("author", pa.string()),
+            ("created_at", pa.timestamp("us")),
+            ("sentiment_label", pa.string()),
+            ("confidence_score", pa.float64()),
+            ("emotion", pa.string()),
+            ("model_name", pa.string()),
+            ("analyzed_at", pa.timestamp("us")),
+        ])
+        self._sink = _ChunkSink()
+        self._writer = None
+
+    def header(self) -> bytes:
+        self._writer = self._pa.ipc.new_stream(self._sink, self.schema)
+        return self._sink.drain()
+
+    def encode(self, rows: List) -> bytes:
+        columns = list(zip(*rows)) if rows else [[] for _ in FIELDS]
+        batch = self._pa.record_batch(
+            [self._pa.array(values, type=field.type)
+             for values, field in zip(columns, self.schema)],
+            schema=self.schema,
+        )
+        self._writer.write_batch(batch)
+        return self._sink.drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+def encoder_for(fmt: str):
+    return {"ndjson": NDJSONEncoder, "csv": CSVEncoder, "arrow": ArrowEncoder}[fmt]()
+
+
+async def stream_export(
+    session_factory,
+    stmt,
+    encoder,
+    batch_size: int = 5000,
+) -> AsyncIterator[bytes]:
+    """
+    Encode the rows of stmt chunk by chunk as the database returns them
+
+    Rows come through a server-side cursor batch_size at a time, so memory
+    stays flat however many rows match. The session is opened here, not
+    per request, because the body is sent after the endpoint returns.
+    """
+    yield encoder.header()
+
+    async with session_factory() as session:
+        result = await session.stream(
+            stmt.execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield encoder.encode(partition)
+
+    yield encoder.footer()
+
+
+def content_disposition(fmt: str, now: datetime) -> Dict[str, str]:
+    extension = {"ndjson": "ndjson", "csv": "csv", "arrow": "arrows"}[fmt]
+    filename = f"posts-{now.strftime('%Y%m%dT%H%M%SZ')}.{extension}"
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
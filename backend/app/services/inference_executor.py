@@ -0,0 +1,117 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+
+class InferenceExecutor:
+    """
+    Runs blocking model calls away from the event loop
+
+    Backends:
+        inline  - call directly on the event loop (debugging / tests)
+        thread  - thread pool; torch releases the GIL during forward passes
+        process - process pool; functions and arguments must be picklable
+
+    At most ``max_pending`` calls are submitted at once. Further callers
+    wait for a slot, which pushes back on whoever is feeding work in
+    instead of letting an unbounded backlog build up in the pool.
+    """
+
+    BACKENDS = ("inline", "thread", "process")
+
+    def __init__(
+        self,
+        backend: str = "thread",
+        max_workers: int = 2,
+        max_pending: Optional[int] = None,
+        initializer: Optional[Callable] = None,
+        initargs: Tuple = (),
+    ):
+        """
+        Args:
+            backend: 'inline', 'thread' or 'process'
+            max_workers: pool size (ignored for inline)
+            max_pending: submitted-but-unfinished calls allowed before
+                callers block; defaults to twice the pool size
+            initializer: run once in each pool process (process only),
+                e.g. to load models in the child
+            initargs: arguments for initializer
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(
+                f"backend must be one of {', '.join(self.BACKENDS)}"
+            )
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        self.backend = backend
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers * 2
+        self.pending = 0
+
+        self._pool: Optional[Executor] = None
+        if backend == "thread":
+            self._pool = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="inference",
+            )
+        elif backend == "process":
+            # spawn rather than fork: forking a parent that has
+            # started torch/OpenMP threads can deadlock the child
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs,
+            )
+
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(
+        cls,
+        initializer: Optional[Callable] = None,
+        initargs: Tuple = (),
+    ) -> "InferenceExecutor":
+        """
+        Build an executor from INFERENCE_EXECUTOR, INFERENCE_WORKERS
+        and INFERENCE_MAX_PENDING
+        """
+        max_pending = os.getenv("INFERENCE_MAX_PENDING")
+
+        return cls(
+            backend=os.getenv("INFERENCE_EXECUTOR", "thread"),
+            max_workers=int(os.getenv("INFERENCE_WORKERS", 2)),
+            max_pending=int(max_pending) if max_pending else None,
+            initializer=initializer,
+            initargs=initargs,
+        )
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """
+        Run fn(*args) on the configured backend and await its result
+        """
+        if self.backend == "inline":
+            return fn(*args)
+
+        async with self._get_slots():
+            self.pending += 1
+            try:
+                return await self._loop.run_in_executor(self._pool, fn, *args)
+            finally:
+                self.pending -= 1
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
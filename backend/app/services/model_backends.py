@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+# pytorch   - fp32 PyTorch weights as published
+# quantized - PyTorch with Linear layers dynamically quantized to int8
+# onnx      - ONNX Runtime export (needs optimum[onnxruntime])
+BACKENDS = ("pytorch", "quantized", "onnx")
+
+ONNX_EXPORT_DIR = os.getenv(
+    "ONNX_EXPORT_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "sentiment-onnx"),
+)
+
+
+def backend_from_env(var: str) -> str:
+    """
+    Backend for one model, e.g. HUGGINGFACE_MODEL_BACKEND, falling
+    back to MODEL_BACKEND and then fp32 PyTorch
+    """
+    return os.getenv(var) or os.getenv("MODEL_BACKEND", "pytorch")
+
+
+def _classifier(model, tokenizer):
+    return pipeline(
+        "text-classification",
+        model=model,
+        tokenizer=tokenizer,
+        return_all_scores=True,
+    )
+
+
+def _load_quantized(model_name: str):
+    import torch
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+
+    model = torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+    return _classifier(model, AutoTokenizer.from_pretrained(model_name))
+
+
+def _export_onnx(model_class, model_name: str, export_dir: str):
+    """
+    Export into a private temp dir and rename it into place; if another
+    process got there first, keep theirs
+    """
+    os.makedirs(ONNX_EXPORT_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".export-", dir=ONNX_EXPORT_DIR)
+    try:
+        model_class.from_pretrained(model_name, export=True).save_pretrained(tmp_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp_dir)
+        try:
+            os.replace(tmp_dir, export_dir)
+        except OSError:
+            if not os.path.isdir(export_dir):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _load_onnx(model_name: str):
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError(
+            "The onnx backend requires optimum[onnxruntime] to be installed"
+        ) from e
+
+    # Export once per model and reuse the ONNX graph on later starts.
+    # The export only appears under export_dir by an atomic rename, so
+    # a directory that exists is always complete.
+    export_dir = os.path.join(ONNX_EXPORT_DIR, model_name.replace("/", "--"))
+
+    if not os.path.isdir(export_dir):
+        _export_onnx(ORTModelForSequenceClassification, model_name, export_dir)
+
+    model = ORTModelForSequenceClassification.from_pretrained(export_dir)
+    tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    return _classifier(model, tokenizer)
+
+
+def load_pipeline(model_name: str, backend: str = "pytorch"):
+    """
+    Load a text-classification pipeline returning all label scores
+
+    Args:
+        model_name: Hugging Face model id
+        backend: one of BACKENDS
+    """
+    if backend == "pytorch":
+        # Cached automatically by HF
+        return pipeline(
+            "text-classification",
+            model=model_name,
+            return_all_scores=True,
+        )
+
+    if backend == "quantized":
+        return _load_quantized(model_name)
+
+    if backend == "onnx":
+        return _load_onnx(model_name)
+
+    raise ValueError(f"backend must be one of {', '.join(BACKENDS)}")
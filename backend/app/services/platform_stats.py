@@ -0,0 +1,90 @@
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+# Platform-wide counters kept in Redis by the workers, so reading
+# them costs a couple of round trips instead of COUNT(*) scans
+STATS_KEY = os.getenv("PLATFORM_STATS_KEY", "platform_stats")
+MINUTE_KEY_PREFIX = f"{STATS_KEY}:posts_minute:"
+# Set by seed_totals together with the totals
+INITIALIZED_FIELD = "initialized"
+SEED_CLAIM_KEY = f"{STATS_KEY}:seeding"
+SEED_CLAIM_TTL = 10 * 60
+
+# Per-minute keys outlive the longest window read from them
+MINUTE_KEY_TTL = 2 * 60 * 60
+
+
+def _minute_key(moment: datetime) -> str:
+    return MINUTE_KEY_PREFIX + moment.strftime("%Y%m%d%H%M")
+
+
+async def record_written(
+    redis_client,
+    posts: int,
+    analyses: int,
+    now: Optional[datetime] = None,
+):
+    """
+    Count posts/analyses a worker has just committed
+    """
+    if not posts and not analyses:
+        return
+
+    minute_key = _minute_key(now or datetime.utcnow())
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.hincrby(STATS_KEY, "total_posts", posts)
+        pipe.hincrby(STATS_KEY, "total_analyses", analyses)
+        pipe.incrby(minute_key, posts)
+        pipe.expire(minute_key, MINUTE_KEY_TTL)
+        await pipe.execute()
+
+
+async def claim_seeding(redis_client, timeout: int = SEED_CLAIM_TTL) -> bool:
+    """
+    Let one worker count the tables and seed the totals; the claim
+    expires in case that worker dies before seeding
+    """
+    if await stats_initialized(redis_client):
+        return False
+    return bool(await redis_client.set(SEED_CLAIM_KEY, 1, ex=timeout, nx=True))
+
+
+async def seed_totals(redis_client, total_posts: int, total_analyses: int):
+    """
+    Set both totals from an exact count, and mark them initialized
+
+    One HSET, so readers never see one total seeded without the other.
+    Increments recorded while the count ran are overwritten: those rows
+    are in the count, or (committed after it) go uncounted.
+    """
+    await redis_client.hset(STATS_KEY, mapping={
+        "total_posts": total_posts,
+        "total_analyses": total_analyses,
+        INITIALIZED_FIELD: 1,
+    })
+
+
+async def stats_initialized(redis_client) -> bool:
+    # record_written creates the total fields too, so check the marker
+    return bool(await redis_client.hexists(STATS_KEY, INITIALIZED_FIELD))
+
+
+async def read_stats(redis_client, now: Optional[datetime] = None) -> Dict:
+    """
+    Totals plus posts written in the last 60 minutes
+    """
+    now = now or datetime.utcnow()
+    minute_keys = [_minute_key(now - timedelta(minutes=i)) for i in range(60)]
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.hmget(STATS_KEY, "total_posts", "total_analyses")
+        pipe.mget(minute_keys)
+        (total_posts, total_analyses), minutes = await pipe.execute()
+
+    return {
+        "total_posts": int(total_posts or 0),
+        "total_analyses": int(total_analyses or 0),
+        "recent_posts_1h": sum(int(m) for m in minutes if m),
+    }
@@ -0,0 +1,59 @@
+import time
+from collections import deque
+from typing import Dict
+
+
+class PoolWaitStats:
+    """
+    Time spent waiting to check a connection out of a pool
+
+    Keeps running totals plus the most recent samples for percentiles.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def timer(self):
+        return _Timer(self)
+
+    def snapshot(self) -> Dict:
+        recent = sorted(self._recent)
+
+        def pct(p):
+            if not recent:
+                return 0.0
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3)
+
+        return {
+            "checkouts": self.count,
+            "avg_wait_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_wait_ms": round(self.max * 1000, 3),
+            "p50_wait_ms": pct(0.50),
+            "p95_wait_ms": pct(0.95),
+            "p99_wait_ms": pct(0.99),
+        }
+
+
+class _Timer:
+    def __init__(self, stats: PoolWaitStats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(time.perf_counter() - self.started)
+
+
+db_pool_waits = PoolWaitStats()
+redis_pool_waits = PoolWaitStats()
@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+GENERATION_PREFIX = "read_cache:gen:"
+
+
+async def invalidate(redis_client, namespace: str) -> int:
+    """
+    Mark every entry cached under namespace as stale
+
+    Entries are not deleted: readers keep getting the old value while
+    one of them recomputes it in the background.
+    """
+    return await redis_client.incr(GENERATION_PREFIX + namespace)
+
+
+class ReadCache:
+    """
+    Redis cache for read endpoints that doesn't stampede on expiry
+
+    Each entry is fresh for ``ttl`` seconds, then served stale for up to
+    ``stale_ttl`` more while a single background task recomputes it.
+    Only a cold miss makes a request wait, and then only one request per
+    key computes: others in this process share its result and other
+    processes wait on a short Redis lock for it to land.
+
+    Entries stored under a namespace also go stale as soon as
+    ``invalidate(redis, namespace)`` bumps that namespace's generation.
+    Redis errors degrade to computing directly.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        prefix: str = "read_cache",
+        lock_timeout: float = 10.0,
+        lock_poll_interval: float = 0.05,
+    ):
+        """
+        Args:
+            redis_client: redis.asyncio client
+            prefix: Redis key prefix for entries and locks
+            lock_timeout: longest a computation may hold a key's lock
+            lock_poll_interval: how often waiters re-check for the value
+        """
+        self.redis = redis_client
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout
+        self.lock_poll_interval = lock_poll_interval
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls, redis_client) -> "ReadCache":
+        return cls(
+            redis_client,
+            prefix=os.getenv("READ_CACHE_PREFIX", "read_cache"),
+            lock_timeout=float(os.getenv("READ_CACHE_LOCK_TIMEOUT", 10)),
+        )
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float = 0,
+        namespace: Optional[str] = None,
+    ) -> Tuple[Any, str]:
+        """
+        Return the cached value for key, computing it if needed
+
+        Args:
+            key: cache key, without the prefix
+            compute: coroutine function producing a JSON-serializable value
+            ttl: seconds the value counts as fresh
+            stale_ttl: further seconds it may be served while refreshing
+            namespace: invalidation namespace the value depends on
+
+        Returns:
+            (value, state), state being "fresh", "stale" or "miss"
+        """
+        entry, generation = await self._read(key, namespace)
+
+        if entry is not None:
+            is_current = namespace is None or entry.get("gen") == generation
+            if is_current and time.time() < entry["fresh_until"]:
+                self.hits += 1
+                return entry["value"], "fresh"
+
+            self.stale_hits += 1
+            self._refresh_in_background(
+                key, compute, ttl, stale_ttl, namespace, generation
+            )
+            return entry["value"], "stale"
+
+        self.misses += 1
+        value = await self._single_flight(
+            key, compute, ttl, stale_ttl, namespace, generation, wait=True
+        )
+        return value, "miss"
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def _read(self, key, namespace) -> Tuple[Optional[Dict], Optional[str]]:
+        try:
+            if namespace is None:
+                return self._decode(await self.redis.get(self._entry_key(key))), None
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(self._entry_key(key))
+                pipe.get(GENERATION_PREFIX + namespace)
+                raw, generation = await pipe.execute()
+            return self._decode(raw), generation
+        except Exception:
+            self.errors += 1
+            return None, None
+
+    @staticmethod
+    def _decode(raw) -> Optional[Dict]:
+        return json.loads(raw) if raw else None
+
+    async def _store(self, key, value, ttl, stale_ttl, generation):
+        entry = {
+            "value": value,
+            "fresh_until": time.time() + ttl,
+            "gen": generation,
+        }
+        try:
+            await self.redis.set(
+                self._entry_key(key),
+                json.dumps(entry, default=str),
+                ex=max(1, int(ttl + stale_ttl)),
+            )
+        except Exception:
+            self.errors += 1
+
+    def _refresh_in_background(self, key, compute, ttl, stale_ttl, namespace, generation):
+        if key in self._inflight:
+            return
+
+        task = asyncio.create_task(
+            self._single_flight(
+                key, compute, ttl, stale_ttl, namespace, generation, wait=False
+            )
+        )
+        self._refreshing.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task):
+        self._refreshing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # The stale value stays in place; the next read tries again
+            self.errors += 1
+
+    async def _single_flight(self, key, compute, ttl, stale_ttl, namespace,
+                             generation, wait: bool):
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            value = await asyncio.shield(pending)
+            # A background refresh that deferred to another process
+            # yields None; a request with nothing to serve computes
+            if value is not None or not wait:
+                return value
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            value = await self._compute_across_processes(
+                key, compute, ttl, stale_ttl, namespace, generation, wait
+            )
+            future.set_result(value)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; don't warn about it
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+        return value
+
+    async def _compute_across_processes(self, key, compute, ttl, stale_ttl,
+                                        namespace, generation, wait: bool):
+        lock_key = f"{self.prefix}:lock:{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await self.redis.set(
+                lock_key, token, nx=True, px=int(self.lock_timeout * 1000)
+            )
+        except Exception:
+            self.errors += 1
+            acquired = True
+
+        if not acquired:
+            if not wait:
+                # Another process is already refreshing this key
+                return None
+
+            value = await self._wait_for_value(key, namespace)
+            if value is not None:
+                return value["value"]
+            # Lock holder died or is too slow; compute without it
+
+        try:
+            self.refreshes += 1
+            value = await compute()
+            await self._store(key, value, ttl, stale_ttl, generation)
+            return value
+        finally:
+            if acquired:
+                await self._release(lock_key, token)
+
+    async def _wait_for_value(self, key, namespace) -> Optional[Dict]:
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            entry, _ = await self._read(key, namespace)
+            if entry is not None:
+                return entry
+        return None
+
+    async def _release(self, lock_key: str, token: str):
+        try:
+            # Don't delete a lock that expired and was taken by someone else
+            if await self.redis.get(lock_key) == token:
+                await self.redis.delete(lock_key)
+        except Exception:
+            self.errors += 1
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "refreshing": len(self._refreshing),
+            "errors": self.errors,
+        }
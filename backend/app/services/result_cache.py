@@ -0,0 +1,178 @@
+import os
+import json
+import asyncio
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class AnalysisCache:
+    """
+    Two-tier cache for model results, keyed by normalized text + model name
+    (the analyzer passes model@backend)
+
+    Tier 1 is an in-process LRU bounded to ``max_entries``.
+    Tier 2 is an optional shared Redis tier so every worker benefits
+    from results computed by any other. Redis failures are counted
+    and treated as misses; the cache never fails an analysis.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        max_entries: int = 10000,
+        ttl_seconds: int = 86400,
+        prefix: str = "sentiment_cache",
+    ):
+        """
+        Args:
+            redis_client: redis.asyncio client for the shared tier, or None
+            max_entries: LRU capacity; 0 disables the local tier
+            ttl_seconds: expiry for entries in the shared tier
+            prefix: Redis key prefix
+        """
+        self.redis = redis_client
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+        self._local: "OrderedDict[str, Dict]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.redis_errors = 0
+
+    @classmethod
+    def from_env(cls, redis_client=None) -> "AnalysisCache":
+        use_redis = os.getenv("ANALYSIS_CACHE_REDIS", "true").lower() == "true"
+
+        return cls(
+            redis_client=redis_client if use_redis else None,
+            max_entries=int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 10000)),
+            ttl_seconds=int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", 86400)),
+            prefix=os.getenv("REDIS_CACHE_PREFIX", "sentiment_cache"),
+        )
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Fold Unicode forms and whitespace runs so trivially
+        different copies of a post share an entry
+        """
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def key(self, model_name: str, text: str) -> str:
+        digest = hashlib.sha256(self.normalize(text).encode("utf-8")).hexdigest()
+        return f"{self.prefix}:{model_name}:{digest}"
+
+    def _remember(self, key: str, result: Dict):
+        if self.max_entries <= 0:
+            return
+
+        self._local[key] = result
+        self._local.move_to_end(key)
+
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, model_name: str, text: str) -> Optional[Dict]:
+        key = self.key(model_name, text)
+
+        result = self._local.get(key)
+        if result is not None:
+            self._local.move_to_end(key)
+            self.local_hits += 1
+            return dict(result)
+
+        if self.redis is not None:
+            try:
+                cached = await self.redis.get(key)
+            except Exception:
+                self.redis_errors += 1
+                cached = None
+
+            if cached:
+                result = json.loads(cached)
+                self._remember(key, result)
+                self.redis_hits += 1
+                return dict(result)
+
+        self.misses += 1
+        return None
+
+    async def set(self, model_name: str, text: str, result: Dict):
+        key = self.key(model_name, text)
+        self._remember(key, dict(result))
+
+        if self.redis is not None:
+            try:
+                await self.redis.setex(key, self.ttl_seconds, json.dumps(result))
+            except Exception:
+                self.redis_errors += 1
+
+    async def get_or_compute(
+        self,
+        model_name: str,
+        text: str,
+        compute: Callable[[str], Awaitable[Dict]],
+    ) -> Dict:
+        """
+        Return the cached result or compute and store it
+
+        Concurrent misses for the same key share one computation.
+        A result carrying ``"cacheable": False`` is returned but not stored.
+        """
+        key = self.key(model_name, text)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return dict(await asyncio.shield(pending))
+
+        result = await self.get(model_name, text)
+        if result is not None:
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            result = await compute(text)
+            cacheable = result.pop("cacheable", True)
+            if cacheable:
+                await self.set(model_name, text, result)
+            future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; don't warn about it
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+        return dict(result)
+
+    def stats(self) -> Dict:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        hits = self.local_hits + self.redis_hits
+
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "local_size": len(self._local),
+            "local_capacity": self.max_entries,
+            "evictions": self.evictions,
+            "redis_errors": self.redis_errors,
+        }
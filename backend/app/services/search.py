@@ -0,0 +1,129 @@
+import os
+from typing import List
+
+from sqlalchemy import func, literal_column, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+SEARCH_CONFIG = os.getenv("POST_SEARCH_CONFIG", "english")
+
+# Generated column kept outside the ORM model: it only exists on
+# PostgreSQL, and create_all must still work for SQLite runs
+search_vector = literal_column("social_media_posts.search_vector", type_=TSVECTOR)
+
+
+SEARCH_COLUMN_EXISTS = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = to_regclass('social_media_posts')
+        AND attname = 'search_vector' AND NOT attisdropped
+    )
+"""
+INDEX_EXISTS = "SELECT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = :name)"
+EXTENSION_EXISTS = "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = :name)"
+
+
+def _exists(connection, query: str, **params) -> bool:
+    return bool(connection.scalar(text(query), params))
+
+
+def schema_statements(connection, trigram: bool = False) -> List[str]:
+    """
+    DDL for post search (PostgreSQL 12+) that this database still needs
+
+    Each object is looked up in the catalogs first, so nothing already
+    in place takes a lock. Adding the stored column rewrites
+    social_media_posts under an ACCESS EXCLUSIVE lock; run it at a
+    quiet time on a large table. Indexes are built CONCURRENTLY.
+    """
+    statements = []
+
+    if not _exists(connection, SEARCH_COLUMN_EXISTS):
+        statements.append(f"""
+        ALTER TABLE social_media_posts
+        ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('{SEARCH_CONFIG}', coalesce(content, ''))
+        ) STORED
+        """)
+
+    if not _exists(connection, INDEX_EXISTS, name="ix_social_media_posts_search_vector"):
+        statements.append("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_social_media_posts_search_vector
+        ON social_media_posts USING gin (search_vector)
+        """)
+
+    if trigram:
+        if not _exists(connection, EXTENSION_EXISTS, name="pg_trgm"):
+            statements.append("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        if not _exists(connection, INDEX_EXISTS, name="ix_social_media_posts_content_trgm"):
+            statements.append("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_social_media_posts_content_trgm
+            ON social_media_posts USING gin (content gin_trgm_ops)
+            """)
+
+    return statements
+
+
+def ensure_search_schema(connection, trigram: bool = False) -> int:
+    """
+    Create the search column and indexes if missing
+
+    A one-off (python worker.py migrate), not a startup step. connection
+    must be in autocommit mode: CREATE INDEX CONCURRENTLY can't run
+    inside a transaction.
+
+    Returns:
+        statements run; 0 on databases other than PostgreSQL
+    """
+    if connection.dialect.name != "postgresql":
+        return 0
+
+    statements = schema_statements(connection, trigram)
+    for statement in statements:
+        connection.execute(text(statement))
+    return len(statements)
+
+
+class SearchColumnCheck:
+    """
+    Whether search_vector exists yet, so full-text queries can fail
+    with a clear 503 until the migration has run
+
+    A positive answer is kept for the life of the process; until then
+    every call costs one catalog lookup.
+    """
+
+    def __init__(self):
+        self.ready = False
+
+    async def __call__(self, session) -> bool:
+        if not self.ready and session.bind.dialect.name == "postgresql":
+            self.ready = bool(await session.scalar(text(SEARCH_COLUMN_EXISTS)))
+        return self.ready
+
+
+search_column_ready = SearchColumnCheck()
+
+
+def text_query(q: str):
+    """
+    websearch_to_tsquery: quoted phrases, OR and -exclusions, and
+    never a syntax error on user input
+    """
+    return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+
+def search_rank(q: str):
+    return func.ts_rank_cd(search_vector, text_query(q))
+
+
+def matches(q: str):
+    return search_vector.op("@@")(text_query(q))
+
+
+def substring_pattern(q: str) -> str:
+    """
+    ILIKE pattern matching q literally anywhere in the content
+    """
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
@@ -1,10 +1,43 @@
 import os
 import asyncio
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-from transformers import pipeline
 from transformers.pipelines.base import PipelineException
 
+from app.services.batching import MicroBatcher
+from app.services.inference_executor import InferenceExecutor
+from app.services.model_backends import backend_from_env, load_pipeline
+from app.services.result_cache import AnalysisCache
+
+
+def _run_pipeline(model_pipeline, texts: List[str]) -> List[List[Dict]]:
+    """
+    Run one forward pass over a whole batch of texts
+    """
+    return model_pipeline(texts, batch_size=len(texts), truncation=True)
+
+
+# Pipelines owned by a process-pool worker, loaded by its initializer
+_process_pipelines = {}
+
+
+def _load_process_pipelines(
+    sentiment_model_name: str,
+    sentiment_backend: str,
+    emotion_model_name: str,
+    emotion_backend: str,
+):
+    _process_pipelines["sentiment"] = load_pipeline(
+        sentiment_model_name, sentiment_backend
+    )
+    _process_pipelines["emotion"] = load_pipeline(
+        emotion_model_name, emotion_backend
+    )
+
+
+def _run_process_pipeline(kind: str, texts: List[str]) -> List[List[Dict]]:
+    return _run_pipeline(_process_pipelines[kind], texts)
+
 
 class SentimentAnalyzer:
     """
@@ -12,15 +45,25 @@ class SentimentAnalyzer:
     using Hugging Face transformer models (local).
     """
 
-    def __init__(self, model_type: str = "local", model_name: str = None):
+    def __init__(
+        self,
+        model_type: str = "local",
+        model_name: str = None,
+        executor: Optional[InferenceExecutor] = None,
+        cache: Optional[AnalysisCache] = None,
+    ):
         """
         Initialize sentiment analyzer
 
         Args:
             model_type: 'local' or 'external' (external stub for later)
             model_name: optional override for sentiment model
+            executor: where forward passes run; built from
+                INFERENCE_EXECUTOR / INFERENCE_WORKERS if omitted
+            cache: optional result cache consulted before inference
         """
         self.model_type = model_type
+        self.cache = cache
 
         if model_type != "local":
             raise NotImplementedError("External LLM support will be added later")
@@ -38,40 +81,106 @@ class SentimentAnalyzer:
             "EMOTION_MODEL", "j-hartmann/emotion-english-distilroberta-base"
         )
 
-        # Load pipelines (cached automatically by HF)
-        self.sentiment_pipeline = pipeline(
-            "text-classification",
-            model=self.sentiment_model_name,
-            return_all_scores=True,
+        # pytorch (fp32), quantized (int8) or onnx, per model
+        self.sentiment_backend = backend_from_env("HUGGINGFACE_MODEL_BACKEND")
+        self.emotion_backend = backend_from_env("EMOTION_MODEL_BACKEND")
+
+        self.executor = executor or InferenceExecutor.from_env(
+            initializer=_load_process_pipelines,
+            initargs=(
+                self.sentiment_model_name,
+                self.sentiment_backend,
+                self.emotion_model_name,
+                self.emotion_backend,
+            ),
         )
 
-        self.emotion_pipeline = pipeline(
-            "text-classification",
-            model=self.emotion_model_name,
-            return_all_scores=True,
+        # With a process pool the models live in the pool workers only
+        self.sentiment_pipeline = None
+        self.emotion_pipeline = None
+
+        if self.executor.backend != "process":
+            self.sentiment_pipeline = load_pipeline(
+                self.sentiment_model_name, self.sentiment_backend
+            )
+            self.emotion_pipeline = load_pipeline(
+                self.emotion_model_name, self.emotion_backend
+            )
+
+        # Concurrent callers share forward passes through these batchers
+        max_batch_size = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", 16))
+        max_wait_ms = float(os.getenv("INFERENCE_MAX_WAIT_MS", 5))
+
+        self._sentiment_batcher = MicroBatcher(
+            self._run_sentiment_batch, max_batch_size, max_wait_ms
+        )
+        self._emotion_batcher = MicroBatcher(
+            self._run_emotion_batch, max_batch_size, max_wait_ms
         )
 
-    async def analyze_sentiment(self, text: str) -> Dict:
+    async def _run_batch(
+        self, kind: str, model_pipeline, texts: List[str]
+    ) -> List[List[Dict]]:
+        if self.executor.backend == "process":
+            return await self.executor.run(_run_process_pipeline, kind, texts)
+
+        return await self.executor.run(_run_pipeline, model_pipeline, texts)
+
+    async def _run_sentiment_batch(self, texts: List[str]) -> List[List[Dict]]:
+        return await self._run_batch("sentiment", self.sentiment_pipeline, texts)
+
+    async def _run_emotion_batch(self, texts: List[str]) -> List[List[Dict]]:
+        return await self._run_batch("emotion", self.emotion_pipeline, texts)
+
+    @staticmethod
+    def _prepare(text: str) -> Optional[str]:
         """
-        Analyze sentiment of input text
+        Validate and clean text once for both models
+
+        Returns None for text too short to be worth a forward pass
         """
         if text is None or not text.strip():
             raise ValueError("Text cannot be empty")
 
-        if len(text.strip()) < 10:
+        text = text.strip()
+        if len(text) < 10:
+            return None
+
+        return text
+
+    async def _cached(self, model_name: str, text: str, compute) -> Dict:
+        # model_name is "<model>@<backend>": quantized and ONNX results
+        # differ slightly from fp32, so backends never share entries
+        if self.cache is not None:
+            return await self.cache.get_or_compute(model_name, text, compute)
+
+        result = await compute(text)
+        result.pop("cacheable", None)
+        return result
+
+    async def _sentiment_for(self, text: Optional[str]) -> Dict:
+        if text is None:
             return {
                 "sentiment_label": "neutral",
                 "confidence_score": 0.5,
                 "model_name": self.sentiment_model_name,
             }
 
+        return await self._cached(
+            f"{self.sentiment_model_name}@{self.sentiment_backend}",
+            text,
+            self._classify_sentiment,
+        )
+
+    async def _classify_sentiment(self, text: str) -> Dict:
         try:
-            results = self.sentiment_pipeline(text)[0]
+            results = await self._sentiment_batcher.submit(text)
         except PipelineException:
             return {
                 "sentiment_label": "neutral",
                 "confidence_score": 0.0,
                 "model_name": self.sentiment_model_name,
+                "cacheable": False,
             }
 
         # Find strongest label
@@ -87,21 +196,22 @@ class SentimentAnalyzer:
             "model_name": self.sentiment_model_name,
         }
 
-    async def analyze_emotion(self, text: str) -> Dict:
-        """
-        Detect primary emotion in text
-        """
-        if text is None or not text.strip():
-            raise ValueError("Text cannot be empty")
-
-        if len(text.strip()) < 10:
+    async def _emotion_for(self, text: Optional[str]) -> Dict:
+        if text is None:
             return {
                 "emotion": "neutral",
                 "confidence_score": 0.5,
                 "model_name": self.emotion_model_name,
             }
 
-        results = self.emotion_pipeline(text)[0]
+        return await self._cached(
+            f"{self.emotion_model_name}@{self.emotion_backend}",
+            text,
+            self._classify_emotion,
+        )
+
+    async def _classify_emotion(self, text: str) -> Dict:
+        results = await self._emotion_batcher.submit(text)
         best = max(results, key=lambda x: x["score"])
 
         emotion = best["label"].lower()
@@ -124,9 +234,71 @@ class SentimentAnalyzer:
             "model_name": self.emotion_model_name,
         }
 
+    async def analyze_sentiment(self, text: str) -> Dict:
+        """
+        Analyze sentiment of input text
+        """
+        return await self._sentiment_for(self._prepare(text))
+
+    async def analyze_emotion(self, text: str) -> Dict:
+        """
+        Detect primary emotion in text
+        """
+        return await self._emotion_for(self._prepare(text))
+
+    async def analyze(self, text: str) -> Dict:
+        """
+        Run sentiment and emotion analysis on the same text
+
+        Both models run concurrently, so latency is that of
+        the slower model rather than the sum of the two
+
+        Returns:
+            {"sentiment": {...}, "emotion": {...}} with the same
+            shapes as analyze_sentiment / analyze_emotion
+        """
+        prepared = self._prepare(text)
+
+        sentiment, emotion = await asyncio.gather(
+            self._sentiment_for(prepared),
+            self._emotion_for(prepared),
+        )
+
+        return {"sentiment": sentiment, "emotion": emotion}
+
+    async def analyze_many(self, texts: List[str]) -> List[Dict]:
+        """
+        Combined analysis for many texts, batched across both models
+
+        Empty texts get neutral results instead of raising
+        """
+        if not texts:
+            return []
+
+        async def analyze_or_neutral(text: str) -> Dict:
+            if not text or not text.strip():
+                return {
+                    "sentiment": {
+                        "sentiment_label": "neutral",
+                        "confidence_score": 0.0,
+                        "model_name": self.sentiment_model_name,
+                    },
+                    "emotion": {
+                        "emotion": "neutral",
+                        "confidence_score": 0.0,
+                        "model_name": self.emotion_model_name,
+                    },
+                }
+            return await self.analyze(text)
+
+        return await asyncio.gather(*[analyze_or_neutral(t) for t in texts])
+
     async def batch_analyze(self, texts: List[str]) -> List[Dict]:
         """
         Analyze multiple texts efficiently
+
+        Texts are submitted together, so the batcher groups them
+        into as few forward passes as max batch size allows
         """
         if not texts:
             return []
@@ -148,3 +320,11 @@ class SentimentAnalyzer:
                 tasks.append(self.analyze_sentiment(text))
 
         return await asyncio.gather(*tasks)
+
+    async def close(self):
+        """
+        Stop background batching tasks and the inference executor
+        """
+        await self._sentiment_batcher.close()
+        await self._emotion_batcher.close()
+        self.executor.shutdown()
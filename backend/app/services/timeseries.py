@@ -0,0 +1,167 @@
+import os
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, literal_column, select
+
+from app.models.sentiment_rollup import SentimentMinuteRollup
+from app.models.social_media_post import SocialMediaPost
+from app.models.sentiment_analysis import LABELS, SentimentAnalysis
+
+# Supported bucket widths, narrowest first
+INTERVALS = {
+    "1m": 60,
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "30m": 30 * 60,
+    "1h": 60 * 60,
+    "3h": 3 * 60 * 60,
+    "6h": 6 * 60 * 60,
+    "12h": 12 * 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+
+MAX_POINTS = int(os.getenv("TIMESERIES_MAX_POINTS", 300))
+
+# date_bin origin; buckets line up on multiples of the width from here
+ORIGIN = datetime(2000, 1, 1)
+
+
+def pick_interval(hours: int, requested: Optional[str] = None,
+                  max_points: int = MAX_POINTS) -> str:
+    """
+    The requested interval, or the narrowest one that keeps the window
+    within max_points buckets when it is missing or too fine
+    """
+    window = hours * 3600
+
+    def points(seconds):
+        # A window that doesn't start on a boundary spans one extra bucket
+        return math.ceil(window / seconds) + 1
+
+    if requested is not None and points(INTERVALS[requested]) <= max_points:
+        return requested
+
+    for name, seconds in INTERVALS.items():
+        if points(seconds) <= max_points:
+            return name
+    return "1d"
+
+
+def bucket_start(moment: datetime, width: int) -> datetime:
+    """
+    Python twin of date_bin(width, moment, ORIGIN)
+    """
+    offset = int((moment - ORIGIN).total_seconds()) // width * width
+    return ORIGIN + timedelta(seconds=offset)
+
+
+def timeseries_query(start: datetime, width: int, source: Optional[str],
+                     from_rollup: bool = True):
+    """
+    Counts per (bucket, sentiment, emotion), binned by PostgreSQL
+
+    Reads the minute rollup by default; from_rollup=False aggregates the
+    raw posts/analyses join instead (e.g. before a rollup backfill).
+    """
+    if from_rollup:
+        moment = SentimentMinuteRollup.bucket
+        count = func.sum(SentimentMinuteRollup.count)
+        label = SentimentMinuteRollup.sentiment_label
+        emotion = SentimentMinuteRollup.emotion
+        source_column = SentimentMinuteRollup.source
+    else:
+        moment = SocialMediaPost.created_at
+        count = func.count()
+        label = SentimentAnalysis.sentiment_label
+        emotion = SentimentAnalysis.emotion
+        source_column = SocialMediaPost.source
+
+    # Minute rows are already minute buckets
+    if from_rollup and width == 60:
+        bucket = moment
+    else:
+        # Literals rather than bind parameters, so PostgreSQL sees the
+        # SELECT and GROUP BY expressions as the same one
+        bucket = func.date_bin(
+            literal_column(f"interval '{int(width)} seconds'"),
+            moment,
+            literal_column(f"timestamp '{ORIGIN.isoformat(sep=' ')}'"),
+        )
+
+    stmt = (
+        select(bucket.label("bucket"), label, emotion, count)
+        .where(moment >= start)
+        .group_by(bucket, label, emotion)
+    )
+
+    if not from_rollup:
+        stmt = stmt.select_from(SocialMediaPost).join(
+            SentimentAnalysis,
+            SocialMediaPost.post_id == SentimentAnalysis.post_id
+        )
+
+    if source:
+        stmt = stmt.where(source_column == source)
+
+    return stmt
+
+
+def build_points(rows, start: datetime, end: datetime, width: int) -> List[Dict]:
+    """
+    One point per bucket from start to end, zero-filled, so the size
+    depends only on the window and interval
+    """
+    points: Dict[datetime, Dict] = {}
+    moment = bucket_start(start, width)
+    while moment <= end:
+        points[moment] = {
+            "timestamp": moment.isoformat() + "Z",
+            "sentiment": dict.fromkeys(LABELS, 0),
+            "emotions": {},
+            "total": 0,
+        }
+        moment += timedelta(seconds=width)
+
+    for bucket, label, emotion, count in rows:
+        point = points.get(bucket_start(bucket, width))
+        if point is None:
+            continue
+
+        count = int(count)
+        point["sentiment"][label] = point["sentiment"].get(label, 0) + count
+        if emotion:
+            point["emotions"][emotion] = point["emotions"].get(emotion, 0) + count
+        point["total"] += count
+
+    return list(points.values())
+
+
+async def sentiment_timeseries(
+    session,
+    hours: int,
+    interval: Optional[str] = None,
+    source: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict:
+    now = now or datetime.utcnow()
+    chosen = pick_interval(hours, interval)
+    width = INTERVALS[chosen]
+
+    start = bucket_start(now - timedelta(hours=hours), width)
+    from_rollup = os.getenv("TIMESERIES_FROM_ROLLUP", "true").lower() == "true"
+
+    rows = (
+        await session.execute(timeseries_query(start, width, source, from_rollup))
+    ).all()
+
+    return {
+        "timeframe_hours": hours,
+        "source": source,
+        "interval": chosen,
+        "requested_interval": interval,
+        "interval_seconds": width,
+        "points": build_points(rows, start, now, width),
+        "generated_at": now.isoformat() + "Z",
+    }
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from app.services.alert_rules import AlertRule, AlertRuleEngine, AlertRuleRegistry
+
+
+def event(label, source="twitter", content="", emotion="anger"):
+    return {
+        "sentiment_label": label,
+        "source": source,
+        "content": content,
+        "emotion": emotion,
+    }
+
+
+def test_rules_sharing_a_filter_share_one_counter():
+    registry = AlertRuleRegistry([
+        AlertRule("twitter_ratio", source="twitter", threshold=1.0, min_posts=1),
+        AlertRule("twitter_volume", source="twitter", metric="volume",
+                  threshold=100, min_posts=1),
+        AlertRule("reddit_ratio", source="reddit", threshold=1.0, min_posts=1),
+    ])
+    engine = AlertRuleEngine(registry, service=object())
+
+    engine.observe(event("negative"), 0)
+    engine.observe(event("negative", source="reddit"), 0)
+
+    assert len(registry.groups) == 2
+    assert len(engine.counters) == 2
+    twitter = engine.counters[(("twitter", None, None), 5)]
+    assert twitter.counts["negative"] == 1
+
+
+def test_keyword_rules_match_whole_words_and_phrases():
+    registry = AlertRuleRegistry([
+        AlertRule("acme", keyword="Acme", metric="volume", threshold=1, min_posts=1),
+        AlertRule("acme_phone", keyword="acme  phone", metric="volume",
+                  threshold=1, min_posts=1),
+    ])
+    engine = AlertRuleEngine(registry, service=object())
+
+    engine.observe(event("negative", content="My ACME phone broke"), 0)
+    engine.observe(event("negative", content="acmeville is nice"), 0)
+    engine.observe(event("positive", content="acme support was fine"), 0)
+
+    alerts = {alert["alert_type"]: alert for alert in engine.evaluate(1)}
+    assert alerts["acme"]["actual_ratio"] == 2
+    assert "acme_phone" not in alerts
+    assert alerts["acme"]["metrics"]["keyword"] == "acme"
+
+
+def test_keywords_match_on_token_boundaries():
+    registry = AlertRuleRegistry([
+        AlertRule("prime", keyword="Amazon-Prime"),
+        AlertRule("shop", keyword="amazon.com"),
+        AlertRule("net", keyword="net"),
+        AlertRule("net_zero", keyword="net zero"),
+    ])
+    assert registry.rules["prime"].keyword == "amazon prime"
+
+    assert registry.keywords_in("Cancelled amazon-prime today") == {"amazon prime"}
+    assert registry.keywords_in("ordered from Amazon.com, again") == {"amazon com"}
+    assert registry.keywords_in("netflix and a cabinet") == set()
+    assert registry.keywords_in("a netzero pledge") == set()
+    assert registry.keywords_in("net-zero by 2040") == {"net", "net zero"}
+    assert registry.keywords_in("zero net gains") == {"net"}
+    assert registry.keywords_in("amazon prime video, amazon") == {"amazon prime"}
+
+
+def test_keyword_without_words_is_rejected():
+    with pytest.raises(ValueError):
+        AlertRule("dashes", keyword="--")
+
+
+def test_sustained_breach_alerts_once_per_cooldown():
+    rule = AlertRule("negative_anger", emotion="anger", threshold=1.5,
+                     window_minutes=1, min_posts=4, cooldown_seconds=300)
+    engine = AlertRuleEngine(AlertRuleRegistry([rule]), service=object())
+
+    engine.observe(event("positive"), 0)
+    for second in range(1, 6):
+        engine.observe(event("negative"), second)
+    # Other emotions are not counted by this rule
+    engine.observe(event("positive", emotion="joy"), 5)
+
+    assert len(engine.evaluate(10)) == 1
+    for second in range(11, 60):
+        engine.observe(event("negative"), second)
+        engine.observe(event("positive"), second)
+        engine.observe(event("negative"), second)
+        assert engine.evaluate(second) == []
+    assert engine.suppressed > 0
+
+    for second in range(300, 320):
+        engine.observe(event("negative"), second)
+        engine.observe(event("negative"), second)
+        engine.observe(event("positive"), second)
+    assert len(engine.evaluate(320)) == 1
+
+
+def test_registry_from_file_and_remove(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([
+        {"name": "a", "keyword": "acme"},
+        {"name": "b", "keyword": "globex", "window_minutes": 15},
+    ]))
+    registry = AlertRuleRegistry.from_file(str(path))
+    assert registry.keywords_in("Acme and Globex") == {"acme", "globex"}
+
+    registry.remove("b")
+    assert len(registry) == 1
+    assert registry.keywords_in("Acme and Globex") == {"acme"}
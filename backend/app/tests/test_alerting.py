@@ -0,0 +1,51 @@
+from app.services.alerting import AlertService, StreamingAlertEvaluator
+from app.services.broadcast import RingCounter
+
+
+def test_sliding_window_expires_old_seconds():
+    counter = RingCounter(10, 1)
+    counter.add("negative", 100.0)
+    counter.add("negative", 105.5)
+    counter.add("positive", 109.9)
+    assert counter.counts == {"positive": 1, "negative": 2, "neutral": 0}
+
+    counter.advance(110.0)
+    assert counter.counts["negative"] == 1
+
+    # A gap longer than the window empties it
+    counter.advance(500.0)
+    assert counter.total == 0
+
+
+def make_evaluator(monkeypatch):
+    monkeypatch.setenv("ALERT_NEGATIVE_RATIO_THRESHOLD", "2.0")
+    monkeypatch.setenv("ALERT_WINDOW_MINUTES", "1")
+    monkeypatch.setenv("ALERT_MIN_POSTS", "4")
+    return StreamingAlertEvaluator(AlertService())
+
+
+def test_alert_fires_once_per_crossing(monkeypatch):
+    evaluator = make_evaluator(monkeypatch)
+    fired = []
+
+    def feed(label, now):
+        alert = evaluator.observe({"sentiment_label": label}, now)
+        if alert:
+            fired.append((now, alert))
+
+    feed("positive", 0)
+    for second in range(1, 10):
+        feed("negative", second)
+
+    assert len(fired) == 1
+    assert fired[0][0] == 3
+    assert fired[0][1]["actual_ratio"] == 3.0
+    assert fired[0][1]["metrics"]["total_count"] == 4
+
+    # Ratio recovers, re-arms, then breaches again
+    for second in range(10, 20):
+        feed("positive", second)
+    for second in range(20, 60):
+        feed("negative", second)
+
+    assert len(fired) == 2
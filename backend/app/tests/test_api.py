@@ -1,12 +1,53 @@
 from fastapi.testclient import TestClient
+from app.api.dependencies import get_db, get_redis
 from app.main import app
 
 client = TestClient(app)
 
+
+class FakeSession:
+    def __init__(self, up=True):
+        self.up = up
+
+    async def execute(self, statement):
+        if not self.up:
+            raise ConnectionError("database is down")
+
+
+class FakeRedis:
+    def __init__(self, up=True):
+        self.up = up
+
+    async def ping(self):
+        if not self.up:
+            raise ConnectionError("redis is down")
+        return True
+
+
+def get_health(db_up=True, redis_up=True):
+    async def session():
+        yield FakeSession(db_up)
+
+    app.dependency_overrides[get_db] = session
+    app.dependency_overrides[get_redis] = lambda: FakeRedis(redis_up)
+    try:
+        return client.get("/api/health")
+    finally:
+        app.dependency_overrides.clear()
+
+
 def test_health_endpoint():
-    r = client.get("/api/health")
+    r = get_health()
     assert r.status_code == 200
     assert "status" in r.json()
+    assert r.json()["status"] == "healthy"
+
+def test_health_endpoint_is_503_when_a_dependency_is_down():
+    for db_up, redis_up in ((False, True), (True, False)):
+        r = get_health(db_up, redis_up)
+        assert r.status_code == 503
+        assert r.json()["status"] == "unhealthy"
+    assert r.json()["services"] == {"database": "connected", "redis": "disconnected"}
 
 def test_posts_endpoint():
     r = client.get("/api/posts?limit=1")
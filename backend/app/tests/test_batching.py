@@ -0,0 +1,52 @@
+import asyncio
+
+from app.services.batching import MicroBatcher
+
+
+def test_concurrent_submissions_share_a_batch():
+    calls = []
+
+    async def batch_fn(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(5)])
+        await batcher.close()
+        return results
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+
+
+def test_batches_are_capped_at_max_size():
+    sizes = []
+
+    async def batch_fn(items):
+        sizes.append(len(items))
+        return items
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=20)
+        await asyncio.gather(*[batcher.submit(i) for i in range(10)])
+        await batcher.close()
+
+    asyncio.run(run())
+    assert sizes == [4, 4, 2]
+
+
+def test_batch_errors_reach_every_caller():
+    async def batch_fn(items):
+        raise RuntimeError("model failed")
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=1)
+        results = await asyncio.gather(
+            batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+        )
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,79 @@
+import asyncio
+
+from app.services.broadcast import RingCounter, SentimentBroadcaster
+
+
+def test_ring_counter_windows():
+    ring = RingCounter(60, 1)
+    ring.add("positive", 1000.0)
+    ring.add("negative", 1030.5)
+    ring.add("negative", 1059.9)
+
+    assert ring.totals(1059.9)["total"] == 3
+    assert ring.totals(1059.9, span=30)["negative"] == 2
+    # 1000 has rolled out of the 60s window, and its slot is reused
+    ring.add("neutral", 1060.0)
+    assert ring.totals(1060.0) == {
+        "positive": 0, "negative": 2, "neutral": 1, "total": 3
+    }
+
+
+def test_late_events_count_in_their_own_slot():
+    ring = RingCounter(10, 1)
+    ring.add("positive", 100.0)
+    ring.add("negative", 95.0)
+    # Older than the ring: already expired
+    ring.add("negative", 90.0)
+    assert ring.counts == {"positive": 1, "negative": 1, "neutral": 0}
+
+    # 95 leaves the window before 100 does
+    assert ring.totals(105.0)["negative"] == 0
+    assert ring.total == 1
+
+
+def test_unknown_labels_are_ignored():
+    ring = RingCounter(10, 1)
+    ring.add("ecstatic", 5.0)
+    assert ring.totals(5.0)["total"] == 0
+
+
+class SlowSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+
+    async def send_text(self, frame):
+        await asyncio.sleep(3600)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+class FastSocket(SlowSocket):
+    async def send_text(self, frame):
+        self.sent.append(frame)
+
+
+def test_one_frame_fans_out_and_slow_clients_are_dropped():
+    hub = SentimentBroadcaster(redis_client=None, queue_size=2)
+
+    async def run():
+        slow, fast = SlowSocket(), FastSocket()
+        await hub.register(slow)
+        await hub.register(fast)
+
+        hub.record({"sentiment_label": "positive"})
+        for _ in range(4):
+            hub.broadcast(hub.frame())
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        return slow, fast
+
+    slow, fast = asyncio.run(run())
+    assert len(fast.sent) == 4
+    assert '"positive": 1' in fast.sent[0]
+    assert slow.closed_with == 1013
+    assert hub.stats()["clients"] == 1
+    assert hub.stats()["dropped_clients"] == 1
+    # Finished drop tasks aren't kept around
+    assert not hub._drops
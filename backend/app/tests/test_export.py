@@ -0,0 +1,37 @@
+import io
+from datetime import datetime
+
+import pytest
+
+from app.services.export import FIELDS, CSVEncoder, NDJSONEncoder, encoder_for
+
+ROW = (
+    "p1", "reddit", 'says "hi", twice', "alice", datetime(2024, 1, 1, 12),
+    "positive", 0.91, "joy", "m", datetime(2024, 1, 1, 12, 0, 1),
+)
+
+
+def test_ndjson_rows_are_flat_objects():
+    out = NDJSONEncoder().encode([ROW, ROW]).decode()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert '"created_at": "2024-01-01T12:00:00"' in lines[0]
+
+
+def test_csv_header_then_quoted_rows():
+    encoder = CSVEncoder()
+    out = (encoder.header() + encoder.encode([ROW])).decode()
+    header, row = out.splitlines()
+    assert header.split(",") == FIELDS
+    assert row.startswith('p1,reddit,"says ""hi"", twice",alice,2024-01-01T12:00:00')
+
+
+def test_arrow_stream_round_trips():
+    pa = pytest.importorskip("pyarrow")
+
+    encoder = encoder_for("arrow")
+    data = encoder.header() + encoder.encode([ROW]) + encoder.encode([ROW]) + encoder.footer()
+
+    table = pa.ipc.open_stream(io.BytesIO(data)).read_all()
+    assert table.num_rows == 2
+    assert table.column("confidence_score").to_pylist() == [0.91, 0.91]
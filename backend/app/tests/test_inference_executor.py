@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.inference_executor import InferenceExecutor
+
+
+def test_thread_backend_runs_off_the_event_loop():
+    executor = InferenceExecutor(backend="thread", max_workers=1)
+
+    async def run():
+        return await executor.run(threading.get_ident)
+
+    try:
+        assert asyncio.run(run()) != threading.get_ident()
+    finally:
+        executor.shutdown()
+
+
+def test_pending_calls_are_bounded():
+    executor = InferenceExecutor(backend="thread", max_workers=2, max_pending=2)
+    peak = []
+
+    async def run():
+        async def call():
+            await executor.run(time.sleep, 0.02)
+
+        async def watch():
+            for _ in range(10):
+                peak.append(executor.pending)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(watch(), *[call() for _ in range(6)])
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert max(peak) == 2
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        InferenceExecutor(backend="gpu")
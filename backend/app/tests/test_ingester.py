@@ -0,0 +1,195 @@
+import asyncio
+import gzip
+import json
+import os
+import random
+import sys
+from itertools import islice
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "ingester"))
+
+from ingester import CorpusReplay, DataIngester, LoadProfile, TokenBucket  # noqa: E402
+
+
+class FakeClock:
+    """
+    Monotonic clock moved by hand, or by step on every read
+    """
+
+    def __init__(self, step: float = 0.0):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self) -> float:
+        self.now += self.step
+        return self.now
+
+
+class CountingIngester(DataIngester):
+    def __init__(self):
+        super().__init__(redis_client=None, stream_name="test")
+        self.published = []
+
+    async def publish_batch(self, posts):
+        self.published.extend(posts)
+        return len(posts)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"rate": 0},
+    {"burst_rate": 0},
+    {"burst_period": 0},
+    {"burst_seconds": -1},
+    {"profile": "sawtooth"},
+])
+def test_invalid_profiles_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        LoadProfile(**kwargs)
+
+
+def test_arrival_counts():
+    steady = LoadProfile("steady", rate=100)
+    assert steady.arrivals(0, 1) == 100
+    assert sum(steady.arrivals(i / 30, (i + 1) / 30) for i in range(30)) == 100
+
+    burst = LoadProfile("burst", rate=10, burst_rate=100, burst_seconds=1, burst_period=10)
+    assert burst.arrivals(0, 1) == 100
+    assert burst.arrivals(1, 10) == 90
+    assert burst.arrivals(0, 30) == 3 * 190
+    assert burst.peak_rate == 100
+
+    poisson = LoadProfile("poisson", rate=50, rng=random.Random(7))
+    # Mean 5000, standard deviation ~71
+    assert 4700 < poisson.arrivals(0, 100) < 5300
+
+
+def test_bucket_catches_up_after_oversleep():
+    clock = FakeClock()
+    bucket = TokenBucket(LoadProfile("steady", rate=100), capacity=1000, clock=clock)
+
+    async def run():
+        clock.now += 0.25
+        first = await bucket.take(500)
+        # A sleep that overshoots by half a second owes 50 posts at once
+        clock.now += 0.5
+        return first, await bucket.take(500)
+
+    assert asyncio.run(run()) == (25, 50)
+    assert (bucket.tokens, bucket.dropped) == (0, 0)
+
+
+def test_bucket_counts_arrivals_beyond_capacity_as_dropped():
+    clock = FakeClock()
+    bucket = TokenBucket(LoadProfile("steady", rate=100), capacity=10, clock=clock)
+
+    clock.now += 0.5
+    bucket.refill()
+    assert (bucket.tokens, bucket.dropped) == (10, 40)
+
+    async def take():
+        return await bucket.take(4)
+
+    assert asyncio.run(take()) == 4
+    clock.now += 0.5
+    bucket.refill()
+    assert (bucket.tokens, bucket.dropped) == (10, 86)
+
+
+def test_run_load_stops_after_total():
+    ingester = CountingIngester()
+    result = asyncio.run(ingester.run_load(
+        LoadProfile("steady", rate=1000), total=120, batch_size=25,
+        concurrency=3, clock=FakeClock(step=0.001),
+    ))
+
+    assert result["published"] == len(ingester.published) == 120
+    assert len({post["post_id"] for post in ingester.published}) == 120
+    assert result["batches"] >= 120 // 25
+
+
+def test_run_load_stops_after_duration():
+    profile = LoadProfile("steady", rate=1000)
+    result = asyncio.run(CountingIngester().run_load(
+        profile, duration_seconds=0.5, batch_size=50,
+        concurrency=2, clock=FakeClock(step=0.001),
+    ))
+
+    assert result["elapsed_seconds"] >= 0.5
+    # Never ahead of the schedule, and not far behind it
+    assert 0 < result["published"] <= profile.expected(result["elapsed_seconds"])
+    assert result["published"] >= profile.expected(0.5) * 0.9
+    assert result["dropped"] == 0
+
+
+def write_lines(path, lines, compress=False):
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def test_replay_maps_columns_and_counts_skipped_rows(tmp_path):
+    path = tmp_path / "posts.jsonl"
+    write_lines(path, [
+        json.dumps({"text": "first", "platform": "reddit", "username": "ann",
+                    "timestamp": "2024-01-01T00:00:00Z"}),
+        # Nested user object: the scalar username column is used instead
+        json.dumps({"content": "second", "user": {"name": "bob"}, "username": "bob",
+                    "created_at": 1704067260000}),
+        json.dumps({"content": "", "body": "third", "user": "cy", "date": 1704067320}),
+        json.dumps({"content": "   "}),
+        json.dumps({"author": "no content"}),
+        "not json",
+        json.dumps(["a", "list"]),
+        "",
+    ])
+    corpus = CorpusReplay(str(path))
+
+    posts = list(corpus.posts())
+    assert [fields for _, fields in posts] == [
+        {"source": "reddit", "content": "first", "author": "ann"},
+        {"source": "replay", "content": "second", "author": "bob"},
+        {"source": "replay", "content": "third", "author": "cy"},
+    ]
+    # Epoch milliseconds and seconds agree with the ISO timestamp
+    assert [timestamp for timestamp, _ in posts] == [
+        1704067200.0, 1704067260.0, 1704067320.0,
+    ]
+    assert corpus.skipped == 4
+    assert corpus.rows_read == 5
+
+
+def test_replay_reads_gzipped_csv(tmp_path):
+    path = tmp_path / "posts.csv.gz"
+    write_lines(path, [
+        "body,source,author,created_at",
+        '"hello, world",twitter,dee,2024-01-01 00:00:00',
+        ",twitter,nobody,",
+        'second,,"",1704067201.5',
+    ], compress=True)
+    corpus = CorpusReplay(str(path))
+
+    assert corpus.fmt == "csv"
+    assert list(corpus.posts()) == [
+        (1704067200.0, {"source": "twitter", "content": "hello, world", "author": "dee"}),
+        (1704067201.5, {"source": "replay", "content": "second", "author": "unknown"}),
+    ]
+    assert corpus.skipped == 1
+
+
+def test_replay_loops_shift_timestamps_by_the_corpus_span(tmp_path):
+    path = tmp_path / "posts.jsonl"
+    write_lines(path, [
+        json.dumps({"content": "a", "created_at": 100}),
+        json.dumps({"content": "b", "created_at": 130}),
+        json.dumps({"content": "c"}),
+    ])
+
+    posts = list(CorpusReplay(str(path), loops=3).posts())
+    assert [timestamp for timestamp, _ in posts] == [
+        100, 130, None, 130, 160, None, 160, 190, None,
+    ]
+
+    forever = CorpusReplay(str(path), loops=0).posts()
+    assert len(list(islice(forever, 10))) == 10
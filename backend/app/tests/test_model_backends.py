@@ -0,0 +1,61 @@
+import os
+from functools import lru_cache
+
+import pytest
+
+# Downloads and runs the real models, so opt in explicitly
+pytestmark = pytest.mark.skipif(
+    not os.getenv("RUN_MODEL_PARITY_TESTS"),
+    reason="set RUN_MODEL_PARITY_TESTS=1 to compare backends against fp32",
+)
+
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+
+TEXTS = [
+    "I absolutely love the new iPhone 16!",
+    "ChatGPT exceeded my expectations today",
+    "Netflix is amazing, best shows all year",
+    "Very disappointed with Amazon Prime delivery",
+    "Terrible experience with customer support again",
+    "I hate how slow this app has become",
+    "Just tried the new update on my laptop",
+    "Using Netflix for the first time tonight",
+    "Received my order today, will test it later",
+    "This is the worst purchase I have ever made",
+    "The battery life is fantastic and charging is quick",
+    "I'm scared the service will go down during launch",
+    "Wow, I did not expect the price to drop that much",
+    "So sad that they cancelled my favourite series",
+    "Furious that the refund still hasn't arrived",
+    "Pretty average phone, nothing special about it",
+]
+
+
+@lru_cache(maxsize=None)
+def classify(model_name, backend):
+    from app.services.model_backends import load_pipeline
+
+    results = load_pipeline(model_name, backend)(TEXTS, truncation=True)
+    return [max(r, key=lambda x: x["score"]) for r in results]
+
+
+@pytest.mark.parametrize("model_name", [SENTIMENT_MODEL, EMOTION_MODEL])
+def test_quantized_matches_fp32(model_name):
+    reference = classify(model_name, "pytorch")
+    quantized = classify(model_name, "quantized")
+
+    agree = sum(r["label"] == q["label"] for r, q in zip(reference, quantized))
+    assert agree / len(TEXTS) >= 0.9
+
+
+@pytest.mark.parametrize("model_name", [SENTIMENT_MODEL, EMOTION_MODEL])
+def test_onnx_matches_fp32(model_name):
+    pytest.importorskip("optimum.onnxruntime")
+
+    reference = classify(model_name, "pytorch")
+    exported = classify(model_name, "onnx")
+
+    assert [r["label"] for r in reference] == [e["label"] for e in exported]
+    for r, e in zip(reference, exported):
+        assert abs(r["score"] - e["score"]) < 1e-3
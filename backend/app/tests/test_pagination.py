@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.api.pagination import (
+    after_cursor,
+    created_at_order,
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
+from app.models.database import Base
+from app.models.social_media_post import SocialMediaPost
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_cursor_round_trip_without_created_at():
+    assert decode_cursor(encode_cursor(None, 42)) == (None, 42)
+
+
+def test_keyset_pages_cover_rows_without_created_at(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'posts.db'}")
+    Base.metadata.create_all(bind=engine)
+    created = [None, datetime(2024, 1, 1), None, datetime(2024, 1, 2), datetime(2024, 1, 1), None]
+    with Session(engine) as db:
+        for i, created_at in enumerate(created):
+            db.execute(insert(SocialMediaPost).values(
+                post_id=f"p{i}", content="x", created_at=created_at
+            ))
+        db.commit()
+
+        posts = SocialMediaPost.__table__.c
+        seen, cursor = [], None
+        while True:
+            stmt = select(posts.id, posts.created_at).order_by(
+                *created_at_order(posts.created_at, posts.id)
+            ).limit(2)
+            if cursor:
+                stmt = stmt.where(after_cursor(posts.created_at, posts.id, *decode_cursor(cursor)))
+            page = db.execute(stmt).all()
+            if not page:
+                break
+            seen.extend(row.id for row in page)
+            cursor = encode_cursor(page[-1].created_at, page[-1].id)
+
+    # NULLs first (newest id first), then newest created_at, ties by id
+    assert seen == [6, 3, 1, 4, 5, 2]
+
+
+def test_malformed_cursor_is_a_bad_request():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_rank_cursor_round_trip_and_kinds_do_not_mix():
+    cursor = encode_rank_cursor(0.0123456789, 7)
+    assert decode_rank_cursor(cursor) == (0.0123456789, 7)
+
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor)
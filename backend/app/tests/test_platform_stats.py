@@ -0,0 +1,41 @@
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+from app.services.platform_stats import (
+    claim_seeding,
+    read_stats,
+    record_written,
+    seed_totals,
+    stats_initialized,
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "benchmarks"))
+
+from memory_redis import MemoryRedis  # noqa: E402
+
+NOW = datetime(2024, 1, 1, 12, 0)
+
+
+def test_seed_sets_both_totals_over_earlier_increments():
+    async def run():
+        client = MemoryRedis()
+        # Another worker's batch lands while this one counts the tables
+        await record_written(client, 3, 3, now=NOW)
+        assert not await stats_initialized(client)
+
+        assert await claim_seeding(client)
+        assert not await claim_seeding(client)
+        await seed_totals(client, 100, 99)
+        await record_written(client, 2, 2, now=NOW)
+
+        assert await stats_initialized(client)
+        assert not await claim_seeding(client)
+        return await read_stats(client, now=NOW)
+
+    assert asyncio.run(run()) == {
+        "total_posts": 102,
+        "total_analyses": 101,
+        "recent_posts_1h": 5,
+    }
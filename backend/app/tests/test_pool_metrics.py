@@ -0,0 +1,21 @@
+from app.services.pool_metrics import PoolWaitStats
+
+
+def test_wait_stats_snapshot():
+    stats = PoolWaitStats(window=10)
+    for ms in range(1, 21):
+        stats.record(ms / 1000.0)
+
+    snapshot = stats.snapshot()
+    assert snapshot["checkouts"] == 20
+    assert snapshot["max_wait_ms"] == 20.0
+    assert snapshot["avg_wait_ms"] == 10.5
+    # Percentiles cover only the most recent window
+    assert snapshot["p50_wait_ms"] == 16.0
+
+
+def test_timer_records_a_sample():
+    stats = PoolWaitStats()
+    with stats.timer():
+        pass
+    assert stats.snapshot()["checkouts"] == 1
@@ -0,0 +1,121 @@
+import asyncio
+
+from app.services.read_cache import ReadCache, invalidate
+
+
+class DictRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def pipeline(self, transaction=True):
+        return DictPipeline(self)
+
+
+class DictPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.keys = []
+
+    def get(self, key):
+        self.keys.append(key)
+
+    async def execute(self):
+        return [await self.client.get(key) for key in self.keys]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+def counting_compute(delay=0.0):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return {"total": len(calls)}
+
+    return compute, calls
+
+
+def test_concurrent_misses_compute_once():
+    cache = ReadCache(DictRedis())
+    compute, calls = counting_compute(delay=0.01)
+
+    async def run():
+        return await asyncio.gather(*[
+            cache.get_or_compute("k", compute, ttl=60) for _ in range(20)
+        ])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(value == {"total": 1} for value, _ in results)
+    assert cache.stats()["coalesced"] == 19
+
+
+def test_expired_entry_is_served_stale_while_refreshing():
+    cache = ReadCache(DictRedis())
+    compute, calls = counting_compute()
+
+    async def run():
+        await cache.get_or_compute("k", compute, ttl=0, stale_ttl=60)
+        stale = await cache.get_or_compute("k", compute, ttl=0, stale_ttl=60)
+        await asyncio.sleep(0.01)
+        refreshed = await cache.get_or_compute("k", compute, ttl=0, stale_ttl=60)
+        return stale, refreshed
+
+    stale, refreshed = asyncio.run(run())
+    assert stale == ({"total": 1}, "stale")
+    assert refreshed[0] == {"total": 2}
+
+
+def test_invalidation_marks_namespace_stale():
+    redis_client = DictRedis()
+    cache = ReadCache(redis_client)
+    compute, calls = counting_compute()
+
+    async def run():
+        await cache.get_or_compute("k", compute, ttl=60, namespace="posts")
+        fresh = await cache.get_or_compute("k", compute, ttl=60, namespace="posts")
+        await invalidate(redis_client, "posts")
+        stale = await cache.get_or_compute("k", compute, ttl=60, namespace="posts")
+        await asyncio.sleep(0.01)
+        return fresh[1], stale[1]
+
+    assert asyncio.run(run()) == ("fresh", "stale")
+    assert len(calls) == 2
+
+
+def test_other_process_waits_for_lock_holder():
+    redis_client = DictRedis()
+    first = ReadCache(redis_client, lock_poll_interval=0.005)
+    second = ReadCache(redis_client, lock_poll_interval=0.005)
+    compute, calls = counting_compute(delay=0.05)
+
+    async def run():
+        return await asyncio.gather(
+            first.get_or_compute("k", compute, ttl=60),
+            second.get_or_compute("k", compute, ttl=60),
+        )
+
+    (a, _), (b, _) = asyncio.run(run())
+    assert len(calls) == 1
+    assert a == b == {"total": 1}
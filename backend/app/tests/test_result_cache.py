@@ -0,0 +1,74 @@
+import asyncio
+
+from app.services.result_cache import AnalysisCache
+
+
+class DictRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+RESULT = {"sentiment_label": "positive", "confidence_score": 0.9, "model_name": "m"}
+
+
+def test_normalized_text_shares_a_key():
+    cache = AnalysisCache()
+    assert cache.key("m", "  I love  it\n") == cache.key("m", "I love it")
+    assert cache.key("m", "I love it") != cache.key("other", "I love it")
+
+
+def test_local_lru_evicts_oldest_entry():
+    cache = AnalysisCache(max_entries=2)
+
+    async def run():
+        await cache.set("m", "first post", RESULT)
+        await cache.set("m", "second post", RESULT)
+        await cache.get("m", "first post")
+        await cache.set("m", "third post", RESULT)
+        return await cache.get("m", "second post")
+
+    assert asyncio.run(run()) is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["local_size"] == 2
+
+
+def test_shared_tier_serves_other_workers():
+    shared = DictRedis()
+    writer = AnalysisCache(redis_client=shared)
+    reader = AnalysisCache(redis_client=shared)
+
+    async def run():
+        await writer.set("m", "I love it", RESULT)
+        first = await reader.get("m", "I love it")
+        second = await reader.get("m", "I love it")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == RESULT
+    assert reader.stats()["redis_hits"] == 1
+    assert reader.stats()["local_hits"] == 1
+
+
+def test_concurrent_misses_compute_once():
+    cache = AnalysisCache()
+    calls = []
+
+    async def compute(text):
+        calls.append(text)
+        await asyncio.sleep(0.01)
+        return dict(RESULT)
+
+    async def run():
+        return await asyncio.gather(
+            *[cache.get_or_compute("m", "I love it", compute) for _ in range(5)]
+        )
+
+    assert asyncio.run(run()) == [RESULT] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
@@ -0,0 +1,184 @@
+import asyncio
+import gzip
+import json
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+sys.path.insert(0, os.path.join(ROOT, "worker"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from memory_redis import MemoryRedis  # noqa: E402
+from retention import StreamArchiver, StreamRetention, _after  # noqa: E402
+
+STREAM = "posts"
+
+
+async def stream_with_group(entries=6, read=6, ack=6, group="workers"):
+    """
+    A stream of entries messages; group has read the first read of
+    them and acknowledged the first ack
+    """
+    client = MemoryRedis()
+    ids = [await client.xadd(STREAM, {"n": str(i)}) for i in range(entries)]
+    await client.xgroup_create(STREAM, group, id="0")
+    if read:
+        await client.xreadgroup(group, "c1", {STREAM: ">"}, count=read)
+    if ack:
+        await client.xack(STREAM, group, *ids[:ack])
+    return client, ids
+
+
+def archived_ids(directory):
+    ids = []
+    for name in sorted(os.listdir(directory)):
+        with gzip.open(os.path.join(directory, name), "rt") as f:
+            ids.append([json.loads(line)["id"] for line in f])
+    return ids
+
+
+async def stream_ids(client):
+    return [message_id for message_id, _ in await client.xrange(STREAM)]
+
+
+def test_pending_entries_are_kept():
+    async def run():
+        client, ids = await stream_with_group(read=5, ack=3)
+        result = await StreamRetention(client, STREAM).run_once()
+        return ids, result, await stream_ids(client)
+
+    ids, result, kept = asyncio.run(run())
+    # ids[3] and ids[4] are delivered but unacked
+    assert result["trim_id"] == ids[3]
+    assert kept == ids[3:]
+
+
+def test_another_groups_undelivered_entries_are_kept():
+    async def run():
+        client, ids = await stream_with_group()
+        await client.xgroup_create(STREAM, "audit", id=ids[1])
+        result = await StreamRetention(client, STREAM).run_once()
+        return ids, result, await stream_ids(client)
+
+    ids, result, kept = asyncio.run(run())
+    # audit has seen up to ids[1] and nothing after it; the trim id is
+    # the smallest id above ids[1], whether or not ids[2] shares its ms
+    assert result["trim_id"] == _after(ids[1])
+    assert kept == ids[2:]
+
+
+def test_stream_without_groups_is_left_alone():
+    async def run():
+        client = MemoryRedis()
+        await client.xadd(STREAM, {"n": "0"})
+        retention = StreamRetention(client, STREAM)
+        return await retention.run_once(), await client.xlen(STREAM), await client.get(retention.lock_key)
+
+    assert asyncio.run(run()) == ({"skipped": "no consumer group"}, 1, None)
+
+
+def test_archive_rolls_over_files_and_resumes_from_cursor(tmp_path):
+    async def run():
+        client, ids = await stream_with_group(entries=7, read=7, ack=7)
+        archiver = StreamArchiver(str(tmp_path), STREAM, read_batch=2, file_entries=2)
+        retention = StreamRetention(client, STREAM, archiver=archiver)
+
+        first = await retention.run_once()
+        new_id = await client.xadd(STREAM, {"n": "7"})
+        await client.xreadgroup("workers", "c1", {STREAM: ">"})
+        await client.xack(STREAM, "workers", new_id)
+        second = await retention.run_once()
+        return ids + [new_id], first, second
+
+    ids, first, second = asyncio.run(run())
+    assert first["archived"] == 7
+    assert second["archived"] == 1
+    files = archived_ids(tmp_path)
+    assert sorted(len(entries) for entries in files) == [1, 1, 2, 2, 2]
+    archived = [message_id for entries in files for message_id in entries]
+    assert len(archived) == len(set(archived)) == 8
+    assert set(archived) == set(ids)
+
+
+class OneFileArchiver(StreamArchiver):
+    """
+    Archives only the first file of each pass, as if it stopped there
+    """
+
+    async def archive(self, redis_client, start, end):
+        async for item in super().archive(redis_client, start, end):
+            yield item
+            return
+
+
+def test_trim_stops_at_the_archive_cursor(tmp_path):
+    async def run():
+        client, ids = await stream_with_group()
+        archiver = OneFileArchiver(str(tmp_path), STREAM, read_batch=2, file_entries=2)
+        retention = StreamRetention(client, STREAM, archiver=archiver)
+        result = await retention.run_once()
+        return ids, result, await client.get(retention.cursor_key), await stream_ids(client)
+
+    ids, result, cursor, kept = asyncio.run(run())
+    assert result["archived"] == 2
+    # Everything is acknowledged, but only ids[:2] is on disk
+    assert result["trim_id"] == cursor
+    assert cursor == _after(ids[1])
+    assert kept == ids[2:]
+
+
+class LockStealingArchiver(StreamArchiver):
+    """
+    Lets the lock go to another worker after the first file
+    """
+
+    def __init__(self, *args, lock_key, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock_key = lock_key
+
+    async def archive(self, redis_client, start, end):
+        async for item in super().archive(redis_client, start, end):
+            await redis_client.set(self.lock_key, "another-worker")
+            yield item
+
+
+def test_lost_lock_stops_the_pass(tmp_path):
+    async def run():
+        client, ids = await stream_with_group()
+        retention = StreamRetention(client, STREAM)
+        retention.archiver = LockStealingArchiver(
+            str(tmp_path), STREAM, read_batch=2, file_entries=2,
+            lock_key=retention.lock_key,
+        )
+        result = await retention.run_once()
+        return (
+            result,
+            await client.get(retention.cursor_key),
+            await client.get(retention.lock_key),
+            await client.xlen(STREAM),
+        )
+
+    result, cursor, lock, length = asyncio.run(run())
+    assert result == {"skipped": "lock lost", "archived": 0}
+    # Nothing recorded or trimmed, and the new holder's lock is untouched
+    assert (cursor, lock, length) == (None, "another-worker", 6)
+
+
+def test_lock_is_extended_after_each_file(tmp_path):
+    async def run():
+        client, _ = await stream_with_group()
+        archiver = StreamArchiver(str(tmp_path), STREAM, read_batch=2, file_entries=2)
+        retention = StreamRetention(client, STREAM, archiver=archiver, lock_timeout=300)
+
+        ttls = []
+        expire = client.expire
+
+        async def recording_expire(key, seconds):
+            ttls.append(seconds)
+            return await expire(key, seconds)
+
+        client.expire = recording_expire
+        await retention.run_once()
+        return ttls
+
+    assert asyncio.run(run()) == [300, 300, 300]
@@ -0,0 +1,108 @@
+import os
+import sys
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base
+from app.models.sentiment_analysis import SentimentAnalysis
+from app.models.sentiment_rollup import SentimentMinuteRollup
+from app.models.social_media_post import SocialMediaPost
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "worker"))
+
+from processor import backfill_minute_rollups, save_posts_and_analyses  # noqa: E402
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def row(post_id, created_at, label="negative", emotion="anger", source="twitter"):
+    return (
+        {
+            "post_id": post_id,
+            "source": source,
+            "content": f"post {post_id}",
+            "author": "someone",
+            "created_at": created_at,
+        },
+        {"model_name": "test", "sentiment_label": label, "confidence_score": 0.9},
+        {"emotion": emotion},
+    )
+
+
+def rollups(db):
+    return {
+        (r.bucket, r.source, r.sentiment_label, r.emotion): r.count
+        for r in db.scalars(select(SentimentMinuteRollup))
+    }
+
+
+def test_rollups_increment_across_batches(tmp_path):
+    db = make_session(tmp_path)
+
+    written = save_posts_and_analyses(db, [
+        row("a", "2024-01-01T12:00:05Z"),
+        row("b", "2024-01-01T12:00:59.5Z"),
+        row("c", "2024-01-01T12:01:00Z", label="positive", emotion="joy"),
+        row("d", "2024-01-01T12:00:30Z", source="reddit"),
+    ])
+    assert written == {"a", "b", "c", "d"}
+
+    save_posts_and_analyses(db, [row("e", "2024-01-01T12:00:10Z")])
+
+    minute = datetime(2024, 1, 1, 12, 0)
+    assert rollups(db) == {
+        (minute, "twitter", "negative", "anger"): 3,
+        (minute, "reddit", "negative", "anger"): 1,
+        (datetime(2024, 1, 1, 12, 1), "twitter", "positive", "joy"): 1,
+    }
+
+
+def test_redelivered_posts_are_not_counted_again(tmp_path):
+    db = make_session(tmp_path)
+
+    save_posts_and_analyses(db, [row("a", "2024-01-01T12:00:05Z")])
+    # Redelivery of a, plus a duplicate of b inside one batch
+    written = save_posts_and_analyses(db, [
+        row("a", "2024-01-01T12:00:05Z"),
+        row("b", "2024-01-01T12:00:06Z"),
+        row("b", "2024-01-01T12:00:06Z"),
+    ])
+
+    assert written == {"b"}
+    assert list(rollups(db).values()) == [2]
+    assert len(db.scalars(select(SentimentAnalysis)).all()) == 2
+
+
+def test_backfill_matches_live_rollups_and_is_idempotent(tmp_path):
+    db = make_session(tmp_path)
+
+    save_posts_and_analyses(db, [
+        row("a", "2024-01-01T12:00:05Z"),
+        row("b", "2024-01-01T12:00:40Z"),
+        row("c", "2024-01-01T12:03:00Z", label="neutral", emotion="neutral"),
+    ])
+    expected = rollups(db)
+
+    # A database that predates the rollup table
+    db.query(SentimentMinuteRollup).delete()
+    db.execute(insert(SocialMediaPost).values(
+        post_id="x", source=None, content="x", created_at=None
+    ))
+    db.add(SentimentAnalysis(
+        post_id="x", sentiment_label="positive", emotion="joy",
+        analyzed_at=datetime(2024, 1, 1, 12, 5, 30),
+    ))
+    db.commit()
+
+    assert backfill_minute_rollups(db) == 3
+    expected[(datetime(2024, 1, 1, 12, 5), "unknown", "positive", "joy")] = 1
+    assert rollups(db) == expected
+
+    assert backfill_minute_rollups(db) == 0
+    assert rollups(db) == expected
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api import routes
+from app.api.pagination import encode_rank_cursor
+from app.services.search import SearchColumnCheck, schema_statements, substring_pattern
+
+
+class FakeConnection:
+    """
+    Sync connection whose catalog lookups report the given objects
+    """
+
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+
+    def scalar(self, query, params=None):
+        name = (params or {}).get("name", "search_vector")
+        return name in self.existing
+
+
+class Dialect:
+    name = "postgresql"
+
+
+class Bind:
+    dialect = Dialect()
+
+
+class EmptyResult:
+    def all(self):
+        return []
+
+
+class RecordingSession:
+    """
+    AsyncSession stand-in: records statements, returns no rows
+    """
+
+    bind = Bind()
+
+    def __init__(self, search_column=True):
+        self.search_column = search_column
+        self.statements = []
+
+    async def scalar(self, stmt):
+        return self.search_column
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return EmptyResult()
+
+
+def sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def get_posts(session, q, match="words", cursor=None):
+    return asyncio.run(routes.get_posts(
+        limit=10, offset=0, cursor=cursor, total_mode="none",
+        source=None, sentiment=None, start_date=None, end_date=None,
+        q=q, match=match, session=session, redis_client=None,
+    ))
+
+
+@pytest.fixture(autouse=True)
+def fresh_search_check(monkeypatch):
+    monkeypatch.setattr(routes, "search_column_ready", SearchColumnCheck())
+
+
+def test_schema_statements_skip_what_exists():
+    statements = schema_statements(FakeConnection(), trigram=True)
+    assert len(statements) == 4
+    assert "ALTER TABLE" in statements[0]
+    assert all("CONCURRENTLY" in s for s in statements if "CREATE INDEX" in s)
+
+    done = FakeConnection({
+        "search_vector", "ix_social_media_posts_search_vector",
+        "pg_trgm", "ix_social_media_posts_content_trgm",
+    })
+    assert schema_statements(done, trigram=True) == []
+
+
+def test_word_search_filters_with_websearch_query_and_orders_by_rank():
+    session = RecordingSession()
+    get_posts(session, "battery -charger")
+
+    query = sql(session.statements[-1])
+    assert "social_media_posts.search_vector @@ websearch_to_tsquery(" in query
+    assert (
+        "ORDER BY ts_rank_cd(social_media_posts.search_vector, "
+        "websearch_to_tsquery(" in query
+    )
+    assert ")) DESC, social_media_posts.id DESC" in query
+
+    # Next pages continue below the last (rank, id)
+    get_posts(session, "battery -charger", cursor=encode_rank_cursor(0.5, 9))
+    assert ", social_media_posts.id) < (" in sql(session.statements[-1])
+
+
+def test_substring_search_keeps_newest_first_order():
+    session = RecordingSession(search_column=False)
+    get_posts(session, "50%_off", match="substring")
+
+    query = sql(session.statements[-1])
+    assert "social_media_posts.content ILIKE" in query
+    assert "ESCAPE" in query
+    assert "websearch_to_tsquery" not in query
+    assert "ORDER BY social_media_posts.created_at DESC NULLS FIRST, social_media_posts.id DESC" in query
+    assert substring_pattern("50%_off") == "%50\\%\\_off%"
+
+
+def test_word_search_is_unavailable_until_the_column_exists():
+    session = RecordingSession(search_column=False)
+    with pytest.raises(HTTPException) as exc:
+        get_posts(session, "battery")
+    assert exc.value.status_code == 503
+    assert session.statements == []
+
+    session.search_column = True
+    response = get_posts(session, "battery")
+    assert json.loads(response.body)["posts"] == []
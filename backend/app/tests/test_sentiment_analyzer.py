@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from app.services import sentiment_analyzer
+from app.services.result_cache import AnalysisCache
+from app.services.sentiment_analyzer import SentimentAnalyzer
+
+SENTIMENT_MODEL = "stub-sentiment"
+EMOTION_MODEL = "stub-emotion"
+
+
+class StubPipeline:
+    """
+    Stands in for a HF text-classification pipeline: the first label
+    always wins, and every text it sees is recorded
+    """
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.seen = []
+
+    def __call__(self, texts, **kwargs):
+        self.seen.extend(texts)
+        return [
+            [
+                {"label": label, "score": 0.9 if i == 0 else 0.02}
+                for i, label in enumerate(self.labels)
+            ]
+            for _ in texts
+        ]
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    monkeypatch.setenv("HUGGINGFACE_MODEL", SENTIMENT_MODEL)
+    monkeypatch.setenv("EMOTION_MODEL", EMOTION_MODEL)
+    monkeypatch.setenv("INFERENCE_EXECUTOR", "inline")
+
+    pipelines = {
+        SENTIMENT_MODEL: StubPipeline(["POSITIVE", "NEGATIVE"]),
+        EMOTION_MODEL: StubPipeline(["joy", "sadness", "anger"]),
+    }
+    monkeypatch.setattr(
+        sentiment_analyzer,
+        "load_pipeline",
+        lambda model_name, backend="pytorch": pipelines[model_name],
+    )
+    return SentimentAnalyzer()
+
+
+def run(analyzer, coro):
+    async def and_close():
+        try:
+            return await coro
+        finally:
+            await analyzer.close()
+
+    return asyncio.run(and_close())
+
+
+def test_analyze_returns_both_results(analyzer):
+    result = run(analyzer, analyzer.analyze("I absolutely love this update"))
+
+    assert result == {
+        "sentiment": {
+            "sentiment_label": "positive",
+            "confidence_score": 0.9,
+            "model_name": SENTIMENT_MODEL,
+        },
+        "emotion": {
+            "emotion": "joy",
+            "confidence_score": 0.9,
+            "model_name": EMOTION_MODEL,
+        },
+    }
+
+
+def test_analyze_rejects_empty_text(analyzer):
+    with pytest.raises(ValueError):
+        run(analyzer, analyzer.analyze("   "))
+
+
+def test_analyze_many_gives_empty_text_a_neutral_result(analyzer):
+    results = run(
+        analyzer, analyzer.analyze_many(["I absolutely love this update", ""])
+    )
+
+    assert results[0]["sentiment"]["sentiment_label"] == "positive"
+    assert results[0]["emotion"]["emotion"] == "joy"
+    assert results[1] == {
+        "sentiment": {
+            "sentiment_label": "neutral",
+            "confidence_score": 0.0,
+            "model_name": SENTIMENT_MODEL,
+        },
+        "emotion": {
+            "emotion": "neutral",
+            "confidence_score": 0.0,
+            "model_name": EMOTION_MODEL,
+        },
+    }
+
+
+def test_short_text_skips_the_models(analyzer):
+    result = run(analyzer, analyzer.analyze("  ok  "))
+
+    assert result["sentiment"]["sentiment_label"] == "neutral"
+    assert result["emotion"]["emotion"] == "neutral"
+    assert analyzer.sentiment_pipeline.seen == []
+    assert analyzer.emotion_pipeline.seen == []
+
+
+def test_backends_do_not_share_cache_entries(analyzer, monkeypatch):
+    cache = AnalysisCache()
+    analyzer.cache = cache
+    run(analyzer, analyzer.analyze("I absolutely love this update"))
+
+    monkeypatch.setenv("HUGGINGFACE_MODEL_BACKEND", "quantized")
+    quantized = SentimentAnalyzer(cache=cache)
+    run(quantized, quantized.analyze("I absolutely love this update"))
+
+    # Both analyzers share the stub pipelines: the quantized sentiment
+    # model ran again, the emotion model (still on the default backend)
+    # was served from the cache
+    assert len(quantized.sentiment_pipeline.seen) == 2
+    assert len(quantized.emotion_pipeline.seen) == 1
+    assert cache.local_hits == 1
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from app.services.timeseries import MAX_POINTS, build_points, pick_interval
+
+
+def test_interval_is_downsampled_to_fit():
+    assert pick_interval(1) == "1m"
+    assert pick_interval(24) == "5m"
+    assert pick_interval(24, "1m") == "5m"
+    assert pick_interval(24, "1h") == "1h"
+    assert pick_interval(720) == "3h"
+
+
+def test_points_are_zero_filled_and_bounded():
+    start = datetime(2024, 1, 1, 0, 2)
+    end = datetime(2024, 1, 1, 1, 1)
+    rows = [
+        (datetime(2024, 1, 1, 0, 7), "negative", "anger", 3),
+        (datetime(2024, 1, 1, 0, 9), "negative", "fear", 2),
+        (datetime(2024, 1, 1, 0, 59), "positive", "joy", 1),
+    ]
+
+    points = build_points(rows, start, end, 300)
+
+    assert len(points) == 13 <= MAX_POINTS
+    assert points[0]["timestamp"] == "2024-01-01T00:00:00Z"
+    assert points[1]["sentiment"]["negative"] == 5
+    assert points[1]["emotions"] == {"anger": 3, "fear": 2}
+    assert points[11]["total"] == 1
+    assert points[2]["total"] == 0
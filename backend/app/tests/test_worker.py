@@ -0,0 +1,198 @@
+import asyncio
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+sys.path.insert(0, os.path.join(ROOT, "worker"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import worker as worker_module  # noqa: E402
+from memory_redis import MemoryRedis  # noqa: E402
+from worker import (  # noqa: E402
+    DEAD_LETTER_STREAM,
+    GROUP,
+    STREAM,
+    AdaptiveBatchSizer,
+    SentimentWorker,
+)
+
+
+class StubAnalyzer:
+    cache = None
+
+    async def analyze(self, text):
+        return {
+            "sentiment": {
+                "model_name": "stub",
+                "sentiment_label": "positive",
+                "confidence_score": 0.9,
+            },
+            "emotion": {"emotion": "joy"},
+        }
+
+
+class FlakyWriteWorker(SentimentWorker):
+    """
+    Bulk writes containing post "boom" fail, as a row the database
+    rejects would
+    """
+
+    def write_batch(self, rows):
+        if any(post_data["post_id"] == "boom" for post_data, _, _ in rows):
+            raise RuntimeError("row rejected")
+        return super().write_batch(rows)
+
+
+def post(post_id, **overrides):
+    fields = {
+        "post_id": post_id,
+        "source": "twitter",
+        "content": f"post {post_id}",
+        "author": "someone",
+        "created_at": "2024-01-01T12:00:00Z",
+    }
+    fields.update(overrides)
+    return {key: value for key, value in fields.items() if value is not None}
+
+
+async def make_worker(tmp_path, posts, worker_class=SentimentWorker):
+    client = MemoryRedis()
+    worker = worker_class(
+        analyzer=StubAnalyzer(),
+        consumer="test-1",
+        redis_client=client,
+        database_url=f"sqlite:///{tmp_path / 'worker.db'}",
+    )
+    await worker.ensure_group()
+    for fields in posts:
+        await client.xadd(STREAM, fields)
+    read = await client.xreadgroup(GROUP, worker.consumer, {STREAM: ">"})
+    return worker, client, read[0][1]
+
+
+async def pending_post_ids(client):
+    pending = await client.xpending_range(STREAM, GROUP, "-", "+", 100)
+    ids = {p["message_id"] for p in pending}
+    return {
+        fields["post_id"]
+        for message_id, fields in await client.xrange(STREAM)
+        if message_id in ids
+    }
+
+
+def test_poison_entries_do_not_hold_back_the_batch(tmp_path):
+    async def run():
+        worker, client, entries = await make_worker(tmp_path, [
+            post("a"),
+            post("no-content", content=None),
+            post("b"),
+            post("bad-date", created_at="yesterday"),
+            post("boom"),
+            post("c"),
+        ], worker_class=FlakyWriteWorker)
+
+        await worker.process_batch(entries)
+        dead = await client.xrange(DEAD_LETTER_STREAM)
+        return worker, client, dead
+
+    worker, client, dead = asyncio.run(run())
+
+    assert worker.count_rows() == (3, 3)
+    assert {fields["post_id"]: fields["error"] for _, fields in dead} == {
+        "no-content": "missing content",
+        "bad-date": "unparseable created_at 'yesterday'",
+    }
+    # Only the row the database rejected is left to be retried
+    assert asyncio.run(pending_post_ids(client)) == {"boom"}
+
+
+def test_reclaimed_entries_are_retried_until_max_deliveries(tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_module, "RECLAIM_IDLE_MS", 0)
+    monkeypatch.setattr(worker_module, "MAX_DELIVERIES", 2)
+
+    async def run():
+        worker, client, entries = await make_worker(
+            tmp_path, [post("a"), post("boom")], worker_class=FlakyWriteWorker
+        )
+        await worker.process_batch(entries)
+        assert await pending_post_ids(client) == {"boom"}
+
+        # Second delivery: still within MAX_DELIVERIES, so retried
+        assert await worker.reclaim_pending() == 1
+        assert await client.xlen(DEAD_LETTER_STREAM) == 0
+        assert await pending_post_ids(client) == {"boom"}
+
+        # Third delivery: over the limit, so dead-lettered and acked
+        assert await worker.reclaim_pending() == 1
+        dead = await client.xrange(DEAD_LETTER_STREAM)
+        return worker, client, dead
+
+    worker, client, dead = asyncio.run(run())
+
+    assert [fields["post_id"] for _, fields in dead] == ["boom"]
+    assert dead[0][1]["deliveries"] == "3"
+    assert asyncio.run(pending_post_ids(client)) == set()
+    assert worker.count_rows() == (1, 1)
+
+
+def test_reclaim_skips_entries_deleted_from_the_stream(tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_module, "RECLAIM_IDLE_MS", 0)
+
+    async def run():
+        worker, client, entries = await make_worker(tmp_path, [post("a"), post("b")])
+        # Trimmed away while still pending
+        await client.xtrim(STREAM, maxlen=0)
+        claimed = await worker.reclaim_pending()
+        pending = await client.xpending(STREAM, GROUP)
+        return worker, claimed, pending["pending"], await client.xlen(DEAD_LETTER_STREAM)
+
+    worker, claimed, pending, dead = asyncio.run(run())
+    assert (claimed, pending, dead) == (0, 0, 0)
+    assert worker.count_rows() == (0, 0)
+
+
+def test_batch_sizer_halves_when_a_batch_overshoots():
+    sizer = AdaptiveBatchSizer(initial=64, minimum=1, maximum=256, target_latency_ms=100)
+    sizer.lag = 1000
+
+    sizer.observe(64, 0.2)
+    assert sizer.size == 32
+    sizer.observe(32, 0.2)
+    assert sizer.size == 16
+
+
+def test_batch_sizer_grows_only_with_lag_and_a_full_batch():
+    sizer = AdaptiveBatchSizer(initial=16, minimum=1, maximum=256, target_latency_ms=100)
+
+    # Fast, full batch, but nothing waiting
+    sizer.lag = 0
+    sizer.observe(16, 0.01)
+    assert sizer.size == 16
+
+    # Backlog, but the last read came back short
+    sizer.lag = 1000
+    sizer.observe(8, 0.01)
+    assert sizer.size == 16
+
+    # Well under the target: doubles
+    sizer.observe(16, 0.01)
+    assert sizer.size == 32
+
+    # Under the target but past half of it: grows by a quarter
+    sizer.observe(32, 0.07)
+    assert sizer.size == 40
+
+
+def test_batch_sizer_stays_within_bounds():
+    sizer = AdaptiveBatchSizer(initial=1000, minimum=4, maximum=64, target_latency_ms=100)
+    assert sizer.size == 64
+
+    sizer.lag = 10_000
+    sizer.observe(64, 0.01)
+    assert sizer.size == 64
+
+    for _ in range(10):
+        sizer.observe(sizer.size, 1.0)
+    assert sizer.size == 4
+
+    assert AdaptiveBatchSizer(initial=0, minimum=0, maximum=0).size == 1
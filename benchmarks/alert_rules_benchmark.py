@@ -0,0 +1,147 @@
+"""
+Cost of evaluating many alert rules from the analyzed-post event feed
+
+Builds a registry of per-source, per-keyword and per-emotion rules over
+a few window lengths, feeds it synthetic events, and reports the
+per-event counting cost and the time of one evaluation pass over every
+rule (what the API does every ALERT_EVALUATE_INTERVAL_SECONDS).
+
+    python benchmarks/alert_rules_benchmark.py --rules 10000 --events 50000
+    python benchmarks/alert_rules_benchmark.py --json alerts.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from app.models.sentiment_analysis import LABELS  # noqa: E402
+
+SOURCES = ("twitter", "reddit", "news", "forum")
+EMOTIONS = ("joy", "anger", "sadness", "fear", "surprise", "neutral")
+WINDOWS = (1, 5, 15, 60)
+FILLER = "the service was slow today but support answered quickly and fixed it".split()
+
+
+def build_rules(count: int, keywords: int):
+    from app.services.alert_rules import AlertRule
+
+    brands = [f"brand{i}" for i in range(keywords)]
+    rules = []
+    for i in range(count):
+        kind = i % 4
+        rules.append(AlertRule(
+            name=f"rule_{i}",
+            metric="volume" if i % 5 == 0 else "negative_ratio",
+            threshold=50 if i % 5 == 0 else 1.5 + (i % 7) * 0.25,
+            window_minutes=WINDOWS[(i // 16) % len(WINDOWS)],
+            min_posts=5,
+            cooldown_seconds=900,
+            source=SOURCES[i % len(SOURCES)] if kind in (0, 3) else None,
+            keyword=brands[(i // 4) % len(brands)] if kind in (1, 3) else None,
+            emotion=EMOTIONS[(i // 4) % len(EMOTIONS)] if kind == 2 else None,
+        ))
+    return rules, brands
+
+
+def build_events(count: int, brands, seed: int = 7):
+    rng = random.Random(seed)
+    events = []
+    for _ in range(count):
+        words = rng.sample(FILLER, 8) + [rng.choice(brands)]
+        rng.shuffle(words)
+        events.append({
+            "source": rng.choice(SOURCES),
+            "content": " ".join(words),
+            "emotion": rng.choice(EMOTIONS),
+            "sentiment_label": rng.choices(LABELS, weights=(3, 2, 5))[0],
+        })
+    return events
+
+
+def run_benchmark(args) -> dict:
+    from app.services.alert_rules import AlertRuleEngine, AlertRuleRegistry
+
+    rules, brands = build_rules(args.rules, args.keywords)
+
+    started = time.perf_counter()
+    registry = AlertRuleRegistry(rules)
+    build_seconds = time.perf_counter() - started
+
+    engine = AlertRuleEngine(registry, service=None)
+    events = build_events(args.events, brands)
+
+    # Spread the events over --seconds of simulated time
+    step = args.seconds / len(events)
+    started = time.perf_counter()
+    for i, event in enumerate(events):
+        engine.observe(event, i * step)
+    observe_seconds = time.perf_counter() - started
+
+    passes = []
+    alerts = 0
+    for i in range(args.passes):
+        started = time.perf_counter()
+        alerts += len(engine.evaluate(args.seconds + i))
+        passes.append(time.perf_counter() - started)
+    passes.sort()
+
+    return {
+        "config": {
+            "rules": args.rules,
+            "keywords": args.keywords,
+            "events": args.events,
+            "seconds": args.seconds,
+            "passes": args.passes,
+        },
+        "groups": len(registry.groups),
+        "build_ms": round(build_seconds * 1000, 2),
+        "observe_us_per_event": round(observe_seconds / len(events) * 1e6, 2),
+        "events_per_sec": round(len(events) / observe_seconds),
+        "evaluate_p50_ms": round(passes[len(passes) // 2] * 1000, 2),
+        "evaluate_max_ms": round(passes[-1] * 1000, 2),
+        "alerts": alerts,
+        "suppressed": engine.suppressed,
+    }
+
+
+def print_report(result: dict):
+    config = result["config"]
+    print(
+        f"{config['rules']} rules in {result['groups']} groups, "
+        f"{config['events']} events over {config['seconds']}s"
+    )
+    print(f"registry build     {result['build_ms']:>10} ms")
+    print(f"observe per event  {result['observe_us_per_event']:>10} us "
+          f"({result['events_per_sec']} events/s)")
+    print(f"evaluate pass p50  {result['evaluate_p50_ms']:>10} ms")
+    print(f"evaluate pass max  {result['evaluate_max_ms']:>10} ms")
+    print(f"alerts {result['alerts']}, suppressed by cooldown {result['suppressed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rules", type=int, default=10000)
+    parser.add_argument("--keywords", type=int, default=500)
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--seconds", type=float, default=600,
+                        help="simulated time the events are spread over")
+    parser.add_argument("--passes", type=int, default=20)
+    parser.add_argument("--json", dest="json_path",
+                        help="also write the results to this file")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    print_report(result)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
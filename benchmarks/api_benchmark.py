@@ -0,0 +1,219 @@
+"""
+Per-request CPU cost of 100-row /api/posts pages
+
+Serves the current /api/posts next to a copy of its previous
+implementation (ORM entities for both tables, copied into dicts,
+serialized by FastAPI's jsonable_encoder + stdlib JSONResponse) from the
+same app and the same SQLite database, and reports process CPU time per
+request for each.
+
+    python benchmarks/api_benchmark.py --rows 5000 --requests 500
+    python benchmarks/api_benchmark.py --json api.json
+
+Both variants include SQLite query time; against PostgreSQL the
+database share of each request moves out of the API process.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+
+def _legacy_route(app):
+    """
+    /bench/legacy_posts: get_posts as it was before column projection
+    and the fast response class
+    """
+    from fastapi import Depends, Query
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import select
+
+    from app.api.dependencies import get_db
+    from app.models.social_media_post import SocialMediaPost
+    from app.models.sentiment_analysis import SentimentAnalysis
+
+    async def legacy_get_posts(
+        limit: int = Query(50, ge=1, le=100),
+        session=Depends(get_db),
+    ):
+        stmt = (
+            select(SocialMediaPost, SentimentAnalysis)
+            .join(
+                SentimentAnalysis,
+                SocialMediaPost.post_id == SentimentAnalysis.post_id
+            )
+            .order_by(SocialMediaPost.created_at.desc(), SocialMediaPost.id.desc())
+            .limit(limit + 1)
+        )
+        rows = (await session.execute(stmt)).all()[:limit]
+
+        posts = []
+        for post, analysis in rows:
+            posts.append({
+                "post_id": post.post_id,
+                "source": post.source,
+                "content": post.content,
+                "author": post.author,
+                "created_at": post.created_at.isoformat(),
+                "sentiment": {
+                    "label": analysis.sentiment_label,
+                    "confidence": analysis.confidence_score,
+                    "emotion": analysis.emotion,
+                    "model_name": analysis.model_name,
+                }
+            })
+
+        return {
+            "posts": posts,
+            "total": None,
+            "total_mode": "none",
+            "limit": limit,
+            "offset": 0,
+            "next_cursor": None,
+            "filters": {
+                "source": None,
+                "sentiment": None,
+                "start_date": None,
+                "end_date": None,
+            }
+        }
+
+    app.add_api_route(
+        "/bench/legacy_posts", legacy_get_posts, response_class=JSONResponse
+    )
+
+
+async def _seed(rows: int):
+    from app.models.database import Base, async_session_maker, engine
+    from app.models.social_media_post import SocialMediaPost
+    from app.models.sentiment_analysis import SentimentAnalysis
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    start = datetime(2024, 1, 1)
+    labels = ("positive", "negative", "neutral")
+    async with async_session_maker() as session:
+        for i in range(rows):
+            session.add(SocialMediaPost(
+                post_id=f"bench_{i}",
+                source=("twitter", "reddit")[i % 2],
+                content=f"Benchmark post {i} about product {i % 37} " * 3,
+                author=f"user_{i % 500}",
+                created_at=start + timedelta(seconds=i),
+            ))
+            session.add(SentimentAnalysis(
+                post_id=f"bench_{i}",
+                model_name="bench-model",
+                sentiment_label=labels[i % 3],
+                confidence_score=0.5 + (i % 50) / 100.0,
+                emotion="joy",
+                analyzed_at=start + timedelta(seconds=i, milliseconds=5),
+            ))
+        await session.commit()
+
+
+async def _measure(client, path: str, requests: int, warmup: int):
+    for _ in range(warmup):
+        (await client.get(path)).raise_for_status()
+
+    cpu = []
+    wall_started = time.perf_counter()
+    for _ in range(requests):
+        started = time.process_time()
+        response = await client.get(path)
+        cpu.append(time.process_time() - started)
+        response.raise_for_status()
+    wall = time.perf_counter() - wall_started
+
+    cpu.sort()
+    return {
+        "requests": requests,
+        "bytes": len(response.content),
+        "cpu_mean_ms": round(sum(cpu) / len(cpu) * 1000, 3),
+        "cpu_p50_ms": round(cpu[len(cpu) // 2] * 1000, 3),
+        "cpu_p95_ms": round(cpu[min(len(cpu) - 1, int(len(cpu) * 0.95))] * 1000, 3),
+        "requests_per_sec": round(requests / wall, 1),
+    }
+
+
+async def run_benchmark(args) -> dict:
+    import httpx
+    from app.main import app
+    from app.api import responses
+
+    _legacy_route(app)
+    await _seed(args.rows)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        before = await _measure(
+            client, f"/bench/legacy_posts?limit={args.limit}",
+            args.requests, args.warmup,
+        )
+        after = await _measure(
+            client, f"/api/posts?limit={args.limit}&total_mode=none",
+            args.requests, args.warmup,
+        )
+
+    return {
+        "config": {
+            "rows": args.rows,
+            "limit": args.limit,
+            "requests": args.requests,
+            "orjson": responses.orjson is not None,
+        },
+        "before": before,
+        "after": after,
+    }
+
+
+def print_report(result: dict):
+    config = result["config"]
+    print(
+        f"{config['requests']} requests of {config['limit']} rows "
+        f"(orjson {'on' if config['orjson'] else 'off'})"
+    )
+    print(f"{'variant':<8}{'cpu mean ms':>13}{'cpu p50 ms':>12}"
+          f"{'cpu p95 ms':>12}{'req/s':>10}{'bytes':>9}")
+    for variant in ("before", "after"):
+        row = result[variant]
+        print(
+            f"{variant:<8}{row['cpu_mean_ms']:>13}{row['cpu_p50_ms']:>12}"
+            f"{row['cpu_p95_ms']:>12}{row['requests_per_sec']:>10}{row['bytes']:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--json", dest="json_path",
+                        help="also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before app.models.database is imported
+        os.environ["DATABASE_URL"] = (
+            f"sqlite+aiosqlite:///{os.path.join(tmp, 'api_bench.db')}"
+        )
+        result = asyncio.run(run_benchmark(args))
+
+    print_report(result)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
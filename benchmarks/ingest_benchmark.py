@@ -0,0 +1,194 @@
+"""
+Achievable publish rate of the ingester's load mode
+
+Runs DataIngester.start (one XADD per post, sleeping between posts) and
+DataIngester.run_load (token bucket, pipelined batches) at the same
+target rate and reports the rate each actually sustained. Uses the
+in-process MemoryRedis unless --redis-url points at a real server,
+which also measures redis-py's command encoding and the round trips.
+
+    python benchmarks/ingest_benchmark.py --rate 50000 --seconds 5
+    python benchmarks/ingest_benchmark.py --profile burst --redis-url redis://localhost:6379/0
+    python benchmarks/ingest_benchmark.py --corpus posts.jsonl.gz
+
+--corpus also replays a JSONL/CSV corpus as fast as possible
+(DataIngester.replay with speed 0) and reports its rate and the
+content length distribution, to compare with the synthetic posts.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ingester"))
+
+from memory_redis import MemoryRedis  # noqa: E402
+
+STREAM = "ingest_benchmark_stream"
+
+
+def _client(redis_url):
+    if not redis_url:
+        return MemoryRedis()
+    import redis.asyncio as redis
+    return redis.Redis.from_url(redis_url, decode_responses=True)
+
+
+async def _legacy(args) -> dict:
+    from ingester import DataIngester
+
+    client = _client(args.redis_url)
+    await client.delete(STREAM)
+    ingester = DataIngester(client, STREAM, posts_per_minute=int(args.rate * 60))
+
+    started = time.perf_counter()
+    # start() logs every post
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        await ingester.start(duration_seconds=args.seconds)
+    elapsed = time.perf_counter() - started
+
+    published = await client.xlen(STREAM)
+    await client.delete(STREAM)
+    await client.aclose()
+    return {
+        "published": published,
+        "elapsed_seconds": round(elapsed, 3),
+        "posts_per_sec": round(published / elapsed, 1),
+    }
+
+
+async def _load(args) -> dict:
+    from ingester import DataIngester, LoadProfile
+
+    client = _client(args.redis_url)
+    await client.delete(STREAM)
+    ingester = DataIngester(client, STREAM)
+
+    profile = LoadProfile(args.profile, rate=args.rate, burst_rate=args.burst_rate)
+    result = await ingester.run_load(
+        profile,
+        duration_seconds=args.seconds,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        report_interval=3600,
+    )
+
+    ids = {fields["post_id"] for _, fields in await client.xrange(STREAM)}
+    result["unique_post_ids"] = len(ids)
+    await client.delete(STREAM)
+    await client.aclose()
+    return result
+
+
+def _lengths(posts) -> dict:
+    lengths = sorted(len(fields["content"]) for fields in posts)
+    if not lengths:
+        return {}
+    return {
+        "mean": round(sum(lengths) / len(lengths), 1),
+        "p50": lengths[len(lengths) // 2],
+        "p95": lengths[min(len(lengths) - 1, int(len(lengths) * 0.95))],
+        "max": lengths[-1],
+    }
+
+
+async def _replay(args) -> dict:
+    from ingester import CorpusReplay, DataIngester
+
+    client = _client(args.redis_url)
+    await client.delete(STREAM)
+    ingester = DataIngester(client, STREAM)
+
+    result = await ingester.replay(
+        CorpusReplay(args.corpus),
+        speed=0,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        report_interval=3600,
+    )
+
+    result["content_chars"] = _lengths(
+        fields for _, fields in await client.xrange(STREAM, count=args.sample)
+    )
+    result["synthetic_content_chars"] = _lengths(ingester.generate_posts(args.sample))
+    await client.delete(STREAM)
+    await client.aclose()
+    return result
+
+
+async def run_benchmark(args) -> dict:
+    result = {
+        "config": {
+            "rate": args.rate,
+            "seconds": args.seconds,
+            "profile": args.profile,
+            "batch_size": args.batch_size,
+            "concurrency": args.concurrency,
+            "redis": args.redis_url or "memory",
+        },
+        "before": await _legacy(args),
+        "after": await _load(args),
+    }
+    if args.corpus:
+        result["replay"] = await _replay(args)
+    return result
+
+
+def print_report(result: dict):
+    config = result["config"]
+    print(
+        f"target {config['rate']:.0f} posts/s for {config['seconds']}s "
+        f"({config['profile']}, redis: {config['redis']})"
+    )
+    before, after = result["before"], result["after"]
+    print(f"start()     {before['posts_per_sec']:>12} posts/s  {before['published']} published")
+    print(
+        f"run_load()  {after['posts_per_sec']:>12} posts/s  {after['published']} published, "
+        f"{after['batches']} batches, {after['dropped']} behind schedule, "
+        f"{after['unique_post_ids']} unique ids"
+    )
+
+    replay = result.get("replay")
+    if replay:
+        print(
+            f"replay()    {replay['posts_per_sec']:>12} posts/s  {replay['published']} published, "
+            f"{replay['skipped']} rows skipped"
+        )
+        print(f"content chars, corpus:    {replay['content_chars']}")
+        print(f"content chars, synthetic: {replay['synthetic_content_chars']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rate", type=float, default=20000,
+                        help="target posts/sec")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--profile", choices=("steady", "poisson", "burst"),
+                        default="steady")
+    parser.add_argument("--burst-rate", type=float, default=None)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--corpus", default=None,
+                        help="also replay this JSONL/CSV corpus (.gz allowed)")
+    parser.add_argument("--sample", type=int, default=10000,
+                        help="posts sampled for the content length distribution")
+    parser.add_argument("--redis-url", default=None,
+                        help="benchmark against this Redis instead of MemoryRedis")
+    parser.add_argument("--json", dest="json_path",
+                        help="also write the results to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args))
+    print_report(result)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
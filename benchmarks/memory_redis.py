@@ -0,0 +1,359 @@
+import time
+import asyncio
+from bisect import bisect_left, bisect_right
+
+import redis
+
+
+class ResponseError(redis.ResponseError):
+    pass
+
+
+class _Group:
+    def __init__(self, last_id):
+        self.last_delivered = last_id
+        # message id -> [consumer, delivered_at (ms), times_delivered]
+        self.pending = {}
+        self.consumers = set()
+
+
+class MemoryRedis:
+    """
+    In-process stand-in for the subset of redis.asyncio the pipeline uses:
+    streams with one level of consumer groups, plus GET/SETEX for caches.
+
+    Single event loop only, no persistence; blocking reads poll.
+    Stream ids are (ms, seq) tuples compared as such, like Redis.
+    """
+
+    def __init__(self):
+        # stream name -> {id: fields}, plus the ids in order for bisecting
+        self.streams = {}
+        self.ids = {}
+        self.groups = {}
+        self.values = {}
+        self.hashes = {}
+        self.published = 0
+        self._last_id = (0, 0)
+
+    # -- helpers ---------------------------------------------------
+
+    @staticmethod
+    def _parse(message_id):
+        if message_id in ("-", "0"):
+            return (0, 0)
+        ms, _, seq = message_id.partition("-")
+        return (int(ms), int(seq or 0))
+
+    @staticmethod
+    def _format(parsed):
+        return f"{parsed[0]}-{parsed[1]}"
+
+    def _next_id(self):
+        ms = int(time.time() * 1000)
+        if ms <= self._last_id[0]:
+            parsed = (self._last_id[0], self._last_id[1] + 1)
+        else:
+            parsed = (ms, 0)
+        self._last_id = parsed
+        return parsed
+
+    def _group(self, name, groupname):
+        try:
+            return self.groups[(name, groupname)]
+        except KeyError:
+            raise ResponseError(f"NOGROUP No such consumer group {groupname}")
+
+    # -- streams ---------------------------------------------------
+
+    async def xadd(self, name, fields, id="*", maxlen=None, approximate=True,
+                   minid=None):
+        parsed = self._next_id()
+        self._stream(name)[parsed] = {k: str(v) for k, v in fields.items()}
+        self.ids[name].append(parsed)
+
+        if maxlen is not None:
+            self._trim(name, max(0, len(self.ids[name]) - maxlen))
+        if minid is not None:
+            self._trim(name, bisect_left(self.ids[name], self._parse(minid)))
+
+        return self._format(parsed)
+
+    def _stream(self, name):
+        if name not in self.streams:
+            self.streams[name] = {}
+            self.ids[name] = []
+        return self.streams[name]
+
+    def _trim(self, name, drop):
+        ids = self.ids[name]
+        for parsed in ids[:drop]:
+            del self.streams[name][parsed]
+        del ids[:drop]
+        return drop
+
+    async def xtrim(self, name, maxlen=None, approximate=True, minid=None,
+                    limit=None):
+        if name not in self.streams:
+            return 0
+        if maxlen is not None:
+            return self._trim(name, max(0, len(self.ids[name]) - maxlen))
+        return self._trim(name, bisect_left(self.ids[name], self._parse(minid)))
+
+    async def xrange(self, name, min="-", max="+", count=None):
+        ids = self.ids.get(name, [])
+        start = bisect_left(ids, self._parse(min))
+        end = len(ids) if max == "+" else bisect_right(ids, self._parse(max))
+        selected = ids[start:end][:count] if count else ids[start:end]
+        return [(self._format(p), dict(self.streams[name][p])) for p in selected]
+
+    async def xlen(self, name):
+        return len(self.streams.get(name, ()))
+
+    async def xgroup_create(self, name, groupname, id="$", mkstream=False):
+        if name not in self.streams:
+            if not mkstream:
+                raise ResponseError("ERR no such key")
+            self._stream(name)
+        if (name, groupname) in self.groups:
+            raise ResponseError("BUSYGROUP Consumer Group name already exists")
+
+        last = self._last_id if id == "$" else self._parse(id)
+        self.groups[(name, groupname)] = _Group(last)
+        return True
+
+    async def xreadgroup(self, groupname, consumername, streams, count=None,
+                         block=None, noack=False):
+        deadline = time.monotonic() + (block or 0) / 1000.0
+
+        while True:
+            response = self._read(groupname, consumername, streams, count, noack)
+            if response or block is None or time.monotonic() >= deadline:
+                return response
+            await asyncio.sleep(0.005)
+
+    def _read(self, groupname, consumername, streams, count, noack):
+        response = []
+        now = int(time.time() * 1000)
+
+        for name, position in streams.items():
+            group = self._group(name, groupname)
+            group.consumers.add(consumername)
+            if position != ">":
+                raise NotImplementedError("only '>' reads are supported")
+
+            ids = self.ids[name]
+            start = bisect_right(ids, group.last_delivered)
+            selected = ids[start:start + count] if count else ids[start:]
+
+            entries = []
+            for parsed in selected:
+                entries.append((self._format(parsed), dict(self.streams[name][parsed])))
+                if not noack:
+                    group.pending[parsed] = [consumername, now, 1]
+
+            if entries:
+                group.last_delivered = selected[-1]
+                response.append([name, entries])
+
+        return response
+
+    async def xack(self, name, groupname, *ids):
+        group = self._group(name, groupname)
+        acked = 0
+        for message_id in ids:
+            if group.pending.pop(self._parse(message_id), None) is not None:
+                acked += 1
+        return acked
+
+    async def xpending(self, name, groupname):
+        group = self._group(name, groupname)
+        keys = sorted(group.pending)
+        return {
+            "pending": len(keys),
+            "min": self._format(keys[0]) if keys else None,
+            "max": self._format(keys[-1]) if keys else None,
+            "consumers": [],
+        }
+
+    async def xpending_range(self, name, groupname, min, max, count,
+                             consumername=None, idle=None):
+        group = self._group(name, groupname)
+        low, high = self._parse(min), (
+            (float("inf"), 0) if max == "+" else self._parse(max)
+        )
+        now = int(time.time() * 1000)
+
+        result = []
+        for parsed in sorted(group.pending):
+            consumer, delivered_at, times = group.pending[parsed]
+            if not low <= parsed <= high:
+                continue
+            if consumername is not None and consumer != consumername:
+                continue
+            if idle is not None and now - delivered_at < idle:
+                continue
+            result.append({
+                "message_id": self._format(parsed),
+                "consumer": consumer,
+                "time_since_delivered": now - delivered_at,
+                "times_delivered": times,
+            })
+            if len(result) >= count:
+                break
+        return result
+
+    async def xautoclaim(self, name, groupname, consumername, min_idle_time,
+                         start_id="0-0", count=None, justid=False):
+        group = self._group(name, groupname)
+        start = self._parse(start_id)
+        now = int(time.time() * 1000)
+        stream = self.streams.get(name, {})
+
+        claimed = []
+        deleted = []
+        next_start = (0, 0)
+        for parsed in sorted(group.pending):
+            entry = group.pending[parsed]
+            if parsed < start or now - entry[1] < min_idle_time:
+                continue
+            if count and len(claimed) >= count:
+                next_start = parsed
+                break
+            if parsed not in stream:
+                del group.pending[parsed]
+                deleted.append(self._format(parsed))
+                continue
+            entry[0], entry[1], entry[2] = consumername, now, entry[2] + 1
+            claimed.append((self._format(parsed), dict(stream[parsed])))
+
+        return [self._format(next_start), claimed, deleted]
+
+    async def xinfo_groups(self, name):
+        ids = self.ids.get(name, [])
+        info = []
+        for (stream_name, groupname), group in self.groups.items():
+            if stream_name != name:
+                continue
+            info.append({
+                "name": groupname,
+                "consumers": len(group.consumers),
+                "pending": len(group.pending),
+                "last-delivered-id": self._format(group.last_delivered),
+                "lag": len(ids) - bisect_right(ids, group.last_delivered),
+            })
+        return info
+
+    # -- key/value -------------------------------------------------
+
+    async def get(self, key):
+        value = self.values.get(key)
+        if value is None:
+            return None
+        data, expires_at = value
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self.values[key]
+            return None
+        return data
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and await self.get(key) is not None:
+            return None
+        self.values[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    async def setex(self, key, seconds, value):
+        return await self.set(key, value, ex=seconds)
+
+    async def delete(self, *keys):
+        return sum(
+            1 for key in keys
+            if self.values.pop(key, None) is not None
+            or self.hashes.pop(key, None) is not None
+        )
+
+    async def incrby(self, key, amount=1):
+        value = int(await self.get(key) or 0) + amount
+        expires_at = self.values.get(key, (None, None))[1]
+        self.values[key] = (str(value), expires_at)
+        return value
+
+    async def incr(self, key):
+        return await self.incrby(key, 1)
+
+    async def expire(self, key, seconds):
+        if key not in self.values:
+            return False
+        self.values[key] = (self.values[key][0], time.monotonic() + seconds)
+        return True
+
+    async def mget(self, keys):
+        return [await self.get(key) for key in keys]
+
+    async def hincrby(self, name, key, amount=1):
+        fields = self.hashes.setdefault(name, {})
+        fields[key] = str(int(fields.get(key, 0)) + amount)
+        return int(fields[key])
+
+    async def hset(self, name, key=None, value=None, mapping=None):
+        fields = self.hashes.setdefault(name, {})
+        updates = dict(mapping or {})
+        if key is not None:
+            updates[key] = value
+        added = len(set(updates) - set(fields))
+        fields.update((k, str(v)) for k, v in updates.items())
+        return added
+
+    async def hexists(self, name, key):
+        return key in self.hashes.get(name, {})
+
+    async def hmget(self, name, *keys):
+        fields = self.hashes.get(name, {})
+        return [fields.get(key) for key in keys]
+
+    async def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+    async def publish(self, channel, message):
+        # No subscribers in-process; count what would have gone out
+        self.published += 1
+        return 0
+
+    async def ping(self):
+        return True
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class _Pipeline:
+    """
+    Queues calls and runs them in order on execute(); there is no
+    concurrency inside one event loop, so that is also atomic
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        def queue(*args, **kwargs):
+            self._calls.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        calls, self._calls = self._calls, []
+        return [await method(*args, **kwargs) for method, args, kwargs in calls]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._calls = []
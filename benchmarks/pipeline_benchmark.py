@@ -0,0 +1,292 @@
+"""
+Offline throughput benchmark for ingest -> analyze -> persist
+
+Drives the real DataIngester, SentimentWorker and processor code against
+local stand-ins: MemoryRedis instead of Redis, SQLite (or any local
+database URL) instead of the compose Postgres, and a stub model that
+costs a fixed time per batch plus per text instead of the HF pipelines.
+
+    python benchmarks/pipeline_benchmark.py --messages 5000
+    python benchmarks/pipeline_benchmark.py --writer single --json before.json
+    python benchmarks/pipeline_benchmark.py --model real   # HF models from env
+
+Worker tuning comes from the usual env vars (INFERENCE_*, READ_BATCH_*,
+MAX_IN_FLIGHT, ...), so runs can be compared by changing only those.
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ("backend", "worker", "ingester"):
+    sys.path.insert(0, os.path.join(ROOT, path))
+
+from memory_redis import MemoryRedis  # noqa: E402
+
+
+class StubPipeline:
+    """
+    Stands in for a HF text-classification pipeline: sleeps like a
+    forward pass and returns deterministic scores for each text
+    """
+
+    def __init__(self, labels, batch_ms: float, item_ms: float):
+        self.labels = labels
+        self.batch_ms = batch_ms
+        self.item_ms = item_ms
+
+    def __call__(self, texts, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+
+        time.sleep((self.batch_ms + self.item_ms * len(texts)) / 1000.0)
+
+        results = []
+        for text in texts:
+            best = zlib.crc32(text.encode("utf-8")) % len(self.labels)
+            results.append([
+                {"label": label, "score": 0.9 if i == best else 0.1 / len(self.labels)}
+                for i, label in enumerate(self.labels)
+            ])
+        return results
+
+
+class StageRecorder:
+    """
+    Collects (seconds, messages) per batch for each pipeline stage
+    """
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def __call__(self, stage: str, seconds: float, count: int):
+        self.samples[stage].append((seconds, count))
+
+    @staticmethod
+    def _percentile(sorted_values, pct):
+        if not sorted_values:
+            return 0.0
+        rank = max(0, min(len(sorted_values) - 1,
+                          int(round(pct / 100.0 * len(sorted_values))) - 1))
+        return sorted_values[rank]
+
+    def summary(self):
+        report = {}
+        for stage in ("ingest", "read", "infer", "write", "ack"):
+            samples = self.samples.get(stage, [])
+            durations = sorted(seconds for seconds, _ in samples)
+            messages = sum(count for _, count in samples)
+            busy = sum(durations)
+
+            report[stage] = {
+                "batches": len(samples),
+                "messages": messages,
+                "p50_ms": round(self._percentile(durations, 50) * 1000, 3),
+                "p95_ms": round(self._percentile(durations, 95) * 1000, 3),
+                "p99_ms": round(self._percentile(durations, 99) * 1000, 3),
+                # Throughput of the stage on its own, ignoring overlap
+                "msgs_per_sec": round(messages / busy, 1) if busy else 0.0,
+            }
+        return report
+
+
+def _install_stub_model(batch_ms: float, item_ms: float):
+    from app.services import sentiment_analyzer
+
+    labels = {
+        "sentiment": ["POSITIVE", "NEGATIVE"],
+        "emotion": ["joy", "sadness", "anger", "fear", "surprise", "neutral"],
+    }
+
+    def load_stub(model_name, backend="pytorch"):
+        kind = "emotion" if model_name == os.getenv(
+            "EMOTION_MODEL", "j-hartmann/emotion-english-distilroberta-base"
+        ) else "sentiment"
+        return StubPipeline(labels[kind], batch_ms, item_ms)
+
+    sentiment_analyzer.load_pipeline = load_stub
+
+
+def _single_row_writer(worker):
+    """
+    Replace the bulk writer with one save_post_and_analysis call
+    (SELECT + INSERT + commit) per message, for before/after runs
+    """
+    from processor import save_post_and_analysis
+
+    def run_sync(coro):
+        # save_post_and_analysis never awaits, so one send() finishes it
+        try:
+            coro.send(None)
+        except StopIteration as done:
+            return done.value
+        raise RuntimeError("save_post_and_analysis suspended unexpectedly")
+
+    def write_batch(rows):
+        db = worker.Session()
+        try:
+            for post_data, sentiment, emotion in rows:
+                run_sync(save_post_and_analysis(db, post_data, sentiment, emotion))
+            return {post_data["post_id"] for post_data, _, _ in rows}
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    worker.write_batch = write_batch
+
+
+async def run_benchmark(args) -> dict:
+    import worker as worker_module
+    from worker import SentimentWorker
+    from ingester import DataIngester
+
+    recorder = StageRecorder()
+    redis_client = MemoryRedis()
+
+    worker = SentimentWorker(
+        consumer="bench-1",
+        redis_client=redis_client,
+        database_url=args.database_url,
+        stage_observer=recorder,
+    )
+    if args.writer == "single":
+        _single_row_writer(worker)
+
+    ingester = DataIngester(
+        redis_client=redis_client,
+        stream_name=worker_module.STREAM,
+    )
+
+    await worker.ensure_group()
+
+    started = time.perf_counter()
+    consumer = asyncio.create_task(worker.run())
+
+    interval = 1.0 / args.rate if args.rate else 0.0
+    for _ in range(args.messages):
+        post = ingester.generate_post()
+        publish_started = time.perf_counter()
+        await ingester.publish_post(post)
+        recorder("ingest", time.perf_counter() - publish_started, 1)
+
+        # Yield so the worker overlaps with ingestion, as in production
+        await asyncio.sleep(interval)
+
+    deadline = time.perf_counter() + args.timeout
+    while time.perf_counter() < deadline:
+        if consumer.done():
+            # Surface a crashed worker instead of waiting out the timeout
+            consumer.result()
+        acked = sum(count for _, count in recorder.samples.get("ack", []))
+        if acked >= args.messages:
+            break
+        await asyncio.sleep(0.01)
+
+    elapsed = time.perf_counter() - started
+
+    consumer.cancel()
+    await asyncio.gather(consumer, return_exceptions=True)
+    worker._reclaim_task.cancel()
+    if worker._retention_task is not None:
+        worker._retention_task.cancel()
+    await worker.analyzer.close()
+
+    acked = sum(count for _, count in recorder.samples.get("ack", []))
+
+    # One retention pass: everything acked should be trimmed
+    stream_length = await redis_client.xlen(worker_module.STREAM)
+    await worker.retention.run_once()
+    retained = await redis_client.xlen(worker_module.STREAM)
+
+    return {
+        "config": {
+            "messages": args.messages,
+            "rate": args.rate,
+            "model": args.model,
+            "writer": args.writer,
+            "database_url": args.database_url,
+            "batch_ms": args.batch_ms,
+            "item_ms": args.item_ms,
+            "cache": args.cache,
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "acked": acked,
+        "end_to_end_msgs_per_sec": round(acked / elapsed, 1) if elapsed else 0.0,
+        "final_read_batch_size": worker.batch_sizer.size,
+        "stream_length": {"before_trim": stream_length, "after_trim": retained},
+        "stages": recorder.summary(),
+    }
+
+
+def print_report(result: dict):
+    print(
+        f"{result['acked']}/{result['config']['messages']} messages in "
+        f"{result['elapsed_seconds']}s -> "
+        f"{result['end_to_end_msgs_per_sec']} msgs/sec end to end"
+    )
+    lengths = result["stream_length"]
+    print(f"stream entries: {lengths['before_trim']} before trim, "
+          f"{lengths['after_trim']} after")
+    print(f"{'stage':<8}{'batches':>9}{'msgs':>9}{'p50 ms':>10}"
+          f"{'p95 ms':>10}{'p99 ms':>10}{'msgs/s':>12}")
+    for stage, row in result["stages"].items():
+        print(
+            f"{stage:<8}{row['batches']:>9}{row['messages']:>9}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+            f"{row['msgs_per_sec']:>12}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=0,
+                        help="posts/sec to ingest; 0 means as fast as possible")
+    parser.add_argument("--model", choices=("stub", "real"), default="stub")
+    parser.add_argument("--batch-ms", type=float, default=5.0,
+                        help="stub model cost per forward pass")
+    parser.add_argument("--item-ms", type=float, default=0.5,
+                        help="stub model cost per text in a pass")
+    parser.add_argument("--writer", choices=("bulk", "single"), default="bulk")
+    parser.add_argument("--database-url", default=None,
+                        help="sync SQLAlchemy URL; defaults to a temp SQLite file")
+    parser.add_argument("--cache", action="store_true",
+                        help="keep the analysis cache on (templates repeat a lot)")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--json", dest="json_path",
+                        help="also write the results to this file")
+    args = parser.parse_args()
+
+    if not args.cache:
+        os.environ["ANALYSIS_CACHE_MAX_ENTRIES"] = "0"
+        os.environ["ANALYSIS_CACHE_REDIS"] = "false"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.database_url is None:
+            args.database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        if args.model == "stub":
+            _install_stub_model(args.batch_ms, args.item_ms)
+
+        # The ingester and worker log every post/batch
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = asyncio.run(run_benchmark(args))
+
+    print_report(result)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
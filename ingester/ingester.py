@@ -1,10 +1,286 @@
+import io
+import os
+import csv
+import gzip
+import json
 import time
+import math
+import uuid
 import random
 import asyncio
-import os
-from datetime import datetime
+from itertools import count, islice
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import redis.asyncio as redis
 
+PROFILES = ("steady", "poisson", "burst")
+
+# Corpus columns accepted for each stream field, first match wins
+CORPUS_FIELDS = {
+    "content": ("content", "text", "body"),
+    "source": ("source", "platform"),
+    "author": ("author", "user", "username"),
+    "created_at": ("created_at", "timestamp", "date"),
+}
+
+
+class LoadProfile:
+    """
+    Arrival schedule for load mode
+
+    Args:
+        profile: "steady" (evenly spaced), "poisson" (exponential gaps
+            with the same mean rate) or "burst" (burst_rate for
+            burst_seconds at the start of every burst_period seconds,
+            rate otherwise)
+        rate: posts/sec
+    """
+
+    def __init__(
+        self,
+        profile: str = "steady",
+        rate: float = 1000,
+        burst_rate: Optional[float] = None,
+        burst_seconds: float = 1,
+        burst_period: float = 10,
+        rng: Optional[random.Random] = None,
+    ):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown load profile {profile!r}; expected one of {PROFILES}")
+        if rate <= 0:
+            raise ValueError("Load rate must be positive")
+        if burst_rate is not None and burst_rate <= 0:
+            raise ValueError("Load burst rate must be positive")
+        if burst_period <= 0:
+            raise ValueError("Load burst period must be positive")
+        if burst_seconds < 0:
+            raise ValueError("Load burst seconds can't be negative")
+
+        self.profile = profile
+        self.rate = float(rate)
+        self.burst_rate = float(burst_rate if burst_rate is not None else rate * 10)
+        self.burst_seconds = min(float(burst_seconds), float(burst_period))
+        self.burst_period = float(burst_period)
+        self.rng = rng or random.Random()
+        self._next_arrival = self.rng.expovariate(self.rate)
+
+    def expected(self, elapsed: float) -> float:
+        """
+        Posts due in the first elapsed seconds (steady and burst)
+        """
+        if self.profile != "burst":
+            return self.rate * elapsed
+
+        per_period = (
+            self.burst_rate * self.burst_seconds
+            + self.rate * (self.burst_period - self.burst_seconds)
+        )
+        periods, within = divmod(elapsed, self.burst_period)
+        return (
+            periods * per_period
+            + self.burst_rate * min(within, self.burst_seconds)
+            + self.rate * max(0.0, within - self.burst_seconds)
+        )
+
+    def arrivals(self, start: float, end: float) -> int:
+        """
+        Posts that arrive between start and end seconds into the run
+        """
+        if self.profile != "poisson":
+            return math.floor(self.expected(end)) - math.floor(self.expected(start))
+
+        arrived = 0
+        while self._next_arrival <= end:
+            arrived += 1
+            self._next_arrival += self.rng.expovariate(self.rate)
+        return arrived
+
+    @property
+    def peak_rate(self) -> float:
+        return self.burst_rate if self.profile == "burst" else self.rate
+
+
+class TokenBucket:
+    """
+    Rate limiter that refills from the monotonic clock
+
+    Tokens are credited for all the time that actually passed, so sleeps
+    that overshoot or slow round trips are made up on the next take
+    instead of lowering the rate. At most capacity tokens are held;
+    arrivals beyond that are counted in dropped, which means the
+    publisher can't keep up with the profile.
+    """
+
+    def __init__(self, profile: LoadProfile, capacity: int, clock=time.monotonic):
+        self.profile = profile
+        self.capacity = capacity
+        self.clock = clock
+        self.started = clock()
+        self.tokens = 0
+        self.dropped = 0
+        self._refilled = 0.0
+
+    def refill(self) -> float:
+        elapsed = self.clock() - self.started
+        self.tokens += self.profile.arrivals(self._refilled, elapsed)
+        self._refilled = elapsed
+        if self.tokens > self.capacity:
+            self.dropped += self.tokens - self.capacity
+            self.tokens = self.capacity
+        return elapsed
+
+    async def take(self, limit: int) -> int:
+        """
+        Wait for at least one token and take up to limit of them
+        """
+        while True:
+            self.refill()
+            if self.tokens:
+                taken = min(self.tokens, limit)
+                self.tokens -= taken
+                return taken
+            # Roughly one token's time; short enough to keep batches small
+            await asyncio.sleep(min(0.01, max(0.001, 1 / self.profile.peak_rate)))
+
+
+# Epoch numbers above this are milliseconds: as seconds they would be
+# past the year 5000
+EPOCH_MS_THRESHOLD = 1e11
+
+
+def _parse_timestamp(value) -> Optional[float]:
+    """
+    Epoch seconds for an ISO-8601 string or a number of epoch seconds
+    or milliseconds; naive times are taken as UTC
+    """
+    if value in (None, ""):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        pass
+    else:
+        return number / 1000 if abs(number) > EPOCH_MS_THRESHOLD else number
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _is_scalar(value) -> bool:
+    """
+    A non-empty string or number; nested JSON (e.g. a user object) is
+    passed over for the next candidate column
+    """
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, (int, float)) or (isinstance(value, str) and value != "")
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.utcfromtimestamp(timestamp).isoformat() + "Z"
+
+
+class CorpusReplay:
+    """
+    Posts read from a JSONL or CSV file, one row at a time
+
+    Files of any size replay in constant memory; .gz files are
+    decompressed on the fly. Rows without content are skipped.
+
+    Args:
+        path: corpus file
+        fmt: "jsonl" or "csv"; taken from the file extension if None
+        loops: times to replay the file, 0 for forever; each loop's
+            timestamps are shifted by the corpus time span so pacing
+            carries on seamlessly
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None, loops: int = 1):
+        if fmt is None:
+            name = path[:-3] if path.endswith(".gz") else path
+            fmt = "csv" if name.endswith(".csv") else "jsonl"
+        if fmt not in ("jsonl", "csv"):
+            raise ValueError(f"Unknown corpus format {fmt!r}; expected jsonl or csv")
+
+        self.path = path
+        self.fmt = fmt
+        self.loops = loops
+        self.rows_read = 0
+        self.skipped = 0
+
+    def _open(self):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, "rt", encoding="utf-8", newline="")
+        return io.open(self.path, "r", encoding="utf-8", newline="")
+
+    def rows(self) -> Iterator[Dict]:
+        """
+        Raw rows of one pass over the file
+        """
+        with self._open() as f:
+            if self.fmt == "csv":
+                # Long posts exceed the csv module's 128 KiB default
+                csv.field_size_limit(16 * 1024 * 1024)
+                yield from csv.DictReader(f)
+                return
+
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    self.skipped += 1
+                    continue
+                if isinstance(row, dict):
+                    yield row
+                else:
+                    self.skipped += 1
+
+    def posts(self) -> Iterator[Tuple[Optional[float], Dict[str, str]]]:
+        """
+        (original timestamp or None, stream fields) for every post
+        """
+        loop = 0
+        first = last = None
+
+        while not self.loops or loop < self.loops:
+            offset = loop * (last - first) if first is not None else 0.0
+            replayed = 0
+
+            for row in self.rows():
+                self.rows_read += 1
+                fields = {
+                    field: next((row[name] for name in names if _is_scalar(row.get(name))), None)
+                    for field, names in CORPUS_FIELDS.items()
+                }
+                if fields["content"] is None or not str(fields["content"]).strip():
+                    self.skipped += 1
+                    continue
+
+                timestamp = _parse_timestamp(fields["created_at"])
+                if timestamp is not None and loop == 0:
+                    first = timestamp if first is None else min(first, timestamp)
+                    last = timestamp if last is None else max(last, timestamp)
+
+                replayed += 1
+                yield (
+                    timestamp + offset if timestamp is not None else None,
+                    {
+                        "source": str(fields["source"] or "replay"),
+                        "content": str(fields["content"]),
+                        "author": str(fields["author"] or "unknown"),
+                    },
+                )
+
+            if not replayed:
+                return
+            loop += 1
+
 
 class DataIngester:
     def __init__(self, redis_client, stream_name: str, posts_per_minute: int = 60):
@@ -30,25 +306,53 @@ class DataIngester:
         ]
 
         self.products = ["iPhone 16", "ChatGPT", "Netflix", "Amazon Prime"]
-
-    def generate_post(self) -> dict:
-        post_id = f"post_{int(time.time() * 1000)}"
-
-        template = random.choice(
+        self.sources = ["reddit", "twitter", "linkedin"]
+        self.templates = (
             self.positive_templates +
             self.negative_templates +
             self.neutral_templates
         )
+
+        # Unique per process, so ids never collide across ingesters,
+        # restarts, or posts generated within the same millisecond
+        self.run_id = uuid.uuid4().hex[:12]
+        self._sequence = count()
+
+    def next_post_id(self) -> str:
+        return f"post_{self.run_id}_{next(self._sequence)}"
+
+    def generate_post(self) -> dict:
+        template = random.choice(self.templates)
         content = template.format(random.choice(self.products))
 
         return {
-            "post_id": post_id,
-            "source": random.choice(["reddit", "twitter", "linkedin"]),
+            "post_id": self.next_post_id(),
+            "source": random.choice(self.sources),
             "content": content,
             "author": f"user_{random.randint(1000, 9999)}",
             "created_at": datetime.utcnow().isoformat() + "Z"
         }
 
+    def generate_posts(self, n: int) -> List[dict]:
+        """
+        n posts sharing one created_at, drawn with one random call per field
+        """
+        created_at = datetime.utcnow().isoformat() + "Z"
+        templates = random.choices(self.templates, k=n)
+        products = random.choices(self.products, k=n)
+        sources = random.choices(self.sources, k=n)
+
+        return [
+            {
+                "post_id": self.next_post_id(),
+                "source": source,
+                "content": template.format(product),
+                "author": f"user_{random.randint(1000, 9999)}",
+                "created_at": created_at,
+            }
+            for template, product, source in zip(templates, products, sources)
+        ]
+
     async def publish_post(self, post_data: dict) -> bool:
         try:
             await self.redis_client.xadd(
@@ -67,6 +371,223 @@ class DataIngester:
             print(f"Failed to publish post: {e}")
             return False
 
+    async def publish_batch(self, posts: List[dict]) -> int:
+        """
+        XADD every post in one pipelined round trip
+
+        Returns:
+            Number of posts published (0 if the round trip failed)
+        """
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for post_data in posts:
+                    pipe.xadd(self.stream_name, post_data)
+                await pipe.execute()
+            return len(posts)
+        except Exception as e:
+            print(f"Failed to publish batch of {len(posts)} posts: {e}")
+            return 0
+
+    async def run_load(
+        self,
+        profile: LoadProfile,
+        duration_seconds: Optional[float] = None,
+        total: Optional[int] = None,
+        batch_size: int = 500,
+        concurrency: int = 4,
+        report_interval: float = 5.0,
+        source: Optional[Callable[[int], List[dict]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> dict:
+        """
+        Publish at the profile's rate until duration_seconds or total
+
+        concurrency publishers share one token bucket, each keeping one
+        pipelined batch of up to batch_size posts in flight, so the rate
+        isn't bounded by a single round trip.
+
+        source(n) returns the next n posts (generate_posts by default);
+        the run also ends when it returns none. clock drives the token
+        bucket and duration_seconds.
+        """
+        source = source or self.generate_posts
+        bucket = TokenBucket(
+            profile, capacity=max(batch_size, int(profile.peak_rate)), clock=clock
+        )
+        stats = {"published": 0, "failed": 0, "batches": 0}
+        remaining = [total]
+
+        def finished(elapsed: float) -> bool:
+            if duration_seconds and elapsed >= duration_seconds:
+                return True
+            return remaining[0] is not None and remaining[0] <= 0
+
+        async def publisher():
+            while not finished(bucket.clock() - bucket.started):
+                limit = batch_size
+                if remaining[0] is not None:
+                    limit = min(limit, remaining[0])
+                n = await bucket.take(limit)
+                if remaining[0] is not None:
+                    n = min(n, remaining[0])
+                    remaining[0] -= n
+                if n <= 0:
+                    break
+
+                posts = source(n)
+                if not posts:
+                    remaining[0] = 0
+                    break
+
+                published = await self.publish_batch(posts)
+                stats["published"] += published
+                stats["failed"] += len(posts) - published
+                stats["batches"] += 1
+
+        async def reporter():
+            last_published, last_time = 0, bucket.started
+            while True:
+                await asyncio.sleep(report_interval)
+                now = bucket.clock()
+                print(
+                    f"Published {stats['published']} posts "
+                    f"({(stats['published'] - last_published) / (now - last_time):.0f}/s), "
+                    f"{stats['failed']} failed, {bucket.dropped} behind schedule"
+                )
+                last_published, last_time = stats["published"], now
+
+        report = asyncio.create_task(reporter())
+        try:
+            await asyncio.gather(*(publisher() for _ in range(concurrency)))
+        finally:
+            report.cancel()
+
+        elapsed = bucket.clock() - bucket.started
+        return {
+            **stats,
+            "profile": profile.profile,
+            "target_rate": profile.rate,
+            "elapsed_seconds": round(elapsed, 3),
+            "posts_per_sec": round(stats["published"] / elapsed, 1) if elapsed else 0.0,
+            "dropped": bucket.dropped,
+        }
+
+    def replay_post(
+        self,
+        fields: Dict[str, str],
+        timestamp: Optional[float] = None,
+        keep_timestamp: bool = False,
+    ) -> dict:
+        """
+        Stream fields for a corpus post under a fresh post_id, so
+        repeated replays are all processed instead of deduplicated
+        """
+        if keep_timestamp and timestamp is not None:
+            created_at = _isoformat(timestamp)
+        else:
+            created_at = datetime.utcnow().isoformat() + "Z"
+        return {"post_id": self.next_post_id(), **fields, "created_at": created_at}
+
+    def corpus_source(
+        self,
+        corpus: CorpusReplay,
+        keep_timestamps: bool = False,
+    ) -> Callable[[int], List[dict]]:
+        """
+        run_load source taking posts from corpus in file order
+        """
+        posts = corpus.posts()
+
+        def source(n: int) -> List[dict]:
+            return [
+                self.replay_post(fields, timestamp, keep_timestamps)
+                for timestamp, fields in islice(posts, n)
+            ]
+
+        return source
+
+    async def replay(
+        self,
+        corpus: CorpusReplay,
+        speed: float = 1.0,
+        keep_timestamps: bool = False,
+        batch_size: int = 500,
+        concurrency: int = 4,
+        report_interval: float = 5.0,
+    ) -> dict:
+        """
+        Publish a corpus with its original pacing, or as fast as possible
+
+        Args:
+            speed: replay speed relative to the corpus timestamps (2.0 is
+                twice as fast); 0 publishes as fast as Redis accepts
+            keep_timestamps: publish the original created_at instead of
+                the time of publishing
+
+        Posts due together are sent in one pipelined batch, with up to
+        concurrency batches in flight. Rows without a timestamp, or
+        out of order, are sent right away.
+        """
+        stats = {"published": 0, "failed": 0, "batches": 0, "max_lag_seconds": 0.0}
+        pending = set()
+        batch: List[dict] = []
+
+        async def publish(posts):
+            published = await self.publish_batch(posts)
+            stats["published"] += published
+            stats["failed"] += len(posts) - published
+            stats["batches"] += 1
+
+        async def flush():
+            nonlocal batch
+            if batch:
+                pending.add(asyncio.create_task(publish(batch)))
+                batch = []
+            if len(pending) >= concurrency:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+            else:
+                # Let the new batch go out while the next one is read
+                await asyncio.sleep(0)
+
+        started = last_report = time.monotonic()
+        origin = None
+
+        for timestamp, fields in corpus.posts():
+            if speed and timestamp is not None:
+                if origin is None:
+                    origin = timestamp
+                wait = (timestamp - origin) / speed - (time.monotonic() - started)
+                if wait > 0.002:
+                    await flush()
+                    await asyncio.sleep(wait)
+                else:
+                    stats["max_lag_seconds"] = max(stats["max_lag_seconds"], -wait)
+
+            batch.append(self.replay_post(fields, timestamp, keep_timestamps))
+            if len(batch) >= batch_size:
+                await flush()
+
+            now = time.monotonic()
+            if now - last_report >= report_interval:
+                print(f"Replayed {stats['published']} posts from {corpus.path}, "
+                      f"{corpus.skipped} rows skipped")
+                last_report = now
+
+        await flush()
+        if pending:
+            await asyncio.wait(pending)
+
+        elapsed = time.monotonic() - started
+        return {
+            **stats,
+            "max_lag_seconds": round(stats["max_lag_seconds"], 3),
+            "rows_read": corpus.rows_read,
+            "skipped": corpus.skipped,
+            "elapsed_seconds": round(elapsed, 3),
+            "posts_per_sec": round(stats["published"] / elapsed, 1) if elapsed else 0.0,
+        }
+
     async def start(self, duration_seconds: int = None):
         interval = 60 / self.posts_per_minute
         start_time = time.time()
@@ -95,10 +616,62 @@ async def main():
     ingester = DataIngester(
         redis_client=redis_client,
         stream_name=os.getenv("REDIS_STREAM_NAME", "social_posts_stream"),
-        posts_per_minute=60
+        posts_per_minute=int(os.getenv("POSTS_PER_MINUTE", 60))
     )
 
-    await ingester.start()
+    batch_size = int(os.getenv("LOAD_BATCH_SIZE", 500))
+    concurrency = int(os.getenv("LOAD_CONCURRENCY", 4))
+    report_interval = float(os.getenv("LOAD_REPORT_INTERVAL_SECONDS", 5))
+
+    # Load mode: LOAD_PROFILE=steady|poisson|burst at LOAD_RATE posts/sec
+    load_profile = os.getenv("LOAD_PROFILE")
+    profile = None
+    if load_profile:
+        burst_rate = os.getenv("LOAD_BURST_RATE")
+        profile = LoadProfile(
+            load_profile,
+            rate=float(os.getenv("LOAD_RATE", 1000)),
+            burst_rate=float(burst_rate) if burst_rate else None,
+            burst_seconds=float(os.getenv("LOAD_BURST_SECONDS", 1)),
+            burst_period=float(os.getenv("LOAD_BURST_PERIOD_SECONDS", 10)),
+        )
+
+    # Replay mode: posts from REPLAY_FILE, paced by their timestamps
+    # (REPLAY_SPEED) or, with LOAD_PROFILE also set, by the profile
+    replay_file = os.getenv("REPLAY_FILE")
+    corpus = None
+    keep_timestamps = os.getenv("REPLAY_KEEP_TIMESTAMPS", "false").lower() == "true"
+    if replay_file:
+        corpus = CorpusReplay(
+            replay_file,
+            fmt=os.getenv("REPLAY_FORMAT") or None,
+            loops=int(os.getenv("REPLAY_LOOPS", 1)),
+        )
+
+    if profile is None and corpus is None:
+        await ingester.start()
+        return
+
+    if profile is None:
+        result = await ingester.replay(
+            corpus,
+            speed=float(os.getenv("REPLAY_SPEED", 1)),
+            keep_timestamps=keep_timestamps,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            report_interval=report_interval,
+        )
+    else:
+        result = await ingester.run_load(
+            profile,
+            duration_seconds=float(os.getenv("LOAD_DURATION_SECONDS", 0)) or None,
+            total=int(os.getenv("LOAD_TOTAL_POSTS", 0)) or None,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            report_interval=report_interval,
+            source=ingester.corpus_source(corpus, keep_timestamps) if corpus else None,
+        )
+    print(f"Ingestion run finished: {result}")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,58 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from collections import Counter
 from datetime import datetime
+from typing import List, Optional, Set, Tuple
 
-from app.models.database import SocialMediaPost, SentimentAnalysis
+from app.models.social_media_post import SocialMediaPost
+from app.models.sentiment_analysis import SentimentAnalysis
+from app.models.sentiment_rollup import SentimentMinuteRollup
+
+
+def _parse_timestamp(value):
+    """
+    Stream fields are strings like 2024-01-01T12:00:00.123456Z;
+    store them as naive UTC like the rest of the schema
+    """
+    if not isinstance(value, str):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+# Stream fields every post must carry
+POST_FIELDS = ("post_id", "source", "content", "author", "created_at")
+
+
+def validate_post(post_data: dict) -> Optional[str]:
+    """
+    Why a stream entry can never be saved, or None if it can
+
+    Checked before inference, so one malformed entry is set aside on
+    its own instead of failing the batch it arrived in.
+    """
+    missing = [field for field in POST_FIELDS if field not in post_data]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    if not str(post_data["content"]).strip():
+        return "empty content"
+    try:
+        _parse_timestamp(post_data["created_at"])
+    except (TypeError, ValueError):
+        return f"unparseable created_at {post_data['created_at']!r}"
+    return None
+
+
+def _insert_for(db: Session):
+    """
+    Dialect-specific INSERT supporting ON CONFLICT DO NOTHING
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Bulk writes not supported for {dialect}")
 
 
 async def save_post_and_analysis(
@@ -26,8 +77,7 @@ async def save_post_and_analysis(
             source=post_data["source"],
             content=post_data["content"],
             author=post_data["author"],
-            created_at=post_data["created_at"],
-            ingested_at=datetime.utcnow(),
+            created_at=_parse_timestamp(post_data["created_at"]),
         )
         db.add(post)
         db.flush()
@@ -45,3 +95,170 @@ async def save_post_and_analysis(
     db.commit()
 
     return post.id, analysis.id
+
+
+def save_posts_and_analyses(
+    db: Session,
+    rows: List[Tuple[dict, dict, dict]],
+) -> Set[str]:
+    """
+    Save a whole batch of (post_data, sentiment_result, emotion_result)
+    in one transaction
+
+    Posts go in with a single multi-row INSERT ... ON CONFLICT DO NOTHING.
+    Analyses are written only for posts that statement actually inserted,
+    so a redelivered message doesn't produce a second analysis row.
+    The per-minute rollup is incremented for the same posts.
+
+    Blocking; run it off the event loop.
+
+    Returns:
+        post_ids of the new posts written
+    """
+    if not rows:
+        return set()
+
+    insert = _insert_for(db)
+    now = datetime.utcnow()
+
+    # One row per post_id; a batch can carry the same post twice
+    unique = {}
+    for post_data, sentiment_result, emotion_result in rows:
+        unique.setdefault(
+            post_data["post_id"], (post_data, sentiment_result, emotion_result)
+        )
+
+    posts = [
+        {
+            "post_id": post_data["post_id"],
+            "source": post_data["source"],
+            "content": post_data["content"],
+            "author": post_data["author"],
+            "created_at": _parse_timestamp(post_data["created_at"]),
+        }
+        for post_data, _, _ in unique.values()
+    ]
+
+    inserted = set(
+        db.execute(
+            insert(SocialMediaPost)
+            .values(posts)
+            .on_conflict_do_nothing(index_elements=["post_id"])
+            .returning(SocialMediaPost.post_id)
+        ).scalars()
+    )
+
+    analyses = [
+        {
+            "post_id": post_id,
+            "model_name": sentiment_result["model_name"],
+            "sentiment_label": sentiment_result["sentiment_label"],
+            "confidence_score": sentiment_result["confidence_score"],
+            "emotion": emotion_result["emotion"],
+            "analyzed_at": now,
+        }
+        for post_id, (_, sentiment_result, emotion_result) in unique.items()
+        if post_id in inserted
+    ]
+
+    if analyses:
+        # executemany; SQLAlchemy batches these into multi-row VALUES
+        db.execute(insert(SentimentAnalysis), analyses)
+
+        post_by_id = {post["post_id"]: post for post in posts}
+        _increment_rollups(db, insert, [
+            (post_by_id[analysis["post_id"]], analysis) for analysis in analyses
+        ])
+
+    db.commit()
+    return inserted
+
+
+def _minute(value: datetime) -> datetime:
+    return value.replace(second=0, microsecond=0)
+
+
+def _increment_rollups(db: Session, insert, rows):
+    counts = Counter(
+        (
+            _minute(post["created_at"] or analysis["analyzed_at"]),
+            post["source"] or "unknown",
+            analysis["sentiment_label"],
+            analysis["emotion"],
+        )
+        for post, analysis in rows
+    )
+
+    # Fixed key order keeps concurrent workers from deadlocking
+    values = [
+        {
+            "bucket": bucket,
+            "source": source,
+            "sentiment_label": label,
+            "emotion": emotion,
+            "count": count,
+        }
+        for (bucket, source, label, emotion), count in sorted(counts.items())
+    ]
+
+    stmt = insert(SentimentMinuteRollup).values(values)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["bucket", "source", "sentiment_label", "emotion"],
+            set_={"count": SentimentMinuteRollup.count + stmt.excluded["count"]},
+        )
+    )
+
+
+def _minute_bucket(db: Session, column):
+    """
+    column truncated to the minute, in the form DateTime stores it
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m-%d %H:%M:00.000000", column)
+    return func.date_trunc("minute", column)
+
+
+def backfill_minute_rollups(db: Session) -> int:
+    """
+    Build rollup rows from existing posts and analyses
+
+    Meant for a one-off run (python worker.py backfill-rollups) against
+    a database that predates the rollup table; minutes that already
+    have a row are left alone.
+    """
+    bucket = _minute_bucket(
+        db, func.coalesce(SocialMediaPost.created_at, SentimentAnalysis.analyzed_at)
+    )
+    source = func.coalesce(SocialMediaPost.source, "unknown")
+
+    aggregate = (
+        select(
+            bucket,
+            source,
+            SentimentAnalysis.sentiment_label,
+            SentimentAnalysis.emotion,
+            func.count(),
+        )
+        .join(
+            SentimentAnalysis,
+            SocialMediaPost.post_id == SentimentAnalysis.post_id
+        )
+        .group_by(
+            bucket,
+            source,
+            SentimentAnalysis.sentiment_label,
+            SentimentAnalysis.emotion,
+        )
+    )
+
+    result = db.execute(
+        _insert_for(db)(SentimentMinuteRollup)
+        .from_select(
+            ["bucket", "source", "sentiment_label", "emotion", "count"],
+            aggregate,
+        )
+        .on_conflict_do_nothing()
+    )
+    db.commit()
+    return result.rowcount
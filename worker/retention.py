@@ -0,0 +1,261 @@
+import os
+import gzip
+import json
+import time
+import uuid
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+# Trim the stream every this many seconds; 0 disables trimming
+STREAM_RETENTION_INTERVAL = float(os.getenv("STREAM_RETENTION_INTERVAL_SECONDS", 60))
+# Archive acknowledged entries here before trimming them; unset disables
+STREAM_ARCHIVE_DIR = os.getenv("STREAM_ARCHIVE_DIR") or None
+STREAM_ARCHIVE_READ_BATCH = int(os.getenv("STREAM_ARCHIVE_READ_BATCH", 5000))
+STREAM_ARCHIVE_FILE_ENTRIES = int(os.getenv("STREAM_ARCHIVE_FILE_ENTRIES", 100000))
+
+
+def _parse_id(message_id: str) -> Tuple[int, int]:
+    ms, _, seq = message_id.partition("-")
+    return (int(ms), int(seq or 0))
+
+
+def _format_id(parsed: Tuple[int, int]) -> str:
+    return f"{parsed[0]}-{parsed[1]}"
+
+
+def _after(message_id: str) -> str:
+    """
+    Smallest id greater than message_id
+    """
+    ms, seq = _parse_id(message_id)
+    return _format_id((ms, seq + 1))
+
+
+async def safe_trim_id(redis_client, stream: str) -> Optional[str]:
+    """
+    Lowest id any consumer group on the stream may still need
+
+    For each group that is its lowest pending (delivered, unacked) id,
+    or, with nothing pending, the id after its last delivered one.
+    Everything below the minimum over all groups has been acknowledged
+    by every group.
+
+    Returns:
+        None if the stream has no groups, so nothing is known to be safe
+    """
+    try:
+        groups = await redis_client.xinfo_groups(stream)
+    except redis.ResponseError:
+        return None
+    if not groups:
+        return None
+
+    lowest = None
+    for group in groups:
+        pending = await redis_client.xpending(stream, group["name"])
+        if pending["pending"]:
+            candidate = _parse_id(pending["min"])
+        else:
+            candidate = _parse_id(_after(group["last-delivered-id"]))
+        lowest = candidate if lowest is None else min(lowest, candidate)
+
+    return _format_id(lowest)
+
+
+class StreamArchiver:
+    """
+    Writes stream entries to gzip-compressed JSON Lines files
+
+    One {"id": ..., "fields": {...}} object per line. Files are named
+    after the stream and the first and last id they hold, and only
+    appear (by rename) once complete.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        stream: str,
+        read_batch: int = STREAM_ARCHIVE_READ_BATCH,
+        file_entries: int = STREAM_ARCHIVE_FILE_ENTRIES,
+    ):
+        self.directory = directory
+        self.stream = stream
+        self.read_batch = read_batch
+        self.file_entries = file_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, first_id: str, last_id: str) -> str:
+        name = self.stream.replace(":", "_").replace("/", "_")
+        return os.path.join(self.directory, f"{name}-{first_id}-{last_id}.jsonl.gz")
+
+    def write(self, entries: List[Tuple[str, Dict]]) -> str:
+        """
+        Write entries (in id order) to one new archive file
+        """
+        tmp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for message_id, fields in entries:
+                f.write(json.dumps({"id": message_id, "fields": fields}) + "\n")
+
+        path = self._path(entries[0][0], entries[-1][0])
+        os.replace(tmp_path, path)
+        return path
+
+    async def archive(
+        self, redis_client, start: str, end: str
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Archive entries with start <= id < end, file_entries per file
+
+        Entries are read read_batch at a time, so memory is bounded by
+        one file's worth whatever the backlog.
+
+        Yields:
+            (entries written, id of the last one) after each file
+        """
+        end_parsed = _parse_id(end)
+        entries: List[Tuple[str, Dict]] = []
+
+        while True:
+            batch = await redis_client.xrange(
+                self.stream, min=start, max="+", count=self.read_batch
+            )
+            done = len(batch) < self.read_batch
+            within = [entry for entry in batch if _parse_id(entry[0]) < end_parsed]
+            done = done or len(within) < len(batch)
+            entries.extend(within)
+
+            if entries and (done or len(entries) >= self.file_entries):
+                await asyncio.to_thread(self.write, entries)
+                yield len(entries), entries[-1][0]
+                entries = []
+            if done:
+                return
+            start = _after(batch[-1][0])
+
+
+class StreamRetention:
+    """
+    Keeps a stream at the size of its unacknowledged backlog
+
+    Every pass trims (XTRIM MINID ~) everything below safe_trim_id, so
+    no entry a consumer group still needs is removed. With an archiver,
+    those entries are first written to archive files and trimming stops
+    at the last archived id; the archive position is kept in Redis so
+    it survives restarts and is shared by all workers.
+
+    Passes from several workers are serialized with a Redis lock, so
+    entries are archived once. The lock is extended after every archive
+    file, so lock_timeout only has to cover writing one file; a pass
+    that finds it has lost the lock stops without recording or
+    trimming anything more. A crash (or lost lock) between writing a
+    file and recording its position can archive the same entries twice.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        stream: str,
+        archiver: Optional[StreamArchiver] = None,
+        lock_timeout: float = 300,
+    ):
+        self.redis = redis_client
+        self.stream = stream
+        self.archiver = archiver
+        self.lock_timeout = lock_timeout
+        self.cursor_key = f"{stream}:archived_until"
+        self.lock_key = f"{stream}:retention_lock"
+
+        self.trimmed = 0
+        self.archived = 0
+
+    @classmethod
+    def from_env(cls, redis_client, stream: str) -> "StreamRetention":
+        archiver = None
+        if STREAM_ARCHIVE_DIR:
+            archiver = StreamArchiver(STREAM_ARCHIVE_DIR, stream)
+        return cls(redis_client, stream, archiver=archiver)
+
+    async def _acquire(self) -> Optional[str]:
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(
+            self.lock_key, token, ex=int(self.lock_timeout), nx=True
+        )
+        return token if acquired else None
+
+    async def _extend(self, token: str) -> bool:
+        """
+        Push the lock's expiry out again, if this pass still holds it
+        """
+        if await self.redis.get(self.lock_key) != token:
+            return False
+        await self.redis.expire(self.lock_key, int(self.lock_timeout))
+        return True
+
+    async def _release(self, token: str):
+        if await self.redis.get(self.lock_key) == token:
+            await self.redis.delete(self.lock_key)
+
+    async def run_once(self) -> Dict:
+        """
+        One archive-and-trim pass
+
+        Returns:
+            What the pass did; "skipped" is set when another worker held
+            the lock (or took it over mid-pass) or no consumer group
+            exists yet
+        """
+        token = await self._acquire()
+        if token is None:
+            return {"skipped": "locked"}
+
+        try:
+            trim_id = await safe_trim_id(self.redis, self.stream)
+            if trim_id is None:
+                return {"skipped": "no consumer group"}
+
+            archived = 0
+            if self.archiver is not None:
+                cursor = await self.redis.get(self.cursor_key) or "-"
+                files = self.archiver.archive(self.redis, cursor, trim_id)
+                async for written, last_id in files:
+                    if not await self._extend(token):
+                        # The lock expired and another worker may be
+                        # archiving from the recorded cursor already
+                        await files.aclose()
+                        self.archived += archived
+                        return {"skipped": "lock lost", "archived": archived}
+                    # Record progress per file, so a long pass isn't redone
+                    cursor = _after(last_id)
+                    await self.redis.set(self.cursor_key, cursor)
+                    archived += written
+                # Never trim past what is on disk
+                if cursor != "-" and _parse_id(cursor) < _parse_id(trim_id):
+                    trim_id = cursor
+
+            trimmed = await self.redis.xtrim(
+                self.stream, minid=trim_id, approximate=True
+            )
+        finally:
+            await self._release(token)
+
+        self.trimmed += trimmed
+        self.archived += archived
+        return {"trim_id": trim_id, "trimmed": trimmed, "archived": archived}
+
+    async def run(self, interval: float = STREAM_RETENTION_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                started = time.monotonic()
+                result = await self.run_once()
+                if result.get("trimmed") or result.get("archived"):
+                    print(
+                        f"Stream retention: archived {result['archived']}, "
+                        f"trimmed {result['trimmed']} entries below {result['trim_id']} "
+                        f"in {time.monotonic() - started:.2f}s"
+                    )
+            except Exception as e:
+                print(f"Error trimming {self.stream}: {e}")
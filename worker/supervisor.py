@@ -0,0 +1,117 @@
+import os
+import gc
+import time
+import signal
+import asyncio
+import traceback
+
+from app.services.sentiment_analyzer import SentimentAnalyzer
+from worker import SentimentWorker, CONSUMER
+
+RESTART_BACKOFF = float(os.getenv("WORKER_RESTART_BACKOFF_SECONDS", 1))
+
+
+class WorkerSupervisor:
+    """
+    Loads the models once, then forks N consumers that share the
+    weights copy-on-write and restarts any consumer that dies.
+
+    Each child joins the same consumer group as <HOSTNAME>-<index>,
+    so a restarted child keeps its predecessor's consumer name.
+    """
+
+    def __init__(self, processes: int, consumer_prefix: str = CONSUMER):
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+
+        self.processes = processes
+        self.consumer_prefix = consumer_prefix
+        self.children = {}
+        self.stopping = False
+        self.analyzer = None
+
+    def _configure_child_threads(self):
+        # N children each using every core for torch ops would oversubscribe
+        threads = os.getenv("WORKER_TORCH_THREADS")
+        threads = int(threads) if threads else max(
+            1, (os.cpu_count() or 1) // self.processes
+        )
+
+        try:
+            import torch
+        except ImportError:
+            return
+
+        torch.set_num_threads(threads)
+
+    def _child_main(self, index: int):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+        self._configure_child_threads()
+
+        worker = SentimentWorker(
+            analyzer=self.analyzer,
+            consumer=f"{self.consumer_prefix}-{index}",
+        )
+        asyncio.run(worker.run())
+
+    def _spawn(self, index: int):
+        pid = os.fork()
+
+        if pid == 0:
+            code = 0
+            try:
+                self._child_main(index)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+
+        self.children[pid] = index
+        print(f"Started consumer {self.consumer_prefix}-{index} (pid {pid})")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        self.analyzer = SentimentAnalyzer()
+
+        if self.analyzer.executor.backend == "process":
+            raise ValueError(
+                "WORKER_PROCESSES > 1 needs INFERENCE_EXECUTOR=thread or inline"
+            )
+
+        # Move everything allocated so far (the models) out of the
+        # collector's view so GC passes in the children don't write to
+        # those pages and force them to be copied
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        for index in range(self.processes):
+            self._spawn(index)
+
+        while self.children:
+            pid, status = os.wait()
+            index = self.children.pop(pid, None)
+
+            if index is None or self.stopping:
+                continue
+
+            print(
+                f"Consumer {self.consumer_prefix}-{index} (pid {pid}) exited "
+                f"with status {status}, restarting"
+            )
+            time.sleep(RESTART_BACKOFF)
+            if not self.stopping:
+                self._spawn(index)
+
+        print("Supervisor stopped")
@@ -1,34 +1,150 @@
 import os
+import sys
 import json
+import time
 import asyncio
+from datetime import datetime
 import redis.asyncio as redis
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, select
 
 from app.services.sentiment_analyzer import SentimentAnalyzer
+from app.services.result_cache import AnalysisCache
+from app.services.platform_stats import claim_seeding, record_written, seed_totals
+from app.services.read_cache import invalidate
+from app.services.broadcast import publish_post_events
 from app.models.database import Base
-from processor import save_post_and_analysis
+from app.models.migrations import run_migrations
+from app.models.social_media_post import SocialMediaPost
+from app.models.sentiment_analysis import SentimentAnalysis
+from processor import (
+    backfill_minute_rollups,
+    save_posts_and_analyses,
+    validate_post,
+)
+from retention import STREAM_RETENTION_INTERVAL, StreamRetention
 
 STREAM = os.getenv("REDIS_STREAM_NAME", "social_posts_stream")
 GROUP = os.getenv("REDIS_CONSUMER_GROUP", "sentiment_workers")
 CONSUMER = os.getenv("HOSTNAME", "worker-1")
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+CACHE_STATS_INTERVAL = int(os.getenv("CACHE_STATS_INTERVAL_SECONDS", 60))
+
+# Pending-entry reclamation
+RECLAIM_IDLE_MS = int(os.getenv("RECLAIM_IDLE_MS", 60000))
+RECLAIM_INTERVAL = float(os.getenv("RECLAIM_INTERVAL_SECONDS", 30))
+RECLAIM_BATCH_SIZE = int(os.getenv("RECLAIM_BATCH_SIZE", 50))
+MAX_DELIVERIES = int(os.getenv("MAX_DELIVERIES", 5))
+DEAD_LETTER_STREAM = os.getenv("DEAD_LETTER_STREAM", f"{STREAM}:dead")
+
+# Stream consumption
+READ_BATCH_MIN = int(os.getenv("READ_BATCH_MIN", 1))
+READ_BATCH_MAX = int(os.getenv("READ_BATCH_MAX", 256))
+READ_BLOCK_MS = int(os.getenv("READ_BLOCK_MS", 5000))
+TARGET_BATCH_LATENCY_MS = float(os.getenv("TARGET_BATCH_LATENCY_MS", 1000))
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", 512))
+LAG_REFRESH_SECONDS = float(os.getenv("LAG_REFRESH_SECONDS", 5))
+
+# Mark API read caches stale after writes, at most this often; 0 disables
+READ_CACHE_INVALIDATE_SECONDS = float(os.getenv("READ_CACHE_INVALIDATE_SECONDS", 0))
+
+# Full-text search column/index on posts (PostgreSQL), added by
+# `python worker.py migrate`; the trigram index for substring search
+# is optional
+POST_SEARCH_INDEX = os.getenv("POST_SEARCH_INDEX", "true").lower() == "true"
+POST_SEARCH_TRIGRAM = os.getenv("POST_SEARCH_TRIGRAM", "false").lower() == "true"
+
+# Per-post pub/sub events for the API's live dashboard feed
+PUBLISH_POST_EVENTS = os.getenv("PUBLISH_POST_EVENTS", "true").lower() == "true"
+
+
+class AdaptiveBatchSizer:
+    """
+    Picks the XREADGROUP count from observed batch latency and group lag
+
+    Grows while batches finish well under the latency target and there
+    is a backlog to drain; halves as soon as a batch overshoots it.
+    """
+
+    def __init__(
+        self,
+        initial: int = 10,
+        minimum: int = READ_BATCH_MIN,
+        maximum: int = READ_BATCH_MAX,
+        target_latency_ms: float = TARGET_BATCH_LATENCY_MS,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.size = min(max(initial, self.minimum), self.maximum)
+        self.target = target_latency_ms / 1000.0
+        self.lag = 0
+
+    def observe(self, batch_size: int, seconds: float):
+        if seconds > self.target:
+            self.size = max(self.minimum, self.size // 2)
+            return
+
+        # Only grow when there is more waiting than we read last time
+        if self.lag < self.size or batch_size < self.size:
+            return
+
+        if seconds < self.target / 2:
+            self.size = min(self.maximum, self.size * 2)
+        else:
+            self.size = min(self.maximum, self.size + max(1, self.size // 4))
 
 
 class SentimentWorker:
-    def __init__(self):
-        self.redis = redis.Redis(
+    def __init__(
+        self,
+        analyzer: SentimentAnalyzer = None,
+        consumer: str = CONSUMER,
+        redis_client=None,
+        database_url: str = DATABASE_URL,
+        stage_observer=None,
+    ):
+        """
+        Args:
+            analyzer: already-loaded analyzer to share (e.g. inherited
+                from a supervisor across fork); loaded here if omitted
+            consumer: consumer name within the group, unique per process
+            redis_client: redis.asyncio client; built from REDIS_HOST /
+                REDIS_PORT if omitted
+            database_url: synchronous SQLAlchemy URL for writes
+            stage_observer: optional callable(stage, seconds, count)
+                told how long each read / infer / write / ack took
+        """
+        self.consumer = consumer
+        self.observe_stage = stage_observer or (lambda stage, seconds, count: None)
+
+        self.redis = redis_client or redis.Redis(
             host=os.getenv("REDIS_HOST", "redis"),
             port=int(os.getenv("REDIS_PORT", 6379)),
             decode_responses=True,
         )
 
-        engine = create_engine(DATABASE_URL)
+        engine = create_engine(database_url)
         Base.metadata.create_all(bind=engine)
         self.Session = sessionmaker(bind=engine)
 
-        self.analyzer = SentimentAnalyzer()
+        self.cache = AnalysisCache.from_env(redis_client=self.redis)
+
+        if analyzer is None:
+            analyzer = SentimentAnalyzer(cache=self.cache)
+        else:
+            # The cache's Redis client must belong to this process
+            analyzer.cache = self.cache
+        self.analyzer = analyzer
+        self._stats_logged_at = time.monotonic()
+
+        self.batch_sizer = AdaptiveBatchSizer()
+        self.retention = StreamRetention.from_env(self.redis, STREAM)
+        self._retention_task = None
+        self._last_invalidated = 0.0
+        self.in_flight = 0
+        self._lag_checked_at = 0.0
+        self._batches = set()
 
     async def ensure_group(self):
         try:
@@ -36,43 +152,379 @@ class SentimentWorker:
         except redis.ResponseError:
             pass  # group already exists
 
-    async def process_message(self, message_id, data):
+    def write_batch(self, rows):
         db = self.Session()
         try:
-            sentiment = await self.analyzer.analyze_sentiment(data["content"])
-            emotion = await self.analyzer.analyze_emotion(data["content"])
+            return save_posts_and_analyses(db, rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def write_rows(self, rows):
+        """
+        Fallback after a failed bulk write: each row in its own
+        transaction, so one bad row doesn't hold back the rest
+
+        Returns:
+            (post_ids written, whether each row was saved)
+        """
+        written, saved = set(), []
+        for row in rows:
+            try:
+                written |= self.write_batch([row])
+                saved.append(True)
+            except Exception as e:
+                print(f"Error saving post {row[0].get('post_id')}: {e}")
+                saved.append(False)
+        return written, saved
 
-            await save_post_and_analysis(db, data, sentiment, emotion)
-            await self.redis.xack(STREAM, GROUP, message_id)
-            print(f"Processed {message_id}")
+    async def process_batch(self, entries):
+        """
+        Analyze a batch of stream entries, persist them in one
+        transaction and only then ack them with a single XACK
 
+        Entries that can never be saved are dead-lettered up front.
+        If the bulk write fails, rows are written one by one and only
+        the ones that fail stay pending, to be retried on their own.
+        """
+        errors = {}
+        for message_id, data in entries:
+            error = validate_post(data)
+            if error:
+                errors[message_id] = error
+        if errors:
+            try:
+                await self.dead_letter(
+                    [entry for entry in entries if entry[0] in errors], {}, errors
+                )
+            except Exception as e:
+                print(f"Error dead-lettering invalid messages: {e}")
+            entries = [entry for entry in entries if entry[0] not in errors]
+            if not entries:
+                return
+
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *[self.analyzer.analyze(data["content"]) for _, data in entries],
+            return_exceptions=True,
+        )
+        self.observe_stage("infer", time.perf_counter() - started, len(entries))
+
+        rows = []
+        message_ids = []
+        for (message_id, data), result in zip(entries, results):
+            if isinstance(result, Exception):
+                print(f"Error analyzing {message_id}: {result}")
+                continue
+            rows.append((data, result["sentiment"], result["emotion"]))
+            message_ids.append(message_id)
+
+        if not rows:
+            return
+
+        started = time.perf_counter()
+        try:
+            written = await asyncio.to_thread(self.write_batch, rows)
         except Exception as e:
-            db.rollback()
-            print(f"Error processing {message_id}: {e}")
+            print(f"Error saving batch of {len(rows)}: {e}")
+            if len(rows) == 1:
+                return
+            written, saved = await asyncio.to_thread(self.write_rows, rows)
+            rows = [row for row, ok in zip(rows, saved) if ok]
+            message_ids = [message_id for message_id, ok in zip(message_ids, saved) if ok]
+            if not rows:
+                return
+        self.observe_stage("write", time.perf_counter() - started, len(rows))
+
+        started = time.perf_counter()
+        await self.redis.xack(STREAM, GROUP, *message_ids)
+        self.observe_stage("ack", time.perf_counter() - started, len(message_ids))
+
+        # Each new post gets exactly one analysis
+        try:
+            await record_written(self.redis, len(written), len(written))
+        except Exception as e:
+            print(f"Error updating platform stats: {e}")
+
+        if written:
+            await self.invalidate_read_caches()
+
+        if PUBLISH_POST_EVENTS and written:
+            try:
+                # Redelivered posts were announced the first time
+                await publish_post_events(self.redis, [
+                    row for row in rows if row[0]["post_id"] in written
+                ])
+            except Exception as e:
+                print(f"Error publishing post events: {e}")
+        print(f"Processed {len(message_ids)} messages")
+
+    async def invalidate_read_caches(self):
+        """
+        Let API caches built from posts refresh early, throttled so a
+        busy stream doesn't keep them permanently refreshing
+        """
+        if READ_CACHE_INVALIDATE_SECONDS <= 0:
+            return
+
+        now = time.monotonic()
+        if now - self._last_invalidated < READ_CACHE_INVALIDATE_SECONDS:
+            return
+        self._last_invalidated = now
+
+        try:
+            await invalidate(self.redis, "posts")
+        except Exception as e:
+            print(f"Error invalidating read caches: {e}")
+
+    async def dead_letter(self, entries, deliveries, errors=None):
+        """
+        Move entries to the dead-letter stream and ack them
+        in one MULTI/EXEC so nothing is lost or duplicated
+
+        Args:
+            deliveries: message_id -> times delivered
+            errors: optional message_id -> why it was set aside
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for message_id, data in entries:
+                fields = {
+                    **data,
+                    "original_id": message_id,
+                    "deliveries": deliveries.get(message_id, 0),
+                    "consumer_group": GROUP,
+                    "dead_lettered_at": datetime.utcnow().isoformat() + "Z",
+                }
+                if errors and message_id in errors:
+                    fields["error"] = errors[message_id]
+                pipe.xadd(DEAD_LETTER_STREAM, fields)
+            pipe.xack(STREAM, GROUP, *[message_id for message_id, _ in entries])
+            await pipe.execute()
+
+        print(f"Dead-lettered {len(entries)} messages to {DEAD_LETTER_STREAM}")
+
+    async def handle_reclaimed(self, entries):
+        """
+        Retry claimed entries, or dead-letter those that have
+        already used up MAX_DELIVERIES attempts
+        """
+        pending = await self.redis.xpending_range(
+            STREAM,
+            GROUP,
+            min=entries[0][0],
+            max=entries[-1][0],
+            count=len(entries),
+            consumername=self.consumer,
+        )
+        deliveries = {p["message_id"]: p["times_delivered"] for p in pending}
+
+        retry = []
+        exhausted = []
+        for message_id, data in entries:
+            if deliveries.get(message_id, 0) > MAX_DELIVERIES:
+                exhausted.append((message_id, data))
+            else:
+                retry.append((message_id, data))
+
+        if exhausted:
+            await self.dead_letter(exhausted, deliveries)
+        if retry:
+            await self.process_batch(retry)
+
+    async def reclaim_pending(self) -> int:
+        """
+        One pass over the group's pending entries list: take over
+        entries idle for RECLAIM_IDLE_MS (their consumer failed or
+        died) and handle them here
+
+        Returns:
+            number of entries claimed
+        """
+        start_id = "0-0"
+        claimed_total = 0
+
+        while True:
+            response = await self.redis.xautoclaim(
+                STREAM,
+                GROUP,
+                self.consumer,
+                min_idle_time=RECLAIM_IDLE_MS,
+                start_id=start_id,
+                count=RECLAIM_BATCH_SIZE,
+            )
+            start_id, claimed = response[0], response[1]
+
+            # Entries deleted from the stream come back without fields
+            claimed = [(message_id, data) for message_id, data in claimed if data]
+            if claimed:
+                claimed_total += len(claimed)
+                await self.handle_reclaimed(claimed)
+
+            if start_id in ("0-0", b"0-0"):
+                return claimed_total
+
+    async def reclaim_loop(self):
+        while True:
+            try:
+                claimed = await self.reclaim_pending()
+                if claimed:
+                    print(f"Reclaimed {claimed} pending messages")
+            except Exception as e:
+                print(f"Error reclaiming pending messages: {e}")
+
+            await asyncio.sleep(RECLAIM_INTERVAL)
+
+    def log_cache_stats(self):
+        now = time.monotonic()
+        if now - self._stats_logged_at >= CACHE_STATS_INTERVAL:
+            self._stats_logged_at = now
+            print(f"Analysis cache: {json.dumps(self.cache.stats())}")
+
+    def count_rows(self):
+        with self.Session() as db:
+            return (
+                db.scalar(select(func.count()).select_from(SocialMediaPost)),
+                db.scalar(select(func.count()).select_from(SentimentAnalysis)),
+            )
+
+    async def seed_stats(self):
+        """
+        Start the Redis counters from exact table counts the first
+        time any worker runs against this Redis
+        """
+        if not await claim_seeding(self.redis):
+            return
+
+        total_posts, total_analyses = await asyncio.to_thread(self.count_rows)
+        await seed_totals(self.redis, total_posts, total_analyses)
+        print(f"Seeded platform stats: {total_posts} posts")
+
+    async def refresh_lag(self):
+        """
+        Update the group's lag (entries not yet delivered to any
+        consumer) at most every LAG_REFRESH_SECONDS
+        """
+        now = time.monotonic()
+        if now - self._lag_checked_at < LAG_REFRESH_SECONDS:
+            return
+        self._lag_checked_at = now
+
+        try:
+            groups = await self.redis.xinfo_groups(STREAM)
+        except redis.ResponseError:
+            return
+
+        for group in groups:
+            if group["name"] == GROUP:
+                # lag is only reported by Redis 7+
+                self.batch_sizer.lag = group.get("lag") or 0
+
+    async def _process_in_background(self, entries):
+        started = time.monotonic()
+        try:
+            await self.process_batch(entries)
+        except Exception as e:
+            print(f"Error processing batch: {e}")
         finally:
-            db.close()
+            self.in_flight -= len(entries)
+            self.batch_sizer.observe(len(entries), time.monotonic() - started)
+            self._slot_freed.set()
 
     async def run(self):
         await self.ensure_group()
-        print("Worker started")
+        await self.seed_stats()
+        print(f"Worker {self.consumer} started")
+
+        self._reclaim_task = asyncio.create_task(self.reclaim_loop())
+        if STREAM_RETENTION_INTERVAL > 0:
+            self._retention_task = asyncio.create_task(
+                self.retention.run(STREAM_RETENTION_INTERVAL)
+            )
+        self._slot_freed = asyncio.Event()
 
         while True:
+            # Bound memory: don't read more than MAX_IN_FLIGHT ahead
+            free = MAX_IN_FLIGHT - self.in_flight
+            if free <= 0:
+                self._slot_freed.clear()
+                await self._slot_freed.wait()
+                continue
+
+            await self.refresh_lag()
+
+            # With a known backlog there is no reason to block
+            started = time.perf_counter()
             messages = await self.redis.xreadgroup(
                 GROUP,
-                CONSUMER,
+                self.consumer,
                 streams={STREAM: ">"},
-                count=10,
-                block=5000,
+                count=min(self.batch_sizer.size, free),
+                block=None if self.batch_sizer.lag > 0 else READ_BLOCK_MS,
             )
 
+            if not messages:
+                self.batch_sizer.lag = 0
+            else:
+                self.observe_stage(
+                    "read",
+                    time.perf_counter() - started,
+                    sum(len(entries) for _, entries in messages),
+                )
+
+            # Keep reading while earlier batches are still being processed
             for _, entries in messages:
-                tasks = [
-                    self.process_message(message_id, data)
-                    for message_id, data in entries
-                ]
-                await asyncio.gather(*tasks)
+                self.batch_sizer.lag = max(0, self.batch_sizer.lag - len(entries))
+                self.in_flight += len(entries)
+                batch = asyncio.create_task(self._process_in_background(entries))
+                self._batches.add(batch)
+                batch.add_done_callback(self._batches.discard)
+
+            self.log_cache_stats()
+
+
+def backfill_rollups(database_url: str = DATABASE_URL):
+    """
+    One-off: build rollups for posts written before the table existed
+    """
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        print(f"Backfilled {backfill_minute_rollups(db)} rollup rows")
+
+
+def migrate(database_url: str = DATABASE_URL):
+    """
+    One-off: create tables, then the indexes and search column
+    existing tables are missing
+    """
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    ran = run_migrations(engine, search=POST_SEARCH_INDEX, trigram=POST_SEARCH_TRIGRAM)
+    print(f"Ran {ran} migration statements")
+
+
+# One-off maintenance commands: python worker.py <command>
+COMMANDS = {
+    "migrate": migrate,
+    "backfill-rollups": backfill_rollups,
+}
 
 
 if __name__ == "__main__":
-    worker = SentimentWorker()
-    asyncio.run(worker.run())
+    if len(sys.argv) > 1:
+        if sys.argv[1] not in COMMANDS:
+            sys.exit(f"Unknown command {sys.argv[1]!r}; expected one of {', '.join(COMMANDS)}")
+        COMMANDS[sys.argv[1]]()
+        sys.exit(0)
+
+    processes = int(os.getenv("WORKER_PROCESSES", 1))
+
+    if processes > 1:
+        from supervisor import WorkerSupervisor
+
+        WorkerSupervisor(processes).run()
+    else:
+        worker = SentimentWorker()
+        asyncio.run(worker.run())